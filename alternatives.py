@@ -0,0 +1,104 @@
+"""
+alternatives.py - Ranked top-k alternative crops for a rejected rotation.
+
+A candidate's score is the sum of
+  - soil: the crop is recommended for the field's soil,
+  - diversity: how long ago its family was last grown (1.0 if not in the history),
+  - agronomic bonuses configured per family and per crop.
+All crops of one family share the soil and diversity terms for a given
+soil, so candidates are grouped into per-(family, soil match) buckets that
+are pre-sorted by their crop bonus. A query scores each bucket once and
+merges the bucket heads with a heap, which keeps it independent of the
+catalog size apart from the number of families.
+"""
+import heapq
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from catalog import CATALOG, CropCatalog
+from classes import Crop
+
+DEFAULT_K = 5
+
+
+class AlternativeWeights:
+    def __init__(
+        self,
+        soil: float = 2.0,
+        diversity: float = 1.0,
+        family_bonus: Optional[Dict[str, float]] = None,
+        crop_bonus: Optional[Dict[str, float]] = None,
+    ):
+        self.soil = soil
+        self.diversity = diversity
+        self.family_bonus = dict(family_bonus or {})
+        self.crop_bonus = dict(crop_bonus or {})
+
+
+class AlternativeSuggester:
+    def __init__(self, catalog: CropCatalog = CATALOG, weights: Optional[AlternativeWeights] = None):
+        self.catalog = catalog
+        self.weights = weights or AlternativeWeights()
+        self._position = {id(crop): i for i, crop in enumerate(catalog.crops)}
+        # (family, soil_type, suits soil) -> [(-crop bonus, catalog position, crop)], best first
+        self._buckets: Dict[Tuple[str, str, bool], List[Tuple[float, int, Crop]]] = {}
+
+    def _bucket(self, family: str, soil_type: str, suits: bool) -> List[Tuple[float, int, Crop]]:
+        key = (family, soil_type, suits)
+        if key not in self._buckets:
+            crop_bonus = self.weights.crop_bonus
+            self._buckets[key] = sorted(
+                (-crop_bonus.get(crop.name, 0.0), self._position[id(crop)], crop)
+                for crop in self.catalog.crops_in_family(family)
+                if (soil_type in crop.recommended_soil) == suits
+            )
+        return self._buckets[key]
+
+    def diversity(self, family: str, history_families: Sequence[Optional[str]]) -> float:
+        """1.0 for a family not in the history, falling to 0.0 for last season's family."""
+        for seasons_ago, grown in enumerate(reversed(history_families), start=1):
+            if grown == family:
+                return (seasons_ago - 1) / len(history_families)
+        return 1.0
+
+    def suggest(
+        self,
+        soil_type: str,
+        history: Sequence[str],
+        k: Optional[int] = DEFAULT_K,
+        exclude_family: Optional[str] = None,
+        require_soil: bool = False,
+    ) -> List[Tuple[Crop, float]]:
+        """
+        Best `k` (crop, score) pairs (all if k is None) for a field with the
+        given crop history (oldest first). Crops in `exclude_family`, by default
+        the family of the last crop in the history, are never suggested.
+        """
+        history_families = [self.catalog.family_of(name) for name in history]
+        if exclude_family is None and history_families:
+            exclude_family = history_families[-1]
+
+        weights = self.weights
+        heap = []
+        for family in self.catalog.families:
+            if family == exclude_family:
+                continue
+            base = weights.diversity * self.diversity(family, history_families) + weights.family_bonus.get(family, 0.0)
+            for suits in ((True,) if require_soil else (True, False)):
+                bucket = self._bucket(family, soil_type, suits)
+                if bucket:
+                    score = base + (weights.soil if suits else 0.0)
+                    neg_bonus, position, _ = bucket[0]
+                    # Ties go to catalog order
+                    heapq.heappush(heap, (-(score - neg_bonus), position, score, bucket, 0))
+
+        results = []
+        while heap and (k is None or len(results) < k):
+            neg_total, _, score, bucket, i = heapq.heappop(heap)
+            results.append((bucket[i][2], -neg_total))
+            if i + 1 < len(bucket):
+                neg_bonus, position, _ = bucket[i + 1]
+                heapq.heappush(heap, (-(score - neg_bonus), position, score, bucket, i + 1))
+        return results
+
+    def suggest_names(self, soil_type: str, history: Sequence[str], k: Optional[int] = DEFAULT_K, **kwargs) -> List[str]:
+        return [crop.name for crop, _ in self.suggest(soil_type, history, k, **kwargs)]
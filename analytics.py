@@ -0,0 +1,88 @@
+"""
+analytics.py - Aggregates over the saved recommendations, read from summary tables.
+
+The stats_* tables in crop_assistant.db are kept current by triggers on
+user_entries (inserts, deletes and updates), so every query here reads a
+handful of rows bounded by the catalog size rather than scanning the log.
+
+Usage:
+    python analytics.py [database] [--top N]
+"""
+import argparse
+from typing import List, NamedTuple, Optional
+
+from database import DatabaseManager
+
+
+class GroupStats(NamedTuple):
+    name: Optional[str]
+    entries: int
+    warnings: int
+    acreage: float
+
+    @property
+    def warning_rate(self) -> float:
+        """Share of entries whose rotation was rejected."""
+        return self.warnings / self.entries if self.entries else 0.0
+
+
+class Transition(NamedTuple):
+    previous_crop: Optional[str]
+    current_crop: Optional[str]
+    entries: int
+    warnings: int
+
+
+class Summary(NamedTuple):
+    totals: GroupStats
+    by_crop: List[GroupStats]
+    by_soil: List[GroupStats]
+    transitions: List[Transition]
+
+
+class Analytics:
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+
+    def totals(self) -> GroupStats:
+        return GroupStats("All", *self.db.entry_stats())
+
+    def by_crop(self, limit: Optional[int] = None) -> List[GroupStats]:
+        """Entries and acreage per current crop, most entries first."""
+        return [GroupStats(*row) for row in self.db.stats_by("crop", limit)]
+
+    def by_soil(self, limit: Optional[int] = None) -> List[GroupStats]:
+        return [GroupStats(*row) for row in self.db.stats_by("soil", limit)]
+
+    def top_transitions(self, limit: int = 10) -> List[Transition]:
+        return [Transition(*row) for row in self.db.top_transitions(limit)]
+
+    def summary(self, limit: Optional[int] = 10) -> Summary:
+        return Summary(self.totals(), self.by_crop(limit), self.by_soil(limit), self.top_transitions(limit or 10))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarize saved recommendations.")
+    parser.add_argument("database", nargs="?", default="crop_assistant.db")
+    parser.add_argument("--top", type=int, default=10, help="Rows per table (default 10)")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.database)
+    try:
+        summary = Analytics(db).summary(args.top)
+    finally:
+        db.close()
+    totals = summary.totals
+    print(f"Entries: {totals.entries}  Acreage: {totals.acreage:.1f}  Rotation warnings: {totals.warning_rate:.1%}")
+    for title, groups in (("Current crop", summary.by_crop), ("Soil", summary.by_soil)):
+        print(f"\n{title:<20} {'Entries':>10} {'Acreage':>12} {'Warnings':>9}")
+        for group in groups:
+            print(f"{group.name or '(none)':<20} {group.entries:>10} {group.acreage:>12.1f} {group.warning_rate:>9.1%}")
+    print(f"\n{'Transition':<36} {'Entries':>10}")
+    for transition in summary.transitions:
+        label = f"{transition.previous_crop or '(none)'} → {transition.current_crop or '(none)'}"
+        print(f"{label:<36} {transition.entries:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+bench_memory.py - Bytes per crop for the different catalog representations.
+
+Usage:
+    python benchmarks/bench_memory.py [count]
+"""
+import os
+import sys
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from classes import CompactCrop, Crop  # noqa: E402
+from columnar import ColumnarCrops  # noqa: E402
+
+FAMILIES = ["cereal", "legume", "root", "vegetable", "oilseed", "fiber"]
+SOIL_PAIRS = ["Loamy,Clay", "Loamy,Sandy", "Clay,Silty", "Sandy,Loamy"]
+
+
+class DictCrop:
+    """Crop as it was before __slots__: a plain dict-backed object."""
+
+    def __init__(self, name, family, recommended_soil):
+        self.name = name
+        self.family = family
+        self.recommended_soil = recommended_soil
+
+
+def imported_rows(names):
+    # Build fresh family/soil strings per row, as a CSV/DB import would
+    for i, name in enumerate(names):
+        yield name, "".join(FAMILIES[i % len(FAMILIES)]), SOIL_PAIRS[i % len(SOIL_PAIRS)].split(",")
+
+
+def measure(build, count):
+    # Names are shared by every representation, so build them outside the measurement
+    names = [f"Cultivar {i}" for i in range(count)]
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build(imported_rows(names))
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, (after - before) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    cases = [
+        ("dict-backed Crop", lambda rows: [DictCrop(n, f, s) for n, f, s in rows]),
+        ("slotted Crop", lambda rows: [Crop(n, f, s) for n, f, s in rows]),
+        ("CompactCrop", lambda rows: [CompactCrop.create(n, f, s) for n, f, s in rows]),
+        ("ColumnarCrops", lambda rows: _columnar(rows)),
+    ]
+    print(f"{count} crops (bytes per crop, excluding the name string)")
+    for label, build in cases:
+        _, per_object = measure(build, count)
+        print(f"  {label:<18} {per_object:8.1f}")
+
+
+def _columnar(rows):
+    store = ColumnarCrops()
+    for name, family, soils in rows:
+        store.append(name, family, soils)
+    return store
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+bench_render.py - Report renders per second, with and without the fragment cache.
+
+Usage:
+    python benchmarks/bench_render.py [count]
+"""
+import itertools
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from catalog import CATALOG  # noqa: E402
+from engine import RecommendationEngine  # noqa: E402
+from renderer import Report, ReportRenderer  # noqa: E402
+
+
+def reports(count):
+    # Cycle through every crop/soil combination with varying farmland sizes
+    engine = RecommendationEngine()
+    combos = list(itertools.product(CATALOG.crop_names, CATALOG.crop_names, CATALOG.soil_types))
+    sizes = [1, 2.5, 4, 10, 25]
+    return [
+        Report.from_recommendation(engine.recommend(sizes[i % len(sizes)], *combos[i % len(combos)]))
+        for i in range(count)
+    ]
+
+
+def measure(render, items):
+    start = time.perf_counter()
+    for report in items:
+        render(report)
+    return len(items) / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 50_000
+    items = reports(count)
+    uncached = ReportRenderer(cache_size=0)
+    cached = ReportRenderer()
+    print(f"{count} reports (renders per second)")
+    for label, render in [
+        ("html, no cache", uncached.html),
+        ("html, cached", cached.html),
+        ("text, no cache", uncached.text),
+        ("text, cached", cached.text),
+    ]:
+        print(f"  {label:<16} {measure(render, items):12,.0f}")
+    print(f"  cache: {cached.cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+"""
+bench_startup.py - Cold start time of the GUI: import, catalog load, first paint and interactive.
+
+Every run is a fresh interpreter working on a copy of the database, once
+with the catalog snapshot in place and once without it:
+  - import: PyQt6 and the app modules
+  - catalog load: catalog and precomputed table ready for the first recommendation
+  - first paint: MainWindow() until its first paint event has been handled
+  - interactive: first paint until the database and engine are ready
+
+Usage:
+    python benchmarks/bench_startup.py [runs] [database]
+"""
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASES = ("import", "catalog load", "first paint", "interactive")
+
+
+def child(use_snapshot):
+    start = time.perf_counter()
+    from PyQt6.QtCore import QEvent, QObject
+    from PyQt6.QtWidgets import QApplication
+    import main_window
+    from catalog import CATALOG
+    from catalog_store import CatalogStore
+    from database import ConnectionManager, DatabaseManager
+    from engine import RecommendationEngine
+    from snapshot import Snapshot
+    imported = time.perf_counter()
+
+    db = DatabaseManager()
+    snapshot = Snapshot(db, None if use_snapshot else os.devnull)
+    store = CatalogStore(db)
+    snapshot.restore_catalog(store)
+    engine = RecommendationEngine(db=db)
+    snapshot.restore_table(engine.table)
+    engine.table.lookup(CATALOG.crop_names[0], CATALOG.crop_names[0], CATALOG.soil_types[0])
+    loaded = time.perf_counter()
+    if use_snapshot:
+        snapshot.save(store, engine.table)
+
+    class PaintWatcher(QObject):
+        painted = None
+
+        def eventFilter(self, obj, event):
+            if event.type() == QEvent.Type.Paint and self.painted is None:
+                self.painted = time.perf_counter()
+            return False
+
+    app = QApplication(sys.argv[:1])
+    window_start = time.perf_counter()
+    window = main_window.MainWindow()
+    watcher = PaintWatcher()
+    window.installEventFilter(watcher)
+    window.show()
+    while watcher.painted is None:
+        app.processEvents()
+    while window.db is None:
+        app.processEvents()
+    interactive = time.perf_counter()
+    window.shutdown()
+    ConnectionManager.close_all()
+    print(json.dumps([imported - start, loaded - imported, watcher.painted - window_start, interactive - watcher.painted]))
+
+
+def run(workdir, use_snapshot):
+    if not use_snapshot:
+        # MainWindow.shutdown() writes the snapshot in every run; start without one
+        snapshot = os.path.join(workdir, "crop_assistant.snapshot")
+        if os.path.exists(snapshot):
+            os.remove(snapshot)
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    output = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", str(int(use_snapshot))],
+        cwd=workdir, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    if sys.argv[1:2] == ["--child"]:
+        sys.path.insert(0, ROOT)
+        child(sys.argv[2] == "1")
+        return
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 5
+    source = sys.argv[2] if len(sys.argv) > 2 else None
+    with tempfile.TemporaryDirectory() as workdir:
+        if source:
+            shutil.copy(source, os.path.join(workdir, "crop_assistant.db"))
+        print(f"{runs} runs each (median ms)")
+        print(f"  {'':<14}" + "".join(f"{phase:>14}" for phase in PHASES))
+        for label, use_snapshot in [("no snapshot", False), ("snapshot", True)]:
+            # The first run creates the database and, with use_snapshot, writes the snapshot
+            run(workdir, use_snapshot)
+            timings = [run(workdir, use_snapshot) for _ in range(runs)]
+            medians = [statistics.median(t[i] for t in timings) * 1000 for i in range(len(PHASES))]
+            print(f"  {label:<14}" + "".join(f"{ms:14.1f}" for ms in medians))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""
+bulk_rotation.py - Vectorized rotation checks over integer-coded crops and families.
+
+Crops and families are encoded as small integer IDs so whole arrays of
+(previous, current) pairs can be checked at once with NumPy. Message strings
+are only built on demand for the rows that need them.
+
+Usage:
+    python bulk_rotation.py [crop_assistant.db]
+"""
+import sys
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from catalog import CATALOG, CropCatalog
+
+# Status codes returned by RotationCodebook.check
+STATUS_OK = 0
+STATUS_SAME_FAMILY = 1
+STATUS_UNKNOWN = 2
+
+# ID used for crops that are not in the codebook, and for "no alternative set"
+UNKNOWN_ID = -1
+
+
+class RotationCodebook:
+    def __init__(self, catalog: CropCatalog = CATALOG, resolver=None):
+        self.catalog = catalog
+        # Optional CropNameResolver; unknown spellings are resolved once and memoized
+        self.resolver = resolver
+        self.crop_names: List[str] = catalog.crop_names
+        self.crop_ids = {name.lower(): i for i, name in enumerate(self.crop_names)}
+        self.family_names: List[str] = catalog.families
+        self.family_ids = {name: i for i, name in enumerate(self.family_names)}
+
+        # crop id -> family id, with a trailing UNKNOWN_ID slot so that indexing
+        # with UNKNOWN_ID (-1) maps unknown crops to an unknown family.
+        self._crop_family = np.array(
+            [self.family_ids[c.family] for c in catalog.crops] + [UNKNOWN_ID],
+            dtype=np.int32,
+        )
+        # Raw name -> crop id, so repeated spellings are only lowercased once
+        self._codes: Dict[str, int] = {}
+
+    def code(self, name: Optional[str]) -> int:
+        """Crop ID of one name (any case, or a spelling the resolver knows); UNKNOWN_ID if none."""
+        try:
+            return self._codes[name]
+        except KeyError:
+            code = self.crop_ids.get((name or "").lower(), UNKNOWN_ID)
+            if code == UNKNOWN_ID and self.resolver is not None and name:
+                resolved = self.resolver.canonical(name)
+                code = self.crop_ids.get(resolved.lower(), UNKNOWN_ID) if resolved else UNKNOWN_ID
+            self._codes[name] = code
+            return code
+
+    def encode(self, names: Iterable[str]) -> np.ndarray:
+        """Map crop names to crop IDs; unknown names become UNKNOWN_ID."""
+        codes = self._codes
+        code = self.code
+        return np.fromiter((codes[name] if name in codes else code(name) for name in names), dtype=np.int32)
+
+    def translation(self, names_by_id: Dict[int, str]) -> np.ndarray:
+        """
+        Array mapping foreign crop ids (e.g. the database's) to crop IDs, so
+        id columns are encoded by indexing instead of name by name. Ids not
+        in `names_by_id` map to UNKNOWN_ID.
+        """
+        table = np.full(max(names_by_id, default=0) + 1, UNKNOWN_ID, dtype=np.int32)
+        for foreign_id, name in names_by_id.items():
+            table[foreign_id] = self.code(name)
+        return table
+
+    def families(self, crop_ids: np.ndarray) -> np.ndarray:
+        return self._crop_family[np.asarray(crop_ids, dtype=np.int32)]
+
+    def check(self, prev_ids: np.ndarray, curr_ids: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Check arrays of (previous, current) crop IDs.
+
+        Returns (status, alt_set) where status holds STATUS_* codes and alt_set
+        holds the family ID whose alternatives apply (UNKNOWN_ID if none).
+        """
+        prev_fam = self.families(prev_ids)
+        curr_fam = self.families(curr_ids)
+        unknown = (prev_fam == UNKNOWN_ID) | (curr_fam == UNKNOWN_ID)
+        same = (prev_fam == curr_fam) & ~unknown
+
+        status = np.full(prev_fam.shape, STATUS_OK, dtype=np.int8)
+        status[same] = STATUS_SAME_FAMILY
+        status[unknown] = STATUS_UNKNOWN
+        alt_set = np.where(same, prev_fam, UNKNOWN_ID).astype(np.int32)
+        return status, alt_set
+
+    def check_names(self, previous: Iterable[str], current: Iterable[str]) -> Tuple[np.ndarray, np.ndarray]:
+        return self.check(self.encode(previous), self.encode(current))
+
+    def alternatives(self, alt_set: int) -> List[str]:
+        """Crops from every other family, as check_rotation would list them."""
+        if alt_set == UNKNOWN_ID:
+            return []
+        return list(self.catalog.names_outside_family(self.family_names[alt_set]))
+
+    def message(self, status: int, previous_crop: str, current_crop: str) -> str:
+        """Build the check_rotation message for a single row."""
+        # Names are looked up like check_names did, so resolver spellings count as known
+        if status == STATUS_UNKNOWN:
+            prev_known = self.code(previous_crop) != UNKNOWN_ID
+            curr_known = self.code(current_crop) != UNKNOWN_ID
+            return f"❓ Unknown crop: {previous_crop if not prev_known else ''} {current_crop if not curr_known else ''}".strip()
+        if status == STATUS_SAME_FAMILY:
+            family = self.family_names[self._crop_family[self.code(previous_crop)]]
+            return f"⚠️ Avoid planting {current_crop} after {previous_crop} (same family: {family}). Choose an alternative."
+        return f"✅ Good rotation: {current_crop} after {previous_crop}."
+
+
+def audit_transitions(db, codebook: Optional[RotationCodebook] = None, batch_size: int = 100_000) -> Dict[str, int]:
+    """Count rotation statuses over every transition recorded in user_entries."""
+    codebook = codebook or RotationCodebook()
+    # Translate the stored crop ids as whole arrays; each distinct name is encoded once
+    to_codes = codebook.translation(db.crop_names_by_id())
+    counts = np.zeros(3, dtype=np.int64)
+    for batch in db.iter_transitions(batch_size):
+        # Crops added to the database since the lookup above count as unknown
+        pairs = np.array(batch, dtype=np.int64)
+        pairs[pairs >= len(to_codes)] = 0
+        codes = to_codes[pairs]
+        status, _ = codebook.check(codes[:, 0], codes[:, 1])
+        counts += np.bincount(status, minlength=3)
+    return {
+        "ok": int(counts[STATUS_OK]),
+        "same_family": int(counts[STATUS_SAME_FAMILY]),
+        "unknown": int(counts[STATUS_UNKNOWN]),
+    }
+
+
+def main(argv=None):
+    from database import DatabaseManager
+
+    argv = sys.argv[1:] if argv is None else argv
+    db = DatabaseManager(argv[0] if argv else "crop_assistant.db")
+    try:
+        summary = audit_transitions(db)
+    finally:
+        db.close()
+    for key, value in summary.items():
+        print(f"{key}: {value}")
+
+
+if __name__ == "__main__":
+    main()
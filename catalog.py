@@ -0,0 +1,113 @@
+"""
+catalog.py - Indexed crop/soil/technique catalog built from data.py.
+
+All lookups that used to scan CROPS or SOILS go through a CropCatalog, which
+keeps prebuilt indexes by name (case-insensitive), by family, by soil and by
+(family, soil).
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from classes import Crop, Soil, FarmingTechnique
+from data import CROPS, SOILS, TECHNIQUES
+
+
+class CropCatalog:
+    def __init__(
+        self,
+        crops: Iterable[Crop],
+        soils: Iterable[Soil] = (),
+        techniques: Iterable[FarmingTechnique] = (),
+    ):
+        self.crops: List[Crop] = []
+        self.soils: List[Soil] = []
+        self.techniques: List[FarmingTechnique] = []
+        self.update(crops, soils, techniques)
+
+    def update(
+        self,
+        crops: Optional[Iterable[Crop]] = None,
+        soils: Optional[Iterable[Soil]] = None,
+        techniques: Optional[Iterable[FarmingTechnique]] = None,
+    ):
+        """Replace some parts of the catalog in place, re-indexing only what they affect."""
+        if crops is not None:
+            self.crops = list(crops)
+            self._index_crops()
+        if soils is not None:
+            self.soils = list(soils)
+            self._soils_by_name = {}
+            for soil in self.soils:
+                self._soils_by_name.setdefault(soil.soil_type.lower(), soil)
+        if techniques is not None:
+            self.techniques = list(techniques)
+
+    def _index_crops(self):
+        self._crops_by_name: Dict[str, Crop] = {}
+        self._by_family: Dict[str, List[Crop]] = {}
+        self._by_soil: Dict[str, List[Crop]] = {}
+        self._by_family_soil: Dict[Tuple[str, str], List[Crop]] = {}
+        # Lazily filled: family -> names outside it, (soil, family) -> crops for soil outside it
+        self._outside_family: Dict[str, List[str]] = {}
+        self._rotation_candidates: Dict[Tuple[str, Optional[str]], List[Crop]] = {}
+
+        for crop in self.crops:
+            # First entry wins if a cultivar name is listed twice
+            self._crops_by_name.setdefault(crop.name.lower(), crop)
+            self._by_family.setdefault(crop.family, []).append(crop)
+            for soil_type in crop.recommended_soil:
+                self._by_soil.setdefault(soil_type, []).append(crop)
+                self._by_family_soil.setdefault((crop.family, soil_type), []).append(crop)
+
+    @classmethod
+    def from_data(cls) -> "CropCatalog":
+        return cls(CROPS, SOILS, TECHNIQUES)
+
+    @property
+    def crop_names(self) -> List[str]:
+        return [c.name for c in self.crops]
+
+    @property
+    def soil_types(self) -> List[str]:
+        return [s.soil_type for s in self.soils]
+
+    @property
+    def families(self) -> List[str]:
+        return list(self._by_family)
+
+    def crop(self, name: str) -> Optional[Crop]:
+        return self._crops_by_name.get((name or "").strip().lower())
+
+    def soil(self, soil_type: str) -> Optional[Soil]:
+        return self._soils_by_name.get((soil_type or "").strip().lower())
+
+    def family_of(self, crop_name: str) -> Optional[str]:
+        crop = self.crop(crop_name)
+        return crop.family if crop else None
+
+    def crops_in_family(self, family: str) -> List[Crop]:
+        return self._by_family.get(family, [])
+
+    def crops_for_soil(self, soil_type: str) -> List[Crop]:
+        return self._by_soil.get(soil_type, [])
+
+    def crops_for(self, family: str, soil_type: str) -> List[Crop]:
+        return self._by_family_soil.get((family, soil_type), [])
+
+    def names_outside_family(self, family: str) -> List[str]:
+        """Names of every crop not in `family`, in catalog order."""
+        if family not in self._outside_family:
+            self._outside_family[family] = [c.name for c in self.crops if c.family != family]
+        return self._outside_family[family]
+
+    def rotation_candidates(self, soil_type: str, exclude_family: Optional[str]) -> List[Crop]:
+        """Crops recommended for `soil_type` that are not in `exclude_family`, in catalog order."""
+        key = (soil_type, exclude_family)
+        if key not in self._rotation_candidates:
+            self._rotation_candidates[key] = [
+                c for c in self.crops_for_soil(soil_type) if c.family != exclude_family
+            ]
+        return self._rotation_candidates[key]
+
+
+# Shared catalog for the app, built once from data.py
+CATALOG = CropCatalog.from_data()
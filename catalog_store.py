@@ -0,0 +1,125 @@
+"""
+catalog_store.py - Crop/soil/technique catalog stored in crop_assistant.db, with hot reload.
+
+The reference data lives in the catalog_* tables (seeded from data.py by
+migration 4). Each part (crops, soils, techniques, families) has a change
+counter in catalog_versions that triggers bump on every write, so polling
+is one small query and only parts whose counter moved are read again.
+apply_catalog() updates the shared CATALOG and the rule tables in place and
+rebuilds only the indexes that depend on the changed parts.
+"""
+import json
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from catalog import CATALOG, CropCatalog
+from classes import Crop, FarmingTechnique, Soil
+from database import CATALOG_TABLES, DatabaseManager
+from logic import SoilRecommendationSystem, TechniqueSuggestion
+
+PARTS = tuple(CATALOG_TABLES)
+
+# Column positions holding JSON, per part
+JSON_COLUMNS = {"crops": (2,), "soils": (1,), "techniques": (2,), "families": (2,)}
+
+
+def _decode(part: str, row: Tuple) -> Tuple:
+    return tuple(json.loads(value) if i in JSON_COLUMNS[part] else value for i, value in enumerate(row))
+
+
+def _encode(part: str, row: Tuple) -> Tuple:
+    return tuple(json.dumps(value) if i in JSON_COLUMNS[part] else value for i, value in enumerate(row))
+
+
+def current_rows(part: str, catalog: CropCatalog = CATALOG) -> List[Tuple]:
+    """The running app's data for a part, in the same row shape as the database."""
+    if part == "crops":
+        return [(c.name, c.family, list(c.recommended_soil)) for c in catalog.crops]
+    if part == "soils":
+        return [(s.soil_type, dict(s.properties)) for s in catalog.soils]
+    if part == "techniques":
+        return [(t.name, t.description, list(t.suitable_soil)) for t in catalog.techniques]
+    fertilizer = SoilRecommendationSystem.FERTILIZER_RECOMMENDATIONS
+    techniques = TechniqueSuggestion.TECHS_BY_FAMILY
+    families = dict.fromkeys([*fertilizer, *techniques])
+    return [(f, fertilizer.get(f), list(techniques.get(f, []))) for f in families]
+
+
+class CatalogStore:
+    def __init__(self, db: DatabaseManager):
+        self.db = db
+        # Version of each part as of the last read, and the decoded rows
+        self.versions: Dict[str, int] = {}
+        self._rows: Dict[str, List[Tuple]] = {}
+
+    def changed_parts(self) -> List[str]:
+        versions = self.db.catalog_versions()
+        return [part for part in PARTS if versions.get(part) != self.versions.get(part)]
+
+    def poll(self) -> Dict[str, List[Tuple]]:
+        """Rows of every part changed since the last poll (all parts on the first call)."""
+        return {part: self._read(part) for part in self.changed_parts()}
+
+    @property
+    def rows(self) -> Dict[str, List[Tuple]]:
+        """Decoded rows of every part read so far."""
+        return dict(self._rows)
+
+    def restore(self, versions: Dict[str, int], rows: Dict[str, List[Tuple]]):
+        """Adopt rows read earlier (e.g. from a snapshot) as the state for `versions`."""
+        self.versions = dict(versions)
+        self._rows = {part: list(part_rows) for part, part_rows in rows.items()}
+
+    def load(self) -> Dict[str, List[Tuple]]:
+        """Rows of every part, re-reading only parts whose version moved."""
+        self.poll()
+        return dict(self._rows)
+
+    def _read(self, part: str) -> List[Tuple]:
+        version, rows = self.db.load_catalog_part(part)
+        self.versions[part] = version
+        self._rows[part] = [_decode(part, row) for row in rows]
+        return self._rows[part]
+
+    def save(self, part: str, rows: Iterable[Tuple]):
+        """Replace a part; running apps pick it up on their next poll."""
+        if part not in CATALOG_TABLES:
+            raise ValueError(f"Unknown catalog part: {part}")
+        self.db.replace_catalog_part(part, [_encode(part, tuple(row)) for row in rows])
+
+    def save_catalog(self, catalog: CropCatalog = CATALOG, parts: Iterable[str] = PARTS):
+        for part in parts:
+            self.save(part, current_rows(part, catalog))
+
+
+def apply_catalog(changes: Dict[str, List[Tuple]]) -> Set[str]:
+    """
+    Apply rows from CatalogStore.poll() to the running app (the shared CATALOG
+    and rule tables) and rebuild the indexes that depend on them. Returns the
+    parts whose contents differed.
+    """
+    changed = {part for part, rows in changes.items() if rows != current_rows(part)}
+
+    CATALOG.update(
+        crops=[Crop(*row) for row in changes["crops"]] if "crops" in changed else None,
+        soils=[Soil(*row) for row in changes["soils"]] if "soils" in changed else None,
+        techniques=[FarmingTechnique(*row) for row in changes["techniques"]] if "techniques" in changed else None,
+    )
+    if "families" in changed:
+        _apply_families(changes["families"])
+    if changed & {"soils", "techniques", "families"}:
+        TechniqueSuggestion.rebuild_index()
+    return changed
+
+
+def _apply_families(rows: List[Tuple[str, Optional[str], List[str]]]):
+    # Update the dicts in place: other modules hold references to them
+    fertilizer = SoilRecommendationSystem.FERTILIZER_RECOMMENDATIONS
+    techniques = TechniqueSuggestion.TECHS_BY_FAMILY
+    fertilizer.clear()
+    techniques.clear()
+    for family, advice, family_techniques in rows:
+        if advice:
+            fertilizer[family] = advice
+        if family_techniques:
+            techniques[family] = family_techniques
+    SoilRecommendationSystem.rebuild_fertilizer_table()
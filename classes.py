@@ -1,18 +1,132 @@
-from typing import List, Dict
+import sys
+from typing import List, Dict, Iterable, NamedTuple, Optional
 
 class Crop:
+    __slots__ = ("name", "family", "recommended_soil")
+
     def __init__(self, name: str, family: str, recommended_soil: List[str]):
         self.name = name
         self.family = family
         self.recommended_soil = recommended_soil
 
 class Soil:
+    __slots__ = ("soil_type", "properties")
+
     def __init__(self, soil_type: str, properties: Dict):
         self.soil_type = soil_type
         self.properties = properties
 
 class FarmingTechnique:
+    __slots__ = ("name", "description", "suitable_soil")
+
     def __init__(self, name: str, description: str, suitable_soil: List[str]):
         self.name = name
         self.description = description
         self.suitable_soil = suitable_soil
+
+
+# --- Compact, immutable variants for large catalogs -------------------------
+
+# Soil mask matching every soil type, used for the "All" wildcard
+ALL_SOILS = -1
+
+
+class SoilCodes:
+    """Assigns each soil type a bit so soil lists can be stored as one int."""
+
+    def __init__(self, soil_types: Iterable[str] = ()):
+        self._bits: Dict[str, int] = {}
+        self._names: List[str] = []
+        for soil_type in soil_types:
+            self.bit(soil_type)
+
+    def bit(self, soil_type: str) -> int:
+        if soil_type not in self._bits:
+            self._bits[soil_type] = 1 << len(self._names)
+            self._names.append(sys.intern(soil_type))
+        return self._bits[soil_type]
+
+    def mask(self, soil_types: Iterable[str]) -> int:
+        mask = 0
+        for soil_type in soil_types:
+            if soil_type == "All":
+                return ALL_SOILS
+            mask |= self.bit(soil_type)
+        return mask
+
+    def matches(self, mask: int, soil_type: str) -> bool:
+        return mask == ALL_SOILS or bool(mask & self._bits.get(soil_type, 0))
+
+    def names(self, mask: int) -> List[str]:
+        if mask == ALL_SOILS:
+            return ["All"]
+        return [name for i, name in enumerate(self._names) if mask >> i & 1]
+
+
+# Shared registry so masks from different objects are comparable
+SOIL_CODES = SoilCodes(["Sandy", "Clay", "Silty", "Peaty", "Chalky", "Loamy"])
+
+
+class CompactCrop(NamedTuple):
+    name: str
+    family: str
+    soil_mask: int
+
+    @classmethod
+    def create(cls, name: str, family: str, recommended_soil: Iterable[str]) -> "CompactCrop":
+        return cls(name, sys.intern(family), SOIL_CODES.mask(recommended_soil))
+
+    @classmethod
+    def from_crop(cls, crop: Crop) -> "CompactCrop":
+        return cls.create(crop.name, crop.family, crop.recommended_soil)
+
+    @property
+    def recommended_soil(self) -> List[str]:
+        return SOIL_CODES.names(self.soil_mask)
+
+    def suits(self, soil_type: str) -> bool:
+        return SOIL_CODES.matches(self.soil_mask, soil_type)
+
+
+class CompactSoil(NamedTuple):
+    soil_type: str
+    drainage: Optional[str] = None
+    fertility: Optional[str] = None
+    pH: Optional[str] = None
+    organic: bool = False
+
+    @classmethod
+    def from_soil(cls, soil: Soil) -> "CompactSoil":
+        props = soil.properties
+        return cls(
+            sys.intern(soil.soil_type),
+            sys.intern(props["drainage"]) if props.get("drainage") else None,
+            sys.intern(props["fertility"]) if props.get("fertility") else None,
+            sys.intern(props["pH"]) if props.get("pH") else None,
+            bool(props.get("organic", False)),
+        )
+
+    @property
+    def properties(self) -> Dict:
+        props = {"drainage": self.drainage, "fertility": self.fertility, "pH": self.pH}
+        props = {key: value for key, value in props.items() if value is not None}
+        if self.organic:
+            props["organic"] = True
+        return props
+
+
+class CompactTechnique(NamedTuple):
+    name: str
+    description: str
+    soil_mask: int
+
+    @classmethod
+    def from_technique(cls, technique: FarmingTechnique) -> "CompactTechnique":
+        return cls(technique.name, technique.description, SOIL_CODES.mask(technique.suitable_soil))
+
+    @property
+    def suitable_soil(self) -> List[str]:
+        return SOIL_CODES.names(self.soil_mask)
+
+    def suits(self, soil_type: str) -> bool:
+        return SOIL_CODES.matches(self.soil_mask, soil_type)
@@ -0,0 +1,63 @@
+"""
+columnar.py - Parallel-array storage for bulk crop catalogs.
+
+Instead of one Python object per cultivar, ColumnarCrops keeps a list of
+names plus packed arrays of family IDs and soil bitmasks. Rows are turned
+into CompactCrop tuples only when they are accessed.
+"""
+import sys
+from array import array
+from typing import Dict, Iterable, Iterator, List, MutableSequence
+
+from classes import SOIL_CODES, CompactCrop, Crop
+
+
+class ColumnarCrops:
+    def __init__(self):
+        self.names: List[str] = []
+        self.family_ids = array("H")
+        # Packed while every mask fits 64 bits (up to 63 soil types plus ALL_SOILS)
+        self.soil_masks: MutableSequence[int] = array("q")
+        self.family_names: List[str] = []
+        self._family_ids: Dict[str, int] = {}
+
+    @classmethod
+    def from_crops(cls, crops: Iterable[Crop]) -> "ColumnarCrops":
+        store = cls()
+        for crop in crops:
+            store.append(crop.name, crop.family, crop.recommended_soil)
+        return store
+
+    def append(self, name: str, family: str, recommended_soil: Iterable[str]):
+        if family not in self._family_ids:
+            self._family_ids[family] = len(self.family_names)
+            self.family_names.append(sys.intern(family))
+        self.names.append(name)
+        self.family_ids.append(self._family_ids[family])
+        mask = SOIL_CODES.mask(recommended_soil)
+        try:
+            self.soil_masks.append(mask)
+        except OverflowError:
+            # A soil type past the 63rd: keep the masks as Python ints from now on
+            self.soil_masks = list(self.soil_masks)
+            self.soil_masks.append(mask)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, index: int) -> CompactCrop:
+        return CompactCrop(self.names[index], self.family_names[self.family_ids[index]], self.soil_masks[index])
+
+    def __iter__(self) -> Iterator[CompactCrop]:
+        for i in range(len(self.names)):
+            yield self[i]
+
+    def indices_for_soil(self, soil_type: str) -> List[int]:
+        """Row numbers of crops recommended for `soil_type`."""
+        return [i for i, mask in enumerate(self.soil_masks) if SOIL_CODES.matches(mask, soil_type)]
+
+    def indices_for_family(self, family: str) -> List[int]:
+        family_id = self._family_ids.get(family)
+        if family_id is None:
+            return []
+        return [i for i, fid in enumerate(self.family_ids) if fid == family_id]
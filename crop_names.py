@@ -0,0 +1,147 @@
+"""
+crop_names.py - Fuzzy resolution of free-text crop names to catalog crops.
+
+Names are tried in order of confidence:
+  exact       catalog name, any case                           1.0
+  alias       data.CROP_ALIASES (corn -> Maize, ...)             1.0
+  normalized  punctuation, spacing and plurals removed         0.95
+  fuzzy       closest name/alias by trigram index + similarity  ratio
+Results are cached per raw name, so repeated spellings in large imports
+cost a single dict lookup.
+"""
+import re
+from difflib import SequenceMatcher
+from functools import lru_cache
+from typing import Dict, Iterable, List, NamedTuple, Optional
+
+from catalog import CATALOG, CropCatalog
+from data import CROP_ALIASES
+
+NORMALIZED_CONFIDENCE = 0.95
+
+# Fuzzy candidates (by shared trigrams) re-scored with SequenceMatcher
+FUZZY_CANDIDATES = 5
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+class NameMatch(NamedTuple):
+    query: str
+    name: str
+    confidence: float
+    method: str
+
+
+def normalize(name: str) -> str:
+    """Lowercase, strip punctuation/extra spaces and naive plural endings."""
+    words = _NON_ALNUM.sub(" ", (name or "").lower()).split()
+    return " ".join(_singular(word) for word in words)
+
+
+def _singular(word: str) -> str:
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith("oes"):
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def trigrams(key: str) -> List[str]:
+    padded = f"  {key} "
+    return [padded[i:i + 3] for i in range(len(padded) - 2)]
+
+
+class CropNameResolver:
+    def __init__(
+        self,
+        catalog: CropCatalog = CATALOG,
+        aliases: Optional[Dict[str, str]] = None,
+        min_confidence: float = 0.8,
+        cache_size: Optional[int] = 100_000,
+    ):
+        self.catalog = catalog
+        self.min_confidence = min_confidence
+        self.aliases = CROP_ALIASES if aliases is None else aliases
+        self.cache_size = cache_size
+        self.rebuild()
+
+    def rebuild(self):
+        """Re-index names and aliases, e.g. after the catalog was reloaded."""
+        self._exact: Dict[str, str] = {}
+        self._aliases: Dict[str, str] = {}
+        # Normalized name or alias -> crop name, plus the trigram index over those keys
+        self._normalized: Dict[str, str] = {}
+        self._keys: List[str] = []
+        self._index: Dict[str, List[int]] = {}
+
+        for crop in self.catalog.crops:
+            self._exact.setdefault(crop.name.lower(), crop.name)
+            self._add_key(normalize(crop.name), crop.name)
+        for alias, name in self.aliases.items():
+            crop = self.catalog.crop(name)
+            if crop is None:
+                continue
+            self._aliases.setdefault(alias.strip().lower(), crop.name)
+            self._add_key(normalize(alias), crop.name)
+
+        self._match = lru_cache(maxsize=self.cache_size)(self._lookup)
+
+    def _add_key(self, key: str, name: str):
+        if not key or key in self._normalized:
+            return
+        self._normalized[key] = name
+        position = len(self._keys)
+        self._keys.append(key)
+        for gram in set(trigrams(key)):
+            self._index.setdefault(gram, []).append(position)
+
+    def match(self, name: str) -> Optional[NameMatch]:
+        """Best match for `name` regardless of confidence, or None if nothing is similar."""
+        return self._match(name)
+
+    def resolve(self, name: str) -> Optional[NameMatch]:
+        """Best match if its confidence reaches min_confidence."""
+        found = self._match(name)
+        if found is None or found.confidence < self.min_confidence:
+            return None
+        return found
+
+    def canonical(self, name: str) -> Optional[str]:
+        found = self.resolve(name)
+        return found.name if found else None
+
+    def resolve_many(self, names: Iterable[str]) -> List[Optional[NameMatch]]:
+        return [self.resolve(name) for name in names]
+
+    def cache_info(self):
+        return self._match.cache_info()
+
+    def _lookup(self, name: str) -> Optional[NameMatch]:
+        raw = (name or "").strip().lower()
+        if raw in self._exact:
+            return NameMatch(name, self._exact[raw], 1.0, "exact")
+        if raw in self._aliases:
+            return NameMatch(name, self._aliases[raw], 1.0, "alias")
+        key = normalize(raw)
+        if not key:
+            return None
+        if key in self._normalized:
+            return NameMatch(name, self._normalized[key], NORMALIZED_CONFIDENCE, "normalized")
+        return self._fuzzy(name, key)
+
+    def _fuzzy(self, name: str, key: str) -> Optional[NameMatch]:
+        shared: Dict[int, int] = {}
+        for gram in set(trigrams(key)):
+            for position in self._index.get(gram, ()):
+                shared[position] = shared.get(position, 0) + 1
+        if not shared:
+            return None
+        candidates = sorted(shared, key=lambda position: -shared[position])[:FUZZY_CANDIDATES]
+        best_ratio, best_key = max(
+            (SequenceMatcher(None, key, self._keys[position]).ratio(), self._keys[position])
+            for position in candidates
+        )
+        return NameMatch(name, self._normalized[best_key], round(best_ratio, 3), "fuzzy")
+
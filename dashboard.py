@@ -0,0 +1,125 @@
+"""
+dashboard.py - Window summarizing the saved recommendations.
+
+Reads the trigger-maintained summary tables through analytics.Analytics, so
+refreshing costs the same however many entries are logged; it refreshes
+every few seconds while shown.
+"""
+from PyQt6.QtWidgets import (
+    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableWidget,
+    QTableWidgetItem, QLabel, QHeaderView
+)
+from PyQt6.QtCore import QSize, QTimer, Qt
+
+from analytics import Analytics
+
+REFRESH_MS = 5000
+TOP_ROWS = 10
+
+
+class DashboardWindow(QMainWindow):
+    def __init__(self, main_window):
+        super().__init__()
+        self.setWindowTitle("Recommendation Dashboard")
+        self.setMinimumSize(QSize(1100, 500))
+        self.main_window = main_window
+        self.analytics = Analytics(main_window.db)
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+        self._init_ui()
+
+    def _init_ui(self):
+        widget = QWidget()
+        layout = QVBoxLayout()
+
+        layout.addWidget(QLabel("<b>Recommendation Dashboard</b>"))
+        self.totals_label = QLabel()
+        layout.addWidget(self.totals_label)
+
+        tables_layout = QHBoxLayout()
+        self.crop_table = self._table(["Current Crop", "Entries", "Acreage", "Warnings"])
+        self.soil_table = self._table(["Soil Type", "Entries", "Acreage", "Warnings"])
+        self.transition_table = self._table(["Transition", "Entries", "Warnings"])
+        for title, table in (
+            ("Entries per crop", self.crop_table),
+            ("Entries per soil", self.soil_table),
+            ("Most common transitions", self.transition_table),
+        ):
+            column = QVBoxLayout()
+            column.addWidget(QLabel(title))
+            column.addWidget(table)
+            tables_layout.addLayout(column)
+        layout.addLayout(tables_layout)
+
+        self.back_btn = QPushButton("Back")
+        self.back_btn.clicked.connect(self.go_back)
+        layout.addWidget(self.back_btn)
+
+        widget.setLayout(layout)
+        self.setCentralWidget(widget)
+
+        # Same light theme as the logs window
+        self.setStyleSheet("""
+            QMainWindow { background-color: #f4fff8; }
+            QLabel { color: #2f4f4f; font-size: 14px; }
+            QTableWidget { background: #ffffff; border: 1px solid #a3c293; color: #000000; }
+            QTableWidget::item { color: #000000; }
+            QPushButton {
+                background-color: #4CAF50; color: white; padding: 6px 12px;
+                border-radius: 6px; font-size: 14px;
+            }
+            QPushButton:hover { background-color: #45a049; }
+        """)
+
+    @staticmethod
+    def _table(headers):
+        table = QTableWidget(0, len(headers))
+        table.setHorizontalHeaderLabels(headers)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QTableWidget.EditTrigger.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        return table
+
+    @staticmethod
+    def _fill(table, rows):
+        table.setRowCount(len(rows))
+        for r, row in enumerate(rows):
+            for c, value in enumerate(row):
+                item = QTableWidgetItem(value)
+                if c:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter)
+                table.setItem(r, c, item)
+
+    def refresh(self):
+        summary = self.analytics.summary(TOP_ROWS)
+        totals = summary.totals
+        self.totals_label.setText(
+            f"Entries: {totals.entries:,}    Total acreage: {totals.acreage:,.1f}    "
+            f"Rotation warnings: {totals.warning_rate:.1%}"
+        )
+        for table, groups in ((self.crop_table, summary.by_crop), (self.soil_table, summary.by_soil)):
+            self._fill(table, [
+                (group.name or "(none)", f"{group.entries:,}", f"{group.acreage:,.1f}", f"{group.warning_rate:.1%}")
+                for group in groups
+            ])
+        self._fill(self.transition_table, [
+            (
+                f"{t.previous_crop or '(none)'} → {t.current_crop or '(none)'}",
+                f"{t.entries:,}", f"{t.warnings / t.entries if t.entries else 0:.1%}",
+            )
+            for t in summary.transitions
+        ])
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.refresh()
+        self.refresh_timer.start()
+
+    def hideEvent(self, event):
+        super().hideEvent(event)
+        self.refresh_timer.stop()
+
+    def go_back(self):
+        self.main_window.show()
+        self.close()
@@ -44,3 +44,55 @@ TECHNIQUES = [
     FarmingTechnique("Mulching", "Surface layer to retain moisture and reduce weeds.", ["Sandy", "Loamy"]),
     FarmingTechnique("Crop Rotation", "Alternate crops to break pest cycles and balance nutrients.", ["All"]),
 ]
+
+# Per-family fertilizer advice and technique lists
+FAMILY_FERTILIZER = {
+    "cereal": "NPK 15:15:15 (~200 kg/ha) + Urea top-dress.",
+    "legume": "Low N required; apply SSP (P source).",
+    "root": "Higher K demand: MOP + well-decomposed compost.",
+    "vegetable": "Balanced NPK 20:10:10 + organic compost.",
+    "oilseed": "Balanced NPK + Boron supplement.",
+    "fiber": "Nitrogen and Potassium priority; moderate Phosphorus.",
+}
+
+FAMILY_TECHNIQUES = {
+    "cereal": ["Drip irrigation", "Precision planting"],
+    "legume": ["Intercropping with cereals", "Mulching"],
+    "root": ["Ridging", "Soil moisture monitoring"],
+    "vegetable": ["Fertigation system", "Greenhouse/shade-net (if possible)"],
+    "oilseed": ["Integrated pest management", "Rotate with legumes"],
+    "fiber": ["Irrigation scheduling", "Regular soil testing"],
+}
+
+# Soil management rules: advice applies when every "when" attribute matches
+# (soil properties, soil_type, family, previous_family, same_family); lists mean "any of"
+SOIL_RULES = [
+    {"name": "low-fertility", "when": {"fertility": "low"}, "advice": "Incorporate compost/manure to boost fertility."},
+    {"name": "high-fertility", "when": {"fertility": "high"}, "advice": "Maintain fertility with residues/cover crops."},
+    {"name": "fast-drainage", "when": {"drainage": "fast"}, "advice": "Use mulch and drip to reduce water loss."},
+    {"name": "slow-drainage", "when": {"drainage": "slow"}, "advice": "Create raised beds/ridges and avoid over-irrigation."},
+]
+
+# Local, regional and common alternative names -> catalog crop name
+CROP_ALIASES = {
+    "corn": "Maize",
+    "sweetcorn": "Maize",
+    "paddy": "Rice",
+    "soya": "Soybean",
+    "soya bean": "Soybean",
+    "soy": "Soybean",
+    "groundnut": "Peanut",
+    "ground nut": "Peanut",
+    "monkey nut": "Peanut",
+    "garbanzo": "Chickpea",
+    "chick pea": "Chickpea",
+    "bengal gram": "Chickpea",
+    "dal": "Lentil",
+    "manioc": "Cassava",
+    "tapioca": "Cassava",
+    "yuca": "Cassava",
+    "irish potato": "Potato",
+    "white potato": "Potato",
+    "mustard greens": "Mustard",
+    "cotton seed": "Cotton",
+}
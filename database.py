@@ -1,29 +1,751 @@
 """
 database.py - Handles SQLite operations and data persistence for the application.
+
+The schema is versioned with PRAGMA user_version; MIGRATIONS upgrades older
+crop_assistant.db files in place when a DatabaseManager opens them.
 """
+import atexit
+import hashlib
+import json
+import os
+import queue
 import sqlite3
-from typing import Any, List, Tuple
+import threading
+from contextlib import contextmanager
+from itertools import islice
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+SYNCHRONOUS_MODES = ("OFF", "NORMAL", "FULL", "EXTRA")
+JOURNAL_MODES = ("DELETE", "TRUNCATE", "PERSIST", "MEMORY", "WAL", "OFF")
+
+# Columns shown in the logs window, in display order
+LOG_COLUMNS = [
+    "farmland_size", "previous_crop", "current_crop", "soil_type",
+    "recommendation", "fertilizer", "techniques",
+]
+
+# Row shape returned by the read APIs: (id, *LOG_COLUMNS)
+ENTRY_COLUMNS = "id, " + ", ".join(LOG_COLUMNS)
+
+# Lookup tables keyed by name
+LOOKUP_TABLES = ("crops", "soils", "techniques")
+
+# Most payload texts (text -> id) kept in memory by the write path
+PAYLOAD_CACHE_SIZE = 1024
+
+# Reference catalog: part -> (table, columns); list/dict columns hold JSON
+CATALOG_TABLES = {
+    "crops": ("catalog_crops", ("name", "family", "recommended_soil")),
+    "soils": ("catalog_soils", ("soil_type", "properties")),
+    "techniques": ("catalog_techniques", ("name", "description", "suitable_soil")),
+    "families": ("catalog_families", ("family", "fertilizer", "techniques")),
+}
+
+
+# --- Migrations --------------------------------------------------------------
+
+def _migrate_1_initial(conn: sqlite3.Connection):
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS user_entries (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            farmland_size REAL,
+            previous_crop TEXT,
+            current_crop TEXT,
+            soil_type TEXT,
+            recommendation TEXT,
+            fertilizer TEXT,
+            techniques TEXT
+        )
+    ''')
+
+
+def _migrate_2_normalize(conn: sqlite3.Connection):
+    """Move crop/soil/technique names into lookup tables referenced by id."""
+    for table in LOOKUP_TABLES:
+        conn.execute(f'''
+            CREATE TABLE {table} (
+                id INTEGER PRIMARY KEY,
+                name TEXT NOT NULL UNIQUE
+            )
+        ''')
+    conn.execute('''
+        INSERT OR IGNORE INTO crops (name)
+        SELECT previous_crop FROM user_entries WHERE previous_crop IS NOT NULL
+        UNION SELECT current_crop FROM user_entries WHERE current_crop IS NOT NULL
+    ''')
+    conn.execute('''
+        INSERT OR IGNORE INTO soils (name)
+        SELECT DISTINCT soil_type FROM user_entries WHERE soil_type IS NOT NULL
+    ''')
+
+    conn.execute('''
+        CREATE TABLE user_entries_v2 (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            farmland_size REAL,
+            previous_crop_id INTEGER REFERENCES crops(id),
+            current_crop_id INTEGER REFERENCES crops(id),
+            soil_id INTEGER REFERENCES soils(id),
+            recommendation TEXT,
+            fertilizer TEXT,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.execute('''
+        INSERT INTO user_entries_v2 (
+            id, farmland_size, previous_crop_id, current_crop_id, soil_id,
+            recommendation, fertilizer, created_at
+        )
+        SELECT e.id, e.farmland_size, pc.id, cc.id, s.id, e.recommendation, e.fertilizer, NULL
+        FROM user_entries e
+        LEFT JOIN crops pc ON pc.name = e.previous_crop
+        LEFT JOIN crops cc ON cc.name = e.current_crop
+        LEFT JOIN soils s ON s.name = e.soil_type
+    ''')
+
+    conn.execute('''
+        CREATE TABLE entry_techniques (
+            entry_id INTEGER NOT NULL REFERENCES user_entries(id) ON DELETE CASCADE,
+            position INTEGER NOT NULL,
+            technique_id INTEGER NOT NULL REFERENCES techniques(id),
+            PRIMARY KEY (entry_id, position)
+        ) WITHOUT ROWID
+    ''')
+    # Split the old comma-joined techniques column; streamed so large files stay flat
+    technique_ids: Dict[str, int] = {}
+    rows = conn.execute("SELECT id, techniques FROM user_entries WHERE techniques IS NOT NULL AND techniques != ''")
+    while True:
+        batch = rows.fetchmany(10_000)
+        if not batch:
+            break
+        links = []
+        for entry_id, techniques in batch:
+            for position, name in enumerate(_split_techniques(techniques)):
+                if name not in technique_ids:
+                    conn.execute("INSERT OR IGNORE INTO techniques (name) VALUES (?)", (name,))
+                    technique_ids[name] = conn.execute("SELECT id FROM techniques WHERE name = ?", (name,)).fetchone()[0]
+                links.append((entry_id, position, technique_ids[name]))
+        conn.executemany("INSERT INTO entry_techniques (entry_id, position, technique_id) VALUES (?, ?, ?)", links)
+
+    conn.execute("DROP TABLE user_entries")
+    conn.execute("ALTER TABLE user_entries_v2 RENAME TO user_entries")
+    conn.execute("CREATE INDEX idx_user_entries_crop_soil ON user_entries (current_crop_id, soil_id)")
+    conn.execute("CREATE INDEX idx_user_entries_created_at ON user_entries (created_at)")
+
+    # Denormalized view with the original column names for readers
+    conn.execute('''
+        CREATE VIEW user_entries_view AS
+        SELECT
+            e.id,
+            e.farmland_size,
+            pc.name AS previous_crop,
+            cc.name AS current_crop,
+            s.name AS soil_type,
+            e.recommendation,
+            e.fertilizer,
+            (
+                SELECT group_concat(name, ', ') FROM (
+                    SELECT t.name FROM entry_techniques et
+                    JOIN techniques t ON t.id = et.technique_id
+                    WHERE et.entry_id = e.id
+                    ORDER BY et.position
+                )
+            ) AS techniques,
+            e.created_at
+        FROM user_entries e
+        LEFT JOIN crops pc ON pc.id = e.previous_crop_id
+        LEFT JOIN crops cc ON cc.id = e.current_crop_id
+        LEFT JOIN soils s ON s.id = e.soil_id
+    ''')
+
+
+def _migrate_3_precomputed(conn: sqlite3.Connection):
+    # Full recommendation table per catalog version (see precompute.py)
+    conn.execute('''
+        CREATE TABLE IF NOT EXISTS precomputed_recommendations (
+            catalog_hash TEXT NOT NULL,
+            previous_crop TEXT NOT NULL,
+            current_crop TEXT NOT NULL,
+            soil_type TEXT NOT NULL,
+            payload TEXT NOT NULL,
+            PRIMARY KEY (catalog_hash, previous_crop, current_crop, soil_type)
+        ) WITHOUT ROWID
+    ''')
+
+
+def _migrate_4_catalog(conn: sqlite3.Connection):
+    # Reference data formerly hard-coded in data.py/logic.py, seeded from them.
+    # Rows keep their order in `position`; every change bumps the part's version.
+    from data import CROPS, FAMILY_FERTILIZER, FAMILY_TECHNIQUES, SOILS, TECHNIQUES
+
+    # One statement per execute(): executescript() would commit the migration's transaction
+    conn.execute('''
+        CREATE TABLE catalog_crops (
+            position INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+            family TEXT NOT NULL,
+            recommended_soil TEXT NOT NULL DEFAULT '[]'
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE catalog_soils (
+            position INTEGER PRIMARY KEY,
+            soil_type TEXT NOT NULL UNIQUE COLLATE NOCASE,
+            properties TEXT NOT NULL DEFAULT '{}'
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE catalog_techniques (
+            position INTEGER PRIMARY KEY,
+            name TEXT NOT NULL UNIQUE COLLATE NOCASE,
+            description TEXT NOT NULL DEFAULT '',
+            suitable_soil TEXT NOT NULL DEFAULT '[]'
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE catalog_families (
+            position INTEGER PRIMARY KEY,
+            family TEXT NOT NULL UNIQUE,
+            fertilizer TEXT,
+            techniques TEXT NOT NULL DEFAULT '[]'
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE catalog_versions (
+            part TEXT PRIMARY KEY,
+            version INTEGER NOT NULL DEFAULT 0
+        )
+    ''')
+    for part, (table, _) in CATALOG_TABLES.items():
+        conn.execute("INSERT INTO catalog_versions (part, version) VALUES (?, 0)", (part,))
+        for op in ("INSERT", "UPDATE", "DELETE"):
+            conn.execute(f'''
+                CREATE TRIGGER {table}_{op.lower()} AFTER {op} ON {table}
+                BEGIN
+                    UPDATE catalog_versions SET version = version + 1 WHERE part = '{part}';
+                END
+            ''')
+
+    conn.executemany(
+        "INSERT INTO catalog_crops (name, family, recommended_soil) VALUES (?, ?, ?)",
+        [(c.name, c.family, json.dumps(c.recommended_soil)) for c in CROPS],
+    )
+    conn.executemany(
+        "INSERT INTO catalog_soils (soil_type, properties) VALUES (?, ?)",
+        [(s.soil_type, json.dumps(s.properties)) for s in SOILS],
+    )
+    conn.executemany(
+        "INSERT INTO catalog_techniques (name, description, suitable_soil) VALUES (?, ?, ?)",
+        [(t.name, t.description, json.dumps(t.suitable_soil)) for t in TECHNIQUES],
+    )
+    families = list(dict.fromkeys([*FAMILY_FERTILIZER, *FAMILY_TECHNIQUES]))
+    conn.executemany(
+        "INSERT INTO catalog_families (family, fertilizer, techniques) VALUES (?, ?, ?)",
+        [(f, FAMILY_FERTILIZER.get(f), json.dumps(FAMILY_TECHNIQUES.get(f, []))) for f in families],
+    )
+
+
+# Summary tables kept up to date by triggers on user_entries: table -> key columns and
+# the user_entries values they hold. Missing crops/soils are counted under id 0.
+STATS_TABLES = {
+    "stats_by_crop": (("crop_id",), ("IFNULL({row}.current_crop_id, 0)",)),
+    "stats_by_soil": (("soil_id",), ("IFNULL({row}.soil_id, 0)",)),
+    "stats_transitions": (
+        ("previous_crop_id", "current_crop_id"),
+        ("IFNULL({row}.previous_crop_id, 0)", "IFNULL({row}.current_crop_id, 0)"),
+    ),
+}
+
+# A saved recommendation starting with the warning sign is a rejected rotation
+WARNING_SQL = (
+    "IFNULL((SELECT substr(p.text, 1, 1) = '\u26a0' FROM payloads p WHERE p.id = {row}.recommendation_id), 0)"
+)
+# The same before migration 8, when user_entries held the text itself
+WARNING_TEXT_SQL = "IFNULL(substr({row}.recommendation, 1, 1) = '\u26a0', 0)"
+
+
+def _stats_add(row: str, warning_sql: str = WARNING_SQL) -> str:
+    """Trigger statements counting the user_entries row `row` (NEW or OLD) in every summary."""
+    warning = warning_sql.format(row=row)
+    acreage = f"IFNULL({row}.farmland_size, 0)"
+    statements = [
+        f"UPDATE stats_totals SET entries = entries + 1, warnings = warnings + {warning}, acreage = acreage + {acreage};"
+    ]
+    for table, (keys, values) in STATS_TABLES.items():
+        statements.append(f'''
+            INSERT INTO {table} ({", ".join(keys)}, entries, warnings, acreage)
+            VALUES ({", ".join(value.format(row=row) for value in values)}, 1, {warning}, {acreage})
+            ON CONFLICT ({", ".join(keys)}) DO UPDATE SET
+                entries = entries + 1,
+                warnings = warnings + excluded.warnings,
+                acreage = acreage + excluded.acreage;
+        ''')
+    return "\n".join(statements)
+
+
+def _stats_remove(row: str, warning_sql: str = WARNING_SQL) -> str:
+    """Trigger statements taking the user_entries row `row` back out of every summary."""
+    warning = warning_sql.format(row=row)
+    acreage = f"IFNULL({row}.farmland_size, 0)"
+    statements = [
+        f"UPDATE stats_totals SET entries = entries - 1, warnings = warnings - {warning}, acreage = acreage - {acreage};"
+    ]
+    for table, (keys, values) in STATS_TABLES.items():
+        match = " AND ".join(f"{key} = {value.format(row=row)}" for key, value in zip(keys, values))
+        statements.append(f'''
+            UPDATE {table} SET entries = entries - 1, warnings = warnings - {warning}, acreage = acreage - {acreage}
+            WHERE {match};
+        ''')
+        statements.append(f"DELETE FROM {table} WHERE {match} AND entries <= 0;")
+    return "\n".join(statements)
+
+
+def _create_stats(conn: sqlite3.Connection, warning_sql: str = WARNING_SQL):
+    """(Re)fill the summary tables from user_entries."""
+    warning = warning_sql.format(row="e")
+    conn.execute("DELETE FROM stats_totals")
+    conn.execute(f'''
+        INSERT INTO stats_totals (id, entries, warnings, acreage)
+        SELECT 1, count(*), IFNULL(sum({warning}), 0), IFNULL(sum(IFNULL(e.farmland_size, 0)), 0)
+        FROM user_entries e
+    ''')
+    for table, (keys, values) in STATS_TABLES.items():
+        columns = [value.format(row="e") for value in values]
+        conn.execute(f"DELETE FROM {table}")
+        conn.execute(f'''
+            INSERT INTO {table} ({", ".join(keys)}, entries, warnings, acreage)
+            SELECT {", ".join(columns)}, count(*), sum({warning}), sum(IFNULL(e.farmland_size, 0))
+            FROM user_entries e
+            GROUP BY {", ".join(columns)}
+        ''')
+
+
+def _migrate_5_analytics(conn: sqlite3.Connection):
+    # Aggregates for the dashboard, maintained per row so reads never scan user_entries
+    conn.execute('''
+        CREATE TABLE stats_totals (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            entries INTEGER NOT NULL DEFAULT 0,
+            warnings INTEGER NOT NULL DEFAULT 0,
+            acreage REAL NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE stats_by_crop (
+            crop_id INTEGER PRIMARY KEY,
+            entries INTEGER NOT NULL DEFAULT 0,
+            warnings INTEGER NOT NULL DEFAULT 0,
+            acreage REAL NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE stats_by_soil (
+            soil_id INTEGER PRIMARY KEY,
+            entries INTEGER NOT NULL DEFAULT 0,
+            warnings INTEGER NOT NULL DEFAULT 0,
+            acreage REAL NOT NULL DEFAULT 0
+        )
+    ''')
+    conn.execute('''
+        CREATE TABLE stats_transitions (
+            previous_crop_id INTEGER NOT NULL,
+            current_crop_id INTEGER NOT NULL,
+            entries INTEGER NOT NULL DEFAULT 0,
+            warnings INTEGER NOT NULL DEFAULT 0,
+            acreage REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (previous_crop_id, current_crop_id)
+        ) WITHOUT ROWID
+    ''')
+    _create_stats(conn, WARNING_TEXT_SQL)
+    _create_stats_triggers(conn, WARNING_TEXT_SQL, "recommendation")
+
+
+def _create_stats_triggers(conn: sqlite3.Connection, warning_sql: str, recommendation_column: str):
+    conn.execute(f'''
+        CREATE TRIGGER user_entries_stats_insert AFTER INSERT ON user_entries
+        BEGIN
+            {_stats_add("NEW", warning_sql)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER user_entries_stats_delete AFTER DELETE ON user_entries
+        BEGIN
+            {_stats_remove("OLD", warning_sql)}
+        END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER user_entries_stats_update
+        AFTER UPDATE OF farmland_size, previous_crop_id, current_crop_id, soil_id, {recommendation_column} ON user_entries
+        BEGIN
+            {_stats_remove("OLD", warning_sql)}
+            {_stats_add("NEW", warning_sql)}
+        END
+    ''')
+
+
+def _migrate_6_search(conn: sqlite3.Connection):
+    # Full-text index over the logged advice. External content: the text stays in
+    # user_entries_view and is only tokenized here. Inserts are indexed by the write
+    # path (techniques are linked after the entry row), deletes and edits by triggers.
+    conn.execute('''
+        CREATE VIRTUAL TABLE entries_fts USING fts5(
+            recommendation, fertilizer, techniques,
+            content='user_entries_view', content_rowid='id',
+            tokenize='porter unicode61'
+        )
+    ''')
+    conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+    _create_search_triggers(conn, "recommendation, fertilizer")
+
+
+def _create_search_triggers(conn: sqlite3.Connection, text_columns: str):
+    remove_old = '''
+        INSERT INTO entries_fts (entries_fts, rowid, recommendation, fertilizer, techniques)
+        SELECT 'delete', id, recommendation, fertilizer, techniques FROM user_entries_view WHERE id = OLD.id;
+    '''
+    conn.execute(f"CREATE TRIGGER user_entries_fts_delete BEFORE DELETE ON user_entries BEGIN {remove_old} END")
+    conn.execute(f'''
+        CREATE TRIGGER user_entries_fts_update_old BEFORE UPDATE OF {text_columns} ON user_entries
+        BEGIN {remove_old} END
+    ''')
+    conn.execute(f'''
+        CREATE TRIGGER user_entries_fts_update_new AFTER UPDATE OF {text_columns} ON user_entries
+        BEGIN
+            INSERT INTO entries_fts (rowid, recommendation, fertilizer, techniques)
+            SELECT id, recommendation, fertilizer, techniques FROM user_entries_view WHERE id = NEW.id;
+        END
+    ''')
+
+
+def _migrate_7_imports(conn: sqlite3.Connection):
+    # Rows of each import file committed so far, advanced in the same
+    # transaction as the rows themselves so a resumed import never duplicates
+    conn.execute('''
+        CREATE TABLE import_checkpoints (
+            source TEXT PRIMARY KEY,
+            fingerprint TEXT NOT NULL,
+            rows INTEGER NOT NULL DEFAULT 0,
+            finished INTEGER NOT NULL DEFAULT 0,
+            updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+
+
+def payload_hash(text: Optional[str]) -> Optional[bytes]:
+    """Content address of a payload text: its 128-bit BLAKE2b digest."""
+    if text is None:
+        return None
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def _migrate_8_payloads(conn: sqlite3.Connection):
+    """
+    Store each distinct recommendation, fertilizer and technique list text
+    once in payloads, keyed by its hash, and reference it by id. The
+    per-technique entry_techniques links stay, so entries can still be
+    looked up by technique; techniques_id only saves rebuilding the list.
+    """
+    conn.create_function("payload_hash", 1, payload_hash, deterministic=True)
+    conn.execute('''
+        CREATE TABLE payloads (
+            id INTEGER PRIMARY KEY,
+            hash BLOB NOT NULL UNIQUE,
+            text TEXT NOT NULL
+        )
+    ''')
+    conn.execute('''
+        INSERT OR IGNORE INTO payloads (hash, text)
+        SELECT payload_hash(text), text FROM (
+            SELECT recommendation AS text FROM user_entries_view
+            UNION SELECT fertilizer FROM user_entries_view
+            UNION SELECT techniques FROM user_entries_view
+        ) WHERE text IS NOT NULL
+    ''')
+
+    # ADD/DROP COLUMN change user_entries in place: no table rebuild, so no
+    # cascades. Triggers and views naming the dropped columns must go first.
+    for trigger in (
+        "user_entries_stats_insert", "user_entries_stats_delete", "user_entries_stats_update",
+        "user_entries_fts_delete", "user_entries_fts_update_old", "user_entries_fts_update_new",
+    ):
+        conn.execute(f"DROP TRIGGER {trigger}")
+    for column in ("recommendation_id", "fertilizer_id", "techniques_id"):
+        conn.execute(f"ALTER TABLE user_entries ADD COLUMN {column} INTEGER REFERENCES payloads(id)")
+    conn.execute('''
+        UPDATE user_entries SET
+            recommendation_id = (SELECT id FROM payloads WHERE hash = payload_hash(recommendation)),
+            fertilizer_id = (SELECT id FROM payloads WHERE hash = payload_hash(fertilizer)),
+            techniques_id = (
+                SELECT p.id FROM user_entries_view v JOIN payloads p ON p.hash = payload_hash(v.techniques)
+                WHERE v.id = user_entries.id
+            )
+    ''')
+    conn.execute("DROP VIEW user_entries_view")
+    conn.execute("ALTER TABLE user_entries DROP COLUMN recommendation")
+    conn.execute("ALTER TABLE user_entries DROP COLUMN fertilizer")
+    conn.execute("CREATE INDEX idx_entry_techniques_technique ON entry_techniques (technique_id)")
+
+    # Same columns as before, so entries_fts (external content) reads it unchanged
+    conn.execute('''
+        CREATE VIEW user_entries_view AS
+        SELECT
+            e.id,
+            e.farmland_size,
+            pc.name AS previous_crop,
+            cc.name AS current_crop,
+            s.name AS soil_type,
+            rp.text AS recommendation,
+            fp.text AS fertilizer,
+            tp.text AS techniques,
+            e.created_at
+        FROM user_entries e
+        LEFT JOIN crops pc ON pc.id = e.previous_crop_id
+        LEFT JOIN crops cc ON cc.id = e.current_crop_id
+        LEFT JOIN soils s ON s.id = e.soil_id
+        LEFT JOIN payloads rp ON rp.id = e.recommendation_id
+        LEFT JOIN payloads fp ON fp.id = e.fertilizer_id
+        LEFT JOIN payloads tp ON tp.id = e.techniques_id
+    ''')
+    _create_stats_triggers(conn, WARNING_SQL, "recommendation_id")
+    _create_search_triggers(conn, "recommendation_id, fertilizer_id, techniques_id")
+
+
+# Entries moved out of user_entries by retention.py, one archive database per season.
+# Names rather than lookup ids, so an archive reads the same without the live database.
+ARCHIVE_COLUMNS = "id, " + ", ".join(LOG_COLUMNS) + ", created_at"
+ARCHIVE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS {schema}.archived_entries (
+        id INTEGER PRIMARY KEY,
+        farmland_size REAL,
+        previous_crop TEXT,
+        current_crop TEXT,
+        soil_type TEXT,
+        recommendation TEXT,
+        fertilizer TEXT,
+        techniques TEXT,
+        created_at TEXT
+    );
+    CREATE INDEX IF NOT EXISTS {schema}.idx_archived_entries_created_at ON archived_entries (created_at);
+'''
+
+
+# MIGRATIONS[n] upgrades a database from user_version n to n + 1
+MIGRATIONS: List[Callable[[sqlite3.Connection], None]] = [
+    _migrate_1_initial,
+    _migrate_2_normalize,
+    _migrate_3_precomputed,
+    _migrate_4_catalog,
+    _migrate_5_analytics,
+    _migrate_6_search,
+    _migrate_7_imports,
+    _migrate_8_payloads,
+]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+
+def fts_query(text: str) -> Optional[str]:
+    """
+    FTS5 query matching entries that contain every word of `text` (None if
+    there are none). Words are quoted, so FTS5 operators in the input are
+    searched as plain text.
+    """
+    words = text.split()
+    if not words:
+        return None
+    return " ".join('"' + word.replace('"', '""') + '"' for word in words)
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _readonly_uri(path: str) -> str:
+    return "file:" + os.path.abspath(path).replace("?", "%3f").replace("#", "%23") + "?mode=ro"
+
+
+def _split_techniques(techniques) -> List[str]:
+    if not techniques:
+        return []
+    if isinstance(techniques, str):
+        techniques = techniques.split(",")
+    return [t.strip() for t in techniques if t and t.strip()]
+
+
+class ConnectionManager:
+    """
+    Process-wide connections for one database file.
+
+    A single writer connection (WAL mode, serialized by a lock) handles all
+    writes, while a small pool of read-only connections serves reads from
+    any thread without blocking behind writers. Use for_path() to share one
+    manager per file; close_all() shuts every manager down.
+    """
+
+    _managers: Dict[str, "ConnectionManager"] = {}
+    _managers_lock = threading.Lock()
+
+    def __init__(self, db_path: str, max_readers: int = 4):
+        self.db_path = db_path
+        self.max_readers = max_readers
+        self._memory = db_path == ":memory:"
+        self.writer = sqlite3.connect(db_path, check_same_thread=False)
+        if not self._memory:
+            # Takes effect for new files; existing ones switch on their next VACUUM
+            self.writer.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            self.writer.execute("PRAGMA journal_mode = WAL")
+        self._write_lock = threading.RLock()
+        self._readers: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._all_readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._users = 0
+        self.closed = False
+        # Bumped when payload rows are deleted, so managers drop their cached payload ids
+        self.payload_generation = 0
+
+    @classmethod
+    def for_path(cls, db_path: str) -> "ConnectionManager":
+        key = db_path if db_path == ":memory:" else os.path.abspath(db_path)
+        with cls._managers_lock:
+            manager = cls._managers.get(key)
+            if manager is None or manager.closed:
+                manager = cls._managers[key] = cls(db_path)
+            manager._users += 1
+            return manager
+
+    @classmethod
+    def close_all(cls):
+        with cls._managers_lock:
+            managers = list(cls._managers.values())
+            cls._managers.clear()
+        for manager in managers:
+            manager.close()
+
+    def release(self):
+        """Drop one user of this manager, closing it when the last one leaves."""
+        with self._managers_lock:
+            self._users -= 1
+            if self._users > 0:
+                return
+            for key, manager in list(self._managers.items()):
+                if manager is self:
+                    del self._managers[key]
+        self.close()
+
+    @contextmanager
+    def write(self) -> Iterator[sqlite3.Connection]:
+        """Exclusive use of the writer connection."""
+        with self._write_lock:
+            yield self.writer
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        """Writer connection inside BEGIN IMMEDIATE ... COMMIT (rolled back on error)."""
+        with self._write_lock:
+            self.writer.execute("BEGIN IMMEDIATE")
+            try:
+                yield self.writer
+            except BaseException:
+                self.writer.rollback()
+                raise
+            self.writer.commit()
+
+    @contextmanager
+    def read(self) -> Iterator[sqlite3.Connection]:
+        """A pooled read-only connection, returned to the pool afterwards."""
+        if self._memory:
+            # Private in-memory databases can't be opened twice
+            with self.write() as conn:
+                yield conn
+            return
+        conn = self._acquire_reader()
+        try:
+            yield conn
+        finally:
+            if conn.in_transaction:
+                conn.rollback()
+            self._readers.put(conn)
+
+    def _acquire_reader(self) -> sqlite3.Connection:
+        try:
+            return self._readers.get_nowait()
+        except queue.Empty:
+            pass
+        with self._readers_lock:
+            if len(self._all_readers) < self.max_readers:
+                conn = sqlite3.connect(_readonly_uri(self.db_path), uri=True, check_same_thread=False)
+                self._all_readers.append(conn)
+                return conn
+        # Pool exhausted: wait for another thread to hand one back
+        return self._readers.get()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        with self._readers_lock:
+            for conn in self._all_readers:
+                conn.close()
+            self._all_readers.clear()
+        with self._write_lock:
+            self.writer.close()
+
+
+atexit.register(ConnectionManager.close_all)
+
 
 class DatabaseManager:
-    def __init__(self, db_path: str = "crop_assistant.db"):
-        self.conn = sqlite3.connect(db_path)
+    def __init__(
+        self,
+        db_path: str = "crop_assistant.db",
+        synchronous: Optional[str] = None,
+        journal_mode: Optional[str] = None,
+    ):
+        self.connections = ConnectionManager.for_path(db_path)
+        # Writer connection, shared with every other manager for this file
+        self.conn = self.connections.writer
+        self.configure(synchronous=synchronous, journal_mode=journal_mode)
+        # name -> id caches for the lookup tables
+        self._lookup_ids: Dict[str, Dict[str, int]] = {table: {} for table in LOOKUP_TABLES}
+        self._payload_ids: Dict[str, int] = {}
+        # Compared with connections.payload_generation: delete_unused_payloads() invalidates the cache
+        self._payload_generation = self.connections.payload_generation
         self.create_tables()
 
+    def configure(self, synchronous: Optional[str] = None, journal_mode: Optional[str] = None):
+        """Set PRAGMA synchronous / journal_mode; None leaves the current setting."""
+        with self.connections.write():
+            self._configure(synchronous, journal_mode)
+
+    def _configure(self, synchronous: Optional[str], journal_mode: Optional[str]):
+        if synchronous is not None:
+            if synchronous.upper() not in SYNCHRONOUS_MODES:
+                raise ValueError(f"Unknown synchronous mode: {synchronous}")
+            self.conn.execute(f"PRAGMA synchronous = {synchronous.upper()}")
+        if journal_mode is not None:
+            if journal_mode.upper() not in JOURNAL_MODES:
+                raise ValueError(f"Unknown journal mode: {journal_mode}")
+            self.conn.execute(f"PRAGMA journal_mode = {journal_mode.upper()}")
+
+    @property
+    def schema_version(self) -> int:
+        return self.conn.execute("PRAGMA user_version").fetchone()[0]
+
     def create_tables(self):
-        cursor = self.conn.cursor()
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS user_entries (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                farmland_size REAL,
-                previous_crop TEXT,
-                current_crop TEXT,
-                soil_type TEXT,
-                recommendation TEXT,
-                fertilizer TEXT,
-                techniques TEXT
-            )
-        ''')
-        self.conn.commit()
+        """Create the schema, or upgrade an older database to SCHEMA_VERSION."""
+        with self.connections.write():
+            if self.schema_version < SCHEMA_VERSION:
+                self._migrate()
+            self.conn.execute("PRAGMA foreign_keys = ON")
+
+    def _migrate(self):
+        # Table rebuilds must not cascade, and foreign_keys can't change inside a transaction
+        self.conn.execute("PRAGMA foreign_keys = OFF")
+        for version, migration in enumerate(MIGRATIONS):
+            with self.connections.transaction():
+                # Re-check under the write lock in case another process migrated first
+                if self.schema_version > version:
+                    continue
+                migration(self.conn)
+                self.conn.execute(f"PRAGMA user_version = {version + 1}")
 
     def save_user_entry(
         self,
@@ -35,19 +757,505 @@ class DatabaseManager:
         fertilizer: str,
         techniques: str
     ):
-        cursor = self.conn.cursor()
-        cursor.execute('''
+        self.save_user_entries(
+            [(farmland_size, previous_crop, current_crop, soil_type, recommendation, fertilizer, techniques)]
+        )
+
+    def save_user_entries(
+        self,
+        entries: Iterable[Sequence],
+        batch_size: Optional[int] = 10_000,
+        checkpoint: Optional[str] = None,
+        progress: Optional[Callable[[int], None]] = None,
+    ) -> int:
+        """
+        Insert many entries with executemany, committing once per batch.
+
+        `entries` yields tuples in save_user_entry argument order, optionally
+        followed by a created_at timestamp, and may be a generator; at most
+        `batch_size` rows are held in memory at a time. With batch_size=None
+        everything goes in as a single transaction. If an insert fails, the
+        uncommitted batch is rolled back and the error re-raised. Returns the
+        number of rows inserted.
+
+        With `checkpoint` (an import_checkpoints source), each batch also
+        advances that checkpoint in the same transaction. `progress` is
+        called with the running total after every commit.
+        """
+        if batch_size is not None and batch_size < 1:
+            raise ValueError(f"batch_size must be at least 1, not {batch_size}")
+        entries = iter(entries)
+        total = 0
+        try:
+            if batch_size is None:
+                with self.connections.transaction():
+                    while True:
+                        batch = list(islice(entries, 10_000))
+                        if not batch:
+                            break
+                        total += self._insert_batch(batch, checkpoint)
+                if progress is not None:
+                    progress(total)
+                return total
+            while True:
+                batch = list(islice(entries, batch_size))
+                if not batch:
+                    break
+                with self.connections.transaction():
+                    total += self._insert_batch(batch, checkpoint)
+                if progress is not None:
+                    progress(total)
+        except Exception:
+            # Ids handed out inside the failed transaction no longer exist
+            for ids in self._lookup_ids.values():
+                ids.clear()
+            self._payload_ids.clear()
+            raise
+        return total
+
+    def _insert_batch(self, batch: List[Sequence], checkpoint: Optional[str] = None) -> int:
+        """Insert one batch inside an open write transaction."""
+        if self._payload_generation != self.connections.payload_generation:
+            self._payload_ids.clear()
+            self._payload_generation = self.connections.payload_generation
+        # Entry ids are assigned here so technique links and search index rows can
+        # be written with executemany too; BEGIN IMMEDIATE holds the write lock meanwhile.
+        row = self.conn.execute("SELECT seq FROM sqlite_sequence WHERE name = 'user_entries'").fetchone()
+        next_id = (row[0] if row else 0) + 1
+
+        entry_rows, links, search_rows = [], [], []
+        for entry_id, entry in enumerate(batch, start=next_id):
+            farmland_size, previous_crop, current_crop, soil_type, recommendation, fertilizer, techniques = entry[:7]
+            names = _split_techniques(techniques)
+            for position, name in enumerate(names):
+                links.append((entry_id, position, self._lookup_id("techniques", name)))
+            # Same technique list text as before normalization, which FTS5 also needs to delete it later
+            techniques = ", ".join(names) or None
+            entry_rows.append((
+                entry_id,
+                farmland_size,
+                self._lookup_id("crops", previous_crop),
+                self._lookup_id("crops", current_crop),
+                self._lookup_id("soils", soil_type),
+                self._payload_id(recommendation),
+                self._payload_id(fertilizer),
+                self._payload_id(techniques),
+                entry[7] if len(entry) > 7 else None,
+            ))
+            search_rows.append((entry_id, recommendation, fertilizer, techniques))
+
+        self.conn.executemany('''
             INSERT INTO user_entries (
-                farmland_size, previous_crop, current_crop, soil_type,
-                recommendation, fertilizer, techniques
-            ) VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (farmland_size, previous_crop, current_crop, soil_type, recommendation, fertilizer, techniques))
-        self.conn.commit()
+                id, farmland_size, previous_crop_id, current_crop_id, soil_id,
+                recommendation_id, fertilizer_id, techniques_id, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, IFNULL(?, CURRENT_TIMESTAMP))
+        ''', entry_rows)
+        self.conn.executemany(
+            "INSERT INTO entry_techniques (entry_id, position, technique_id) VALUES (?, ?, ?)", links
+        )
+        self.conn.executemany(
+            "INSERT INTO entries_fts (rowid, recommendation, fertilizer, techniques) VALUES (?, ?, ?, ?)", search_rows
+        )
+        if checkpoint is not None:
+            self.conn.execute(
+                "UPDATE import_checkpoints SET rows = rows + ?, updated_at = CURRENT_TIMESTAMP WHERE source = ?",
+                (len(entry_rows), checkpoint),
+            )
+        return len(entry_rows)
+
+    def _lookup_id(self, table: str, name: Optional[str]) -> Optional[int]:
+        if name is None:
+            return None
+        ids = self._lookup_ids[table]
+        if name not in ids:
+            self.conn.execute(f"INSERT OR IGNORE INTO {table} (name) VALUES (?)", (name,))
+            ids[name] = self.conn.execute(f"SELECT id FROM {table} WHERE name = ?", (name,)).fetchone()[0]
+        return ids[name]
+
+    def _payload_id(self, text: Optional[str]) -> Optional[int]:
+        if text is None:
+            return None
+        payload_id = self._payload_ids.get(text)
+        if payload_id is None:
+            digest = payload_hash(text)
+            self.conn.execute("INSERT OR IGNORE INTO payloads (hash, text) VALUES (?, ?)", (digest, text))
+            payload_id = self.conn.execute("SELECT id FROM payloads WHERE hash = ?", (digest,)).fetchone()[0]
+            if len(self._payload_ids) >= PAYLOAD_CACHE_SIZE:
+                self._payload_ids.clear()
+            self._payload_ids[text] = payload_id
+        return payload_id
 
     def get_user_entries(self) -> List[Tuple[Any]]:
-        cursor = self.conn.cursor()
-        cursor.execute('SELECT * FROM user_entries ORDER BY id DESC')
-        return cursor.fetchall()
+        with self.connections.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f'SELECT {ENTRY_COLUMNS} FROM user_entries_view ORDER BY id DESC')
+            return cursor.fetchall()
+
+    def get_user_entries_page(
+        self,
+        limit: int = 200,
+        after: Optional[Tuple[Any, int]] = None,
+        sort_column: Optional[str] = None,
+        descending: bool = True,
+        filters: Optional[Dict[str, str]] = None,
+    ) -> List[Tuple[Any]]:
+        """
+        One keyset-paginated page of user entries.
+
+        Rows are ordered by `sort_column` (newest id first when None) with id as
+        tie-breaker. `after` is the (sort value, id) of the last row of the
+        previous page, with '' standing in for a NULL sort value. `filters`
+        maps column names to substrings to match.
+        """
+        if sort_column is not None and sort_column not in LOG_COLUMNS:
+            raise ValueError(f"Unknown column: {sort_column}")
+        # NULLs would break row-value comparisons, so sort on a non-null key
+        key = f"IFNULL({sort_column}, '')" if sort_column else "id"
+        direction, op = ("DESC", "<") if descending else ("ASC", ">")
+
+        where, params = [], []
+        for column, text in (filters or {}).items():
+            if column not in LOG_COLUMNS:
+                raise ValueError(f"Unknown column: {column}")
+            if text:
+                escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+                where.append(f"{column} LIKE ? ESCAPE '\\'")
+                params.append(f"%{escaped}%")
+        if after is not None:
+            if sort_column:
+                where.append(f"({key}, id) {op} (?, ?)")
+                params.extend(after)
+            else:
+                where.append(f"id {op} ?")
+                params.append(after[1])
+
+        # Pick the page's ids first so view columns not used for sorting or
+        # filtering are only joined in for the rows returned.
+        order = f" ORDER BY {key} {direction}" + (f", id {direction}" if sort_column else "")
+        page = "SELECT id FROM user_entries_view"
+        if where:
+            page += " WHERE " + " AND ".join(where)
+        page += order + " LIMIT ?"
+        params.append(limit)
+        sql = f"SELECT {ENTRY_COLUMNS} FROM user_entries_view WHERE id IN ({page})" + order
+        with self.connections.read() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def get_entries_for(self, current_crop: str, soil_type: Optional[str] = None, limit: int = 200) -> List[Tuple[Any]]:
+        """Newest entries for a current crop (and soil), using the (crop, soil) index."""
+        with self.connections.read() as conn:
+            crop = conn.execute("SELECT id FROM crops WHERE name = ?", (current_crop,)).fetchone()
+            if crop is None:
+                return []
+            sql = f"SELECT {ENTRY_COLUMNS} FROM user_entries_view WHERE id IN (SELECT id FROM user_entries WHERE current_crop_id = ?"
+            params: List[Any] = [crop[0]]
+            if soil_type is not None:
+                soil = conn.execute("SELECT id FROM soils WHERE name = ?", (soil_type,)).fetchone()
+                if soil is None:
+                    return []
+                sql += " AND soil_id = ?"
+                params.append(soil[0])
+            sql += ") ORDER BY id DESC LIMIT ?"
+            params.append(limit)
+            return conn.execute(sql, params).fetchall()
+
+    def get_entries_with_technique(self, technique: str, limit: int = 200) -> List[Tuple[Any]]:
+        """Newest entries that list a technique, using the entry_techniques index."""
+        with self.connections.read() as conn:
+            return conn.execute(f'''
+                SELECT {ENTRY_COLUMNS} FROM user_entries_view WHERE id IN (
+                    SELECT et.entry_id FROM entry_techniques et
+                    JOIN techniques t ON t.id = et.technique_id
+                    WHERE t.name = ?
+                ) ORDER BY id DESC LIMIT ?
+            ''', (technique, limit)).fetchall()
+
+    def count_matches(self, text: str) -> int:
+        """Number of entries whose recommendation, fertilizer or techniques contain every word of `text`."""
+        query = fts_query(text)
+        if query is None:
+            return 0
+        with self.connections.read() as conn:
+            return conn.execute("SELECT count(*) FROM entries_fts WHERE entries_fts MATCH ?", (query,)).fetchone()[0]
+
+    def search_entries(self, text: str, limit: int = 200, offset: int = 0, ranked: bool = True) -> List[Tuple[Any]]:
+        """
+        One page of entries matching every word of `text` in their
+        recommendation, fertilizer or techniques, best match first (bm25), or
+        newest first if not `ranked`. Ranking scores every match, so callers
+        should use newest first for queries with very many matches.
+        """
+        query = fts_query(text)
+        if query is None:
+            return []
+        order, outer = ("rank, rowid", "h.score, v.id") if ranked else ("rowid DESC", "v.id DESC")
+        hits = f"SELECT rowid AS hit_id, rank AS score FROM entries_fts WHERE entries_fts MATCH ? ORDER BY {order} LIMIT ? OFFSET ?"
+        columns = ", ".join(f"v.{column.strip()}" for column in ENTRY_COLUMNS.split(","))
+        with self.connections.read() as conn:
+            return conn.execute(
+                f"SELECT {columns} FROM ({hits}) h JOIN user_entries_view v ON v.id = h.hit_id ORDER BY {outer}",
+                (query, limit, offset),
+            ).fetchall()
+
+    def rebuild_search_index(self):
+        """Re-index every entry, e.g. after user_entries was edited outside the app."""
+        with self.connections.transaction() as conn:
+            conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('rebuild')")
+
+    def iter_user_entries(self, batch_size: int = 10_000) -> Iterator[List[Tuple[Any]]]:
+        """Yield every entry as (id, *LOG_COLUMNS, created_at), oldest first, in batches."""
+        with self.connections.read() as conn:
+            cursor = conn.execute(f"SELECT {ENTRY_COLUMNS}, created_at FROM user_entries_view ORDER BY id")
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield batch
+
+    def import_checkpoint(self, source: str, fingerprint: str) -> Tuple[int, bool]:
+        """
+        (rows already imported, finished) for an import source, starting a new
+        checkpoint if there is none or the source's fingerprint changed.
+        """
+        with self.connections.transaction() as conn:
+            row = conn.execute(
+                "SELECT fingerprint, rows, finished FROM import_checkpoints WHERE source = ?", (source,)
+            ).fetchone()
+            if row is not None and row[0] == fingerprint:
+                return row[1], bool(row[2])
+            conn.execute('''
+                INSERT INTO import_checkpoints (source, fingerprint) VALUES (?, ?)
+                ON CONFLICT (source) DO UPDATE SET
+                    fingerprint = excluded.fingerprint, rows = 0, finished = 0, updated_at = CURRENT_TIMESTAMP
+            ''', (source, fingerprint))
+        return 0, False
+
+    def finish_import(self, source: str):
+        with self.connections.transaction() as conn:
+            conn.execute(
+                "UPDATE import_checkpoints SET finished = 1, updated_at = CURRENT_TIMESTAMP WHERE source = ?", (source,)
+            )
+
+    def reset_import(self, source: str):
+        """Forget an import's checkpoint so the source is imported again from the start."""
+        with self.connections.transaction() as conn:
+            conn.execute("DELETE FROM import_checkpoints WHERE source = ?", (source,))
+
+    def crop_names_by_id(self) -> Dict[int, str]:
+        """Ids of the crops table, which the log stores instead of crop names."""
+        with self.connections.read() as conn:
+            return dict(conn.execute("SELECT id, name FROM crops"))
+
+    def iter_transitions(self, batch_size: int = 100_000) -> Iterator[List[Tuple[int, int]]]:
+        """
+        Yield (previous_crop_id, current_crop_id) pairs in batches without
+        loading the whole table; 0 stands for a missing crop.
+        """
+        with self.connections.read() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT IFNULL(previous_crop_id, 0), IFNULL(current_crop_id, 0) FROM user_entries"
+            )
+            while True:
+                batch = cursor.fetchmany(batch_size)
+                if not batch:
+                    break
+                yield batch
+
+    def entries_older_than(self, cutoff: str, limit: int) -> List[Tuple[int, str]]:
+        """
+        (id, created_at) of up to `limit` entries created before `cutoff`,
+        oldest first. Entries from before created_at existed (NULL) come first.
+        """
+        with self.connections.read() as conn:
+            return conn.execute(
+                "SELECT id, created_at FROM user_entries WHERE created_at IS NULL OR created_at < ? "
+                "ORDER BY created_at LIMIT ?",
+                (cutoff, limit),
+            ).fetchall()
+
+    def move_entries(self, ids: Sequence[int], archive_path: str) -> int:
+        """
+        Copy entries into the archive database at `archive_path` (created if
+        missing) and delete them here, which also updates the summary tables
+        and search index. The copy is idempotent, so an archive left behind
+        by an interrupted move is simply completed. Returns the rows deleted.
+        """
+        if not ids:
+            return 0
+        placeholders = ", ".join("?" * len(ids))
+        with self.connections.write() as conn:
+            # ATTACH/DETACH can't run inside a transaction
+            conn.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+            try:
+                conn.executescript(ARCHIVE_SCHEMA.format(schema="archive"))
+                with self.connections.transaction():
+                    conn.execute(f'''
+                        INSERT OR IGNORE INTO archive.archived_entries ({ARCHIVE_COLUMNS})
+                        SELECT {ARCHIVE_COLUMNS} FROM user_entries_view WHERE id IN ({placeholders})
+                    ''', ids)
+                    return conn.execute(f"DELETE FROM user_entries WHERE id IN ({placeholders})", ids).rowcount
+            finally:
+                conn.execute("DETACH DATABASE archive")
+
+    @contextmanager
+    def history(self, archive_paths: Dict[str, str]) -> Iterator[sqlite3.Connection]:
+        """
+        A private read-only connection with each archive in `archive_paths`
+        (schema name -> file) attached read-only and a temp view all_entries
+        over user_entries_view and every archive.
+        """
+        conn = sqlite3.connect(_readonly_uri(self.connections.db_path), uri=True)
+        try:
+            limit = conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+            if len(archive_paths) > limit:
+                raise ValueError(f"Can only attach {limit} archives at once, not {len(archive_paths)}")
+            selects = [f"SELECT {ARCHIVE_COLUMNS} FROM main.user_entries_view"]
+            for schema, path in archive_paths.items():
+                conn.execute(f"ATTACH DATABASE ? AS {_quote(schema)}", (_readonly_uri(path),))
+                selects.append(f"SELECT {ARCHIVE_COLUMNS} FROM {_quote(schema)}.archived_entries")
+            conn.execute("CREATE TEMP VIEW all_entries AS " + " UNION ALL ".join(selects))
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def count_archived(archive_path: str) -> int:
+        conn = sqlite3.connect(_readonly_uri(archive_path), uri=True)
+        try:
+            return conn.execute("SELECT count(*) FROM archived_entries").fetchone()[0]
+        finally:
+            conn.close()
+
+    @property
+    def auto_vacuum(self) -> str:
+        with self.connections.write() as conn:
+            return ("NONE", "FULL", "INCREMENTAL")[conn.execute("PRAGMA auto_vacuum").fetchone()[0]]
+
+    def storage(self) -> Tuple[int, int, int]:
+        """(page size, pages, free pages) of the database file."""
+        with self.connections.write() as conn:
+            return tuple(conn.execute(f"PRAGMA {pragma}").fetchone()[0] for pragma in (
+                "page_size", "page_count", "freelist_count"
+            ))
+
+    def delete_unused_payloads(self) -> int:
+        """Delete payload texts no entry refers to any more (after deletes or archiving); returns how many."""
+        with self.connections.transaction() as conn:
+            deleted = conn.execute('''
+                DELETE FROM payloads WHERE id NOT IN (
+                    SELECT recommendation_id FROM user_entries WHERE recommendation_id IS NOT NULL
+                    UNION SELECT fertilizer_id FROM user_entries WHERE fertilizer_id IS NOT NULL
+                    UNION SELECT techniques_id FROM user_entries WHERE techniques_id IS NOT NULL
+                )
+            ''').rowcount
+            if deleted:
+                self.connections.payload_generation += 1
+            return deleted
+
+    def enable_incremental_vacuum(self):
+        """Switch to auto_vacuum=INCREMENTAL, rewriting the whole file once with VACUUM if needed."""
+        with self.connections.write() as conn:
+            conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                conn.execute("VACUUM")
+
+    def incremental_vacuum(self, pages: int) -> int:
+        """Return up to `pages` free pages to the file system; returns the free pages left."""
+        with self.connections.write() as conn:
+            # Each step of the pragma frees one page; execute() would only take the
+            # first, executescript() runs it to completion
+            conn.executescript(f"PRAGMA incremental_vacuum({int(pages)})")
+            return conn.execute("PRAGMA freelist_count").fetchone()[0]
+
+    def entry_stats(self) -> Tuple[int, int, float]:
+        """(entries, rotation warnings, total acreage) over all user entries."""
+        with self.connections.read() as conn:
+            row = conn.execute("SELECT entries, warnings, acreage FROM stats_totals").fetchone()
+        return tuple(row) if row else (0, 0, 0.0)
+
+    def stats_by(self, group: str, limit: Optional[int] = None) -> List[Tuple[Optional[str], int, int, float]]:
+        """
+        (name, entries, warnings, acreage) per current crop (group="crop") or
+        soil (group="soil"), most entries first. A None name counts entries
+        without a crop/soil.
+        """
+        if group not in ("crop", "soil"):
+            raise ValueError(f"Unknown group: {group}")
+        lookup = "crops" if group == "crop" else "soils"
+        with self.connections.read() as conn:
+            return conn.execute(f'''
+                SELECT l.name, s.entries, s.warnings, s.acreage
+                FROM stats_by_{group} s LEFT JOIN {lookup} l ON l.id = s.{group}_id
+                ORDER BY s.entries DESC, l.name LIMIT ?
+            ''', (-1 if limit is None else limit,)).fetchall()
+
+    def top_transitions(self, limit: int = 10) -> List[Tuple[Optional[str], Optional[str], int, int]]:
+        """Most common (previous_crop, current_crop, entries, warnings) transitions."""
+        with self.connections.read() as conn:
+            return conn.execute('''
+                SELECT pc.name, cc.name, t.entries, t.warnings
+                FROM stats_transitions t
+                LEFT JOIN crops pc ON pc.id = t.previous_crop_id
+                LEFT JOIN crops cc ON cc.id = t.current_crop_id
+                ORDER BY t.entries DESC, pc.name, cc.name LIMIT ?
+            ''', (limit,)).fetchall()
+
+    def rebuild_stats(self):
+        """Recompute the summary tables from user_entries (e.g. after editing it with triggers off)."""
+        with self.connections.transaction() as conn:
+            _create_stats(conn)
+
+    def load_precomputed(self, catalog_hash: str) -> List[Tuple[str, str, str, str]]:
+        """(previous_crop, current_crop, soil_type, payload) rows stored for a catalog hash."""
+        with self.connections.read() as conn:
+            return conn.execute('''
+                SELECT previous_crop, current_crop, soil_type, payload
+                FROM precomputed_recommendations WHERE catalog_hash = ?
+            ''', (catalog_hash,)).fetchall()
+
+    def replace_precomputed(self, catalog_hash: str, rows: Iterable[Tuple[str, str, str, str]]):
+        """Store the table for `catalog_hash`, dropping tables of older catalogs."""
+        with self.connections.transaction() as conn:
+            conn.execute("DELETE FROM precomputed_recommendations")
+            conn.executemany('''
+                INSERT INTO precomputed_recommendations (catalog_hash, previous_crop, current_crop, soil_type, payload)
+                VALUES (?, ?, ?, ?, ?)
+            ''', ((catalog_hash, *row) for row in rows))
+
+    def catalog_versions(self) -> Dict[str, int]:
+        """Change counter per catalog part; a part changed if its counter moved."""
+        with self.connections.read() as conn:
+            return dict(conn.execute("SELECT part, version FROM catalog_versions").fetchall())
+
+    def load_catalog_part(self, part: str) -> Tuple[int, List[Tuple[Any]]]:
+        """(version, rows in position order) for one catalog part, read consistently."""
+        table, columns = CATALOG_TABLES[part]
+        with self.connections.read() as conn:
+            # One read transaction so the version matches the rows
+            began = not conn.in_transaction
+            if began:
+                conn.execute("BEGIN")
+            try:
+                version = conn.execute("SELECT version FROM catalog_versions WHERE part = ?", (part,)).fetchone()[0]
+                rows = conn.execute(f"SELECT {', '.join(columns)} FROM {table} ORDER BY position").fetchall()
+            finally:
+                if began:
+                    conn.rollback()
+        return version, rows
+
+    def replace_catalog_part(self, part: str, rows: Iterable[Sequence]):
+        """Replace every row of a catalog part (rows in display order)."""
+        table, columns = CATALOG_TABLES[part]
+        with self.connections.transaction() as conn:
+            conn.execute(f"DELETE FROM {table}")
+            conn.executemany(
+                f"INSERT INTO {table} (position, {', '.join(columns)}) VALUES (?, {', '.join('?' * len(columns))})",
+                ((position, *row) for position, row in enumerate(rows)),
+            )
 
     def close(self):
-        self.conn.close()
+        """Release this manager's hold on the shared connections."""
+        if self.connections is not None:
+            self.connections.release()
+            self.connections = None
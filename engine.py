@@ -0,0 +1,301 @@
+"""
+engine.py - GUI-free recommendation engine with a streaming batch API and CLI.
+
+Usage:
+    python engine.py entries.csv -o results.jsonl
+    python engine.py entries.jsonl --output-format csv > results.csv
+"""
+import argparse
+import csv
+import json
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO
+
+from alternatives import DEFAULT_K, AlternativeSuggester, AlternativeWeights
+from catalog import CATALOG, CropCatalog
+from classes import Crop, Soil
+from crop_names import CropNameResolver
+from logic import CropRotationLogic, SoilRecommendationSystem, TechniqueSuggestion
+from precompute import RecommendationTable, Result
+
+# Columns expected in every farm entry (CSV header / JSONL keys)
+INPUT_FIELDS = ["farmland_size", "previous_crop", "current_crop", "soil_type"]
+
+# Columns written for every result row
+OUTPUT_FIELDS = INPUT_FIELDS + [
+    "rotation_ok", "recommendation", "alternatives", "soil_management",
+    "fertilizer", "techniques", "next_crops", "error",
+]
+
+
+class Recommendation:
+    """Everything handle_submit shows for a single farm entry."""
+
+    def __init__(
+        self,
+        farmland_size: float,
+        previous_crop: str,
+        current_crop: str,
+        soil_type: str,
+        rotation_msg: str,
+        alternatives: List[str],
+        soil_rec: str,
+        fertilizer: str,
+        techniques: List[str],
+        next_crops: List[str],
+    ):
+        self.farmland_size = farmland_size
+        self.previous_crop = previous_crop
+        self.current_crop = current_crop
+        self.soil_type = soil_type
+        self.rotation_msg = rotation_msg
+        self.alternatives = alternatives
+        self.soil_rec = soil_rec
+        self.fertilizer = fertilizer
+        self.techniques = techniques
+        self.next_crops = next_crops
+
+    @property
+    def rotation_ok(self) -> bool:
+        return not self.alternatives
+
+    def as_dict(self) -> Dict:
+        return {
+            "farmland_size": self.farmland_size,
+            "previous_crop": self.previous_crop,
+            "current_crop": self.current_crop,
+            "soil_type": self.soil_type,
+            "rotation_ok": self.rotation_ok,
+            "recommendation": self.rotation_msg,
+            "alternatives": self.alternatives,
+            "soil_management": self.soil_rec,
+            "fertilizer": self.fertilizer,
+            "techniques": self.techniques,
+            "next_crops": self.next_crops,
+            "error": "",
+        }
+
+
+class InvalidEntry(dict):
+    """Stands in for an input line that isn't a JSON object; recommend_many reports `message`."""
+
+    def __init__(self, message: str):
+        super().__init__()
+        self.message = message
+
+
+class RecommendationEngine:
+    def __init__(
+        self,
+        catalog: CropCatalog = CATALOG,
+        db=None,
+        precompute: bool = True,
+        weights: Optional[AlternativeWeights] = None,
+        alternatives_k: Optional[int] = DEFAULT_K,
+        resolver: Optional[CropNameResolver] = None,
+    ):
+        self.catalog = catalog
+        self.rotation_logic = CropRotationLogic(catalog)
+        # Resolves crop names that aren't exact catalog names (e.g. in imported batches)
+        self.resolver = resolver
+        self.suggester = AlternativeSuggester(catalog, weights)
+        # The shared TechniqueSuggestion.INDEX only covers the global CATALOG
+        self.technique_index = None if catalog is CATALOG else TechniqueSuggestion.build_index(catalog)
+        self.alternatives_k = alternatives_k
+        # Results only depend on (previous, current, soil): look them up when the table is enabled
+        settings = {"alternatives_k": alternatives_k, "weights": vars(self.suggester.weights)}
+        self.table = RecommendationTable(catalog, self.compute, db, settings) if precompute else None
+
+    def refresh(self):
+        """Rebuild catalog-derived state after the catalog or rule tables changed."""
+        self.suggester = AlternativeSuggester(self.catalog, self.suggester.weights)
+        if self.technique_index is not None:
+            self.technique_index = TechniqueSuggestion.build_index(self.catalog)
+        if self.resolver is not None:
+            self.resolver.rebuild()
+        if self.table is not None:
+            # The new catalog hash selects (or builds) the matching stored table
+            self.table = RecommendationTable(self.catalog, self.compute, self.table.db, self.table.settings)
+
+    @staticmethod
+    def parse_size(value) -> float:
+        try:
+            farmland_size = float(value)
+            if farmland_size <= 0:
+                raise ValueError
+        except (TypeError, ValueError):
+            raise ValueError("Please enter a valid farmland size (e.g., 2 or 3.5).")
+        return farmland_size
+
+    def recommend(self, farmland_size, previous_crop: str, current_crop: str, soil_type: str) -> Recommendation:
+        """Validate one entry and build its recommendation; raises ValueError on bad input."""
+        farmland_size = self.parse_size(farmland_size)
+
+        prev_crop = self._crop(previous_crop)
+        curr_crop = self._crop(current_crop)
+        soil_obj = self.catalog.soil(soil_type)
+        if not (prev_crop and curr_crop and soil_obj):
+            raise ValueError("Invalid crop or soil selection.")
+
+        result = self.table.lookup(prev_crop.name, curr_crop.name, soil_obj.soil_type) if self.table else None
+        if result is None:
+            result = self.compute(prev_crop, curr_crop, soil_obj)
+        rotation_msg, alternatives, soil_rec, fertilizer, techniques, next_crops = result
+
+        # Copy the lists so callers can't modify the shared table
+        return Recommendation(
+            farmland_size, prev_crop.name, curr_crop.name, soil_obj.soil_type,
+            rotation_msg, list(alternatives), soil_rec, fertilizer, list(techniques), list(next_crops),
+        )
+
+    def _crop(self, name: str) -> Optional[Crop]:
+        crop = self.catalog.crop(name)
+        if crop is None and self.resolver is not None:
+            resolved = self.resolver.canonical(name)
+            crop = self.catalog.crop(resolved) if resolved else None
+        return crop
+
+    def compute(self, prev_crop: Crop, curr_crop: Crop, soil_obj: Soil) -> Result:
+        """Recommendation for resolved catalog objects, independent of farmland size."""
+        # Rotation check
+        rotation_msg, alternatives = self.rotation_logic.check_rotation(prev_crop.name, curr_crop.name)
+
+        # Soil & fertilizer & techniques
+        soil_rec = SoilRecommendationSystem.recommend_soil_management(soil_obj, [prev_crop, curr_crop])
+        fertilizer = self.fertilizer_for(curr_crop)
+        techniques = self.techniques_for(curr_crop, soil_obj)
+
+        # Suggest next crops compatible with selected soil (and different from prev family)
+        next_crops = [c.name for c in self.catalog.rotation_candidates(soil_obj.soil_type, prev_crop.family)]
+
+        alternatives = self.rank_alternatives(alternatives, prev_crop, soil_obj.soil_type)
+        return rotation_msg, alternatives, soil_rec, fertilizer, list(techniques), next_crops
+
+    def fertilizer_for(self, crop: Crop) -> str:
+        return SoilRecommendationSystem.recommend_fertilizer(crop.name, self.catalog)
+
+    def techniques_for(self, crop: Crop, soil_obj: Soil) -> List[str]:
+        return list(TechniqueSuggestion.suggest_for_crop(crop.name, soil_obj.soil_type, self.catalog, self.technique_index))
+
+    def rank_alternatives(self, alternatives: List[str], prev_crop: Crop, soil_type: str) -> List[str]:
+        # check_rotation lists every crop outside the previous family; keep the best-ranked
+        # few that suit the soil, or the best overall if none do
+        if not alternatives:
+            return alternatives
+        history = [prev_crop.name]
+        return (
+            self.suggester.suggest_names(soil_type, history, self.alternatives_k, require_soil=True)
+            or self.suggester.suggest_names(soil_type, history, self.alternatives_k)
+        )
+
+    def recommend_many(self, entries: Iterable[Dict]) -> Iterator[Dict]:
+        """Lazily map farm entries to result rows; invalid entries yield a row with `error` set."""
+        for entry in entries:
+            if isinstance(entry, InvalidEntry):
+                yield self._error_row(entry, entry.message)
+                continue
+            try:
+                yield self.recommend(
+                    entry.get("farmland_size"), entry.get("previous_crop"),
+                    entry.get("current_crop"), entry.get("soil_type"),
+                ).as_dict()
+            except ValueError as e:
+                yield self._error_row(entry, str(e))
+
+    @staticmethod
+    def _error_row(entry: Dict, message: str) -> Dict:
+        row = {field: "" for field in OUTPUT_FIELDS}
+        row.update({field: entry.get(field, "") for field in INPUT_FIELDS})
+        row["error"] = message
+        return row
+
+
+def _detect_format(path: str, explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    return "jsonl" if path.lower().endswith((".jsonl", ".json", ".ndjson")) else "csv"
+
+
+def read_entries(stream: TextIO, fmt: str) -> Iterator[Dict]:
+    """
+    Stream farm entries from a CSV or JSONL file one row at a time. A JSONL
+    line that isn't a JSON object yields an InvalidEntry instead of ending
+    the stream.
+    """
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for line_number, line in enumerate(stream, start=1):
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError as e:
+                yield InvalidEntry(f"Line {line_number}: invalid JSON ({e.msg})")
+                continue
+            if not isinstance(entry, dict):
+                yield InvalidEntry(f"Line {line_number}: expected a JSON object, not {type(entry).__name__}")
+                continue
+            yield entry
+
+
+def write_results(results: Iterable[Dict], stream: TextIO, fmt: str) -> int:
+    """Write result rows as they arrive; returns the number of rows written."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.DictWriter(stream, fieldnames=OUTPUT_FIELDS)
+        writer.writeheader()
+        for row in results:
+            row = dict(row)
+            for key in ("alternatives", "techniques", "next_crops"):
+                if isinstance(row[key], list):
+                    row[key] = ", ".join(row[key])
+            writer.writerow(row)
+            count += 1
+    else:
+        for row in results:
+            stream.write(json.dumps(row, ensure_ascii=False))
+            stream.write("\n")
+            count += 1
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Batch crop rotation recommendations for CSV/JSONL farm entries.")
+    parser.add_argument("input", help="CSV or JSONL file of farm entries ('-' for stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Output file ('-' for stdout)")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"])
+    parser.add_argument("--output-format", choices=["csv", "jsonl"])
+    parser.add_argument("--db", help="Database to cache the precomputed recommendation table in")
+    parser.add_argument(
+        "--fuzzy-names", type=float, metavar="CONFIDENCE", nargs="?", const=0.8,
+        help="Resolve misspelled/local crop names with at least this confidence (default 0.8)",
+    )
+    args = parser.parse_args(argv)
+
+    in_fmt = _detect_format(args.input, args.input_format)
+    out_fmt = _detect_format(args.output, args.output_format)
+
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    dst = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    db = None
+    try:
+        if args.db:
+            from database import DatabaseManager
+            db = DatabaseManager(args.db)
+        resolver = CropNameResolver(min_confidence=args.fuzzy_names) if args.fuzzy_names is not None else None
+        engine = RecommendationEngine(db=db, resolver=resolver)
+        count = write_results(engine.recommend_many(read_entries(src, in_fmt)), dst, out_fmt)
+    finally:
+        if db is not None:
+            db.close()
+        if src is not sys.stdin:
+            src.close()
+        if dst is not sys.stdout:
+            dst.close()
+    print(f"Processed {count} entries.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
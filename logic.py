@@ -1,27 +1,33 @@
 """
 logic.py - Crop rotation, soil, fertilizer and technique recommendations.
 """
+from typing import Iterable, List, Optional
+
+from catalog import CATALOG, CropCatalog
+from data import FAMILY_FERTILIZER, FAMILY_TECHNIQUES, SOIL_RULES
+from rules import DecisionTable, Rule, rules_from_dicts, soil_facts
+from technique_index import TechniqueIndex
+
 
 class CropRotationLogic:
-    # A simple mapping for family lookup by crop name (lowercase)
-    CROP_FAMILIES = {
-        "wheat": "cereal", "maize": "cereal", "rice": "cereal", "barley": "cereal",
-        "soybean": "legume", "peanut": "legume", "lentil": "legume", "chickpea": "legume",
-        "potato": "root", "cassava": "root", "yam": "root", "carrot": "root",
-        "tomato": "vegetable", "onion": "vegetable", "cabbage": "vegetable", "mustard": "vegetable",
-        "sunflower": "oilseed", "cotton": "fiber"
-    }
+    def __init__(self, catalog: CropCatalog = CATALOG, resolver=None):
+        self.catalog = catalog
+        # Optional CropNameResolver for misspelled, plural or local crop names
+        self.resolver = resolver
 
     def check_rotation(self, previous_crop: str, current_crop: str):
-        prev_family = self.CROP_FAMILIES.get(previous_crop.lower())
-        curr_family = self.CROP_FAMILIES.get(current_crop.lower())
+        if self.resolver is not None:
+            previous_crop = self.resolver.canonical(previous_crop) or previous_crop
+            current_crop = self.resolver.canonical(current_crop) or current_crop
+        prev_family = self.catalog.family_of(previous_crop)
+        curr_family = self.catalog.family_of(current_crop)
 
         if not prev_family or not curr_family:
             return f"❓ Unknown crop: {previous_crop if not prev_family else ''} {current_crop if not curr_family else ''}".strip(), []
 
         if prev_family == curr_family:
             # suggest alternatives from other families
-            alternatives = [name.title() for name, fam in self.CROP_FAMILIES.items() if fam != prev_family]
+            alternatives = list(self.catalog.names_outside_family(prev_family))
             msg = f"⚠️ Avoid planting {current_crop} after {previous_crop} (same family: {prev_family}). Choose an alternative."
             return msg, alternatives
         else:
@@ -29,55 +35,75 @@ class CropRotationLogic:
 
 
 class SoilRecommendationSystem:
-    FERTILIZER_RECOMMENDATIONS = {
-        "cereal": "NPK 15:15:15 (~200 kg/ha) + Urea top-dress.",
-        "legume": "Low N required; apply SSP (P source).",
-        "root": "Higher K demand: MOP + well-decomposed compost.",
-        "vegetable": "Balanced NPK 20:10:10 + organic compost.",
-        "oilseed": "Balanced NPK + Boron supplement.",
-        "fiber": "Nitrogen and Potassium priority; moderate Phosphorus.",
-    }
+    FERTILIZER_RECOMMENDATIONS = FAMILY_FERTILIZER
+
+    # Compiled decision tables; replace with use_soil_rules() to load other rule sets
+    FERTILIZER_TABLE = None  # built by rebuild_fertilizer_table() below
+    SOIL_TABLE = DecisionTable(
+        rules_from_dicts(SOIL_RULES),
+        default="General soil care: add organic matter and monitor moisture.",
+    )
 
     @staticmethod
-    def recommend_fertilizer(crop_name: str):
-        family = CropRotationLogic.CROP_FAMILIES.get(crop_name.lower())
+    def recommend_fertilizer(crop_name: str, catalog: CropCatalog = CATALOG):
+        family = catalog.family_of(crop_name)
         if family:
-            return SoilRecommendationSystem.FERTILIZER_RECOMMENDATIONS.get(family, "Use balanced NPK and compost.")
+            return SoilRecommendationSystem.FERTILIZER_TABLE.first({"family": family})
         return "No fertilizer recommendation found."
 
     @staticmethod
     def recommend_soil_management(soil, crops):
-        # Very lightweight rule-of-thumb advice using soil properties
-        fert = soil.properties.get("fertility")
-        drainage = soil.properties.get("drainage")
+        # Rule-of-thumb advice matched on soil properties and the crop history
+        return " ".join(SoilRecommendationSystem.SOIL_TABLE.evaluate(soil_facts(soil, crops)))
 
-        tips = []
-        if fert == "low":
-            tips.append("Incorporate compost/manure to boost fertility.")
-        elif fert == "high":
-            tips.append("Maintain fertility with residues/cover crops.")
+    @staticmethod
+    def recommend_soil_management_many(soils: Iterable, crops) -> List[str]:
+        """recommend_soil_management for many soils (e.g. every field of a co-op) at once."""
+        results = SoilRecommendationSystem.SOIL_TABLE.evaluate_many(soil_facts(soil, crops) for soil in soils)
+        return [" ".join(advice) for advice in results]
 
-        if drainage == "fast":
-            tips.append("Use mulch and drip to reduce water loss.")
-        elif drainage == "slow":
-            tips.append("Create raised beds/ridges and avoid over-irrigation.")
+    @staticmethod
+    def use_soil_rules(rules: Iterable[Rule]):
+        SoilRecommendationSystem.SOIL_TABLE = DecisionTable(rules, SoilRecommendationSystem.SOIL_TABLE.default)
 
-        if not tips:
-            tips.append("General soil care: add organic matter and monitor moisture.")
-        return " ".join(tips)
+    @staticmethod
+    def rebuild_fertilizer_table():
+        """Recompile FERTILIZER_TABLE after FERTILIZER_RECOMMENDATIONS changed."""
+        SoilRecommendationSystem.FERTILIZER_TABLE = DecisionTable(
+            [Rule(advice, {"family": family}) for family, advice in SoilRecommendationSystem.FERTILIZER_RECOMMENDATIONS.items()],
+            default="Use balanced NPK and compost.",
+        )
 
 
 class TechniqueSuggestion:
-    TECHS_BY_FAMILY = {
-        "cereal": ["Drip irrigation", "Precision planting"],
-        "legume": ["Intercropping with cereals", "Mulching"],
-        "root": ["Ridging", "Soil moisture monitoring"],
-        "vegetable": ["Fertigation system", "Greenhouse/shade-net (if possible)"],
-        "oilseed": ["Integrated pest management", "Rotate with legumes"],
-        "fiber": ["Irrigation scheduling", "Regular soil testing"],
-    }
+    TECHS_BY_FAMILY = FAMILY_TECHNIQUES
+
+    # Family lists merged with data.TECHNIQUES, indexed by (family, soil)
+    INDEX = None  # built by rebuild_index() below
 
     @staticmethod
-    def suggest_for_crop(crop_name: str):
-        fam = CropRotationLogic.CROP_FAMILIES.get(crop_name.lower())
-        return TechniqueSuggestion.TECHS_BY_FAMILY.get(fam, ["No specific techniques available."])
+    def suggest_for_crop(
+        crop_name: str,
+        soil_type: Optional[str] = None,
+        catalog: CropCatalog = CATALOG,
+        index: Optional[TechniqueIndex] = None,
+    ):
+        """Techniques for a crop of `catalog`, ranked by `index` (default INDEX, built from CATALOG)."""
+        fam = catalog.family_of(crop_name)
+        if soil_type is None:
+            return TechniqueSuggestion.TECHS_BY_FAMILY.get(fam, ["No specific techniques available."])
+        index = index or TechniqueSuggestion.INDEX
+        return index.suggest(fam, soil_type) or ["No specific techniques available."]
+
+    @staticmethod
+    def build_index(catalog: CropCatalog) -> TechniqueIndex:
+        return TechniqueIndex(TechniqueSuggestion.TECHS_BY_FAMILY, catalog.techniques, catalog.soil_types)
+
+    @staticmethod
+    def rebuild_index():
+        """Rebuild INDEX after the catalog techniques, soils or TECHS_BY_FAMILY changed."""
+        TechniqueSuggestion.INDEX = TechniqueSuggestion.build_index(CATALOG)
+
+
+SoilRecommendationSystem.rebuild_fertilizer_table()
+TechniqueSuggestion.rebuild_index()
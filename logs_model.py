@@ -0,0 +1,127 @@
+"""
+logs_model.py - Lazily paginated table model over the user_entries log, with full-text search.
+"""
+from typing import Dict, Optional
+
+from PyQt6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+from database import DatabaseManager, LOG_COLUMNS
+
+
+# Searches with more matches than this list newest first: bm25 scores every match
+RANKED_SEARCH_LIMIT = 20_000
+
+
+class UserEntriesModel(QAbstractTableModel):
+    HEADERS = [
+        "Farmland Size", "Previous Crop", "Current Crop", "Soil Type",
+        "Recommendation", "Fertilizer", "Techniques"
+    ]
+
+    def __init__(self, db: DatabaseManager, page_size: int = 200, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.page_size = page_size
+        self._rows = []
+        self._has_more = True
+        self._sort_column: Optional[str] = None
+        self._descending = True
+        self._filters: Dict[str, str] = {}
+        # Full-text search; while set it replaces the sort order and column filters
+        self._search: Optional[str] = None
+        self._ranked = True
+        self.match_count = 0
+
+    # --- Qt model interface -------------------------------------------------
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(LOG_COLUMNS)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.ToolTipRole):
+            # entry: (id, farmland_size, previous_crop, current_crop, soil_type, recommendation, fertilizer, techniques)
+            value = self._rows[index.row()][index.column() + 1]
+            return "" if value is None else str(value)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Horizontal:
+            return self.HEADERS[section]
+        return str(section + 1)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self._has_more
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or not self._has_more:
+            return
+        if self._search:
+            page = self.db.search_entries(self._search, self.page_size, offset=len(self._rows), ranked=self._ranked)
+        else:
+            page = self.db.get_user_entries_page(
+                limit=self.page_size,
+                after=self._last_key(),
+                sort_column=self._sort_column,
+                descending=self._descending,
+                filters=self._filters,
+            )
+        self._has_more = len(page) == self.page_size
+        if not page:
+            return
+        self.beginInsertRows(QModelIndex(), len(self._rows), len(self._rows) + len(page) - 1)
+        self._rows.extend(page)
+        self.endInsertRows()
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        # A negative column means "no sort indicator": newest entries first
+        if column < 0:
+            self._sort_column, self._descending = None, True
+        else:
+            self._sort_column = LOG_COLUMNS[column]
+            self._descending = order == Qt.SortOrder.DescendingOrder
+        self.reload()
+
+    # --- Filtering ----------------------------------------------------------
+
+    def set_filters(self, filters: Dict[int, str]):
+        """Replace the column filters (column index -> substring) and reload."""
+        self._filters = {LOG_COLUMNS[column]: text for column, text in filters.items() if text}
+        self.reload()
+
+    def set_search(self, text: str):
+        """Show entries matching every word of `text`, best match first; '' ends the search."""
+        self._search = text.strip() or None
+        self.match_count = self.db.count_matches(self._search) if self._search else 0
+        self._ranked = self.match_count <= RANKED_SEARCH_LIMIT
+        self.reload()
+
+    @property
+    def searching(self) -> bool:
+        return self._search is not None
+
+    @property
+    def ranked(self) -> bool:
+        return self._ranked
+
+    def reload(self):
+        """Drop loaded pages; the view fetches the first page again on demand."""
+        self.beginResetModel()
+        self._rows = []
+        self._has_more = True
+        self.endResetModel()
+
+    def _last_key(self):
+        if not self._rows:
+            return None
+        last = self._rows[-1]
+        if self._sort_column is None:
+            return (last[0], last[0])
+        value = last[LOG_COLUMNS.index(self._sort_column) + 1]
+        return ("" if value is None else value, last[0])
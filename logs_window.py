@@ -1,16 +1,23 @@
 """
 logs_window.py - Window to display all saved recommendations/logs.
 """
-from PyQt6.QtWidgets import QMainWindow, QWidget, QVBoxLayout, QPushButton, QTableWidget, QTableWidgetItem, QLabel
-from PyQt6.QtCore import QSize
-from database import DatabaseManager
+from PyQt6.QtWidgets import (
+    QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QTableView, QLabel,
+    QLineEdit, QComboBox
+)
+from PyQt6.QtCore import QSize, QTimer, Qt
+from logs_model import UserEntriesModel
+
+# Rows used to size columns, instead of measuring every loaded row
+COLUMN_SIZE_SAMPLE = 50
 
 class LogsWindow(QMainWindow):
     def __init__(self, main_window):
         super().__init__()
         self.setWindowTitle("Recommendation Logs")
         self.setFixedSize(QSize(950, 450))
-        self.db = DatabaseManager()
+        # Share the main window's connections instead of opening new ones
+        self.db = main_window.db
         self.main_window = main_window
         self._init_ui()
 
@@ -21,12 +28,44 @@ class LogsWindow(QMainWindow):
         label = QLabel("<b>All Recommendation Logs</b>")
         layout.addWidget(label)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(7)
-        self.table.setHorizontalHeaderLabels([
-            "Farmland Size", "Previous Crop", "Current Crop", "Soil Type",
-            "Recommendation", "Fertilizer", "Techniques"
-        ])
+        # Full-text search over the advice text, ranked by relevance
+        search_layout = QHBoxLayout()
+        self.search_input = QLineEdit()
+        self.search_input.setPlaceholderText("Search recommendations, fertilizer and techniques (e.g. Boron, raised beds)...")
+        self.search_status = QLabel()
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(300)
+        self.search_timer.timeout.connect(self.apply_search)
+        self.search_input.textChanged.connect(self.search_timer.start)
+        search_layout.addWidget(self.search_input, 1)
+        search_layout.addWidget(self.search_status)
+        layout.addLayout(search_layout)
+
+        # Column filter: pick a column and type; applied in SQL after a short pause
+        filter_layout = QHBoxLayout()
+        self.filter_column = QComboBox()
+        self.filter_column.addItems(UserEntriesModel.HEADERS)
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter...")
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(300)
+        self.filter_timer.timeout.connect(self.apply_filter)
+        self.filter_input.textChanged.connect(self.filter_timer.start)
+        self.filter_column.currentIndexChanged.connect(self.apply_filter)
+        filter_layout.addWidget(self.filter_column)
+        filter_layout.addWidget(self.filter_input, 1)
+        layout.addLayout(filter_layout)
+
+        self.model = UserEntriesModel(self.db, parent=self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
+        header = self.table.horizontalHeader()
+        header.setResizeContentsPrecision(COLUMN_SIZE_SAMPLE)
+        header.setMaximumSectionSize(400)
+        header.setSortIndicator(-1, Qt.SortOrder.DescendingOrder)
+        self.table.setSortingEnabled(True)
         self.load_logs()
         layout.addWidget(self.table)
 
@@ -41,8 +80,8 @@ class LogsWindow(QMainWindow):
         self.setStyleSheet("""
             QMainWindow { background-color: #f4fff8; }
             QLabel { color: #2f4f4f; font-size: 14px; }
-            QTableWidget { background: #ffffff; border: 1px solid #a3c293; color: #000000; }
-            QTableWidget::item { color: #000000; }
+            QTableView { background: #ffffff; border: 1px solid #a3c293; color: #000000; }
+            QTableView::item { color: #000000; }
             QPushButton {
                 background-color: #4CAF50; color: white; padding: 6px 12px;
                 border-radius: 6px; font-size: 14px;
@@ -51,19 +90,29 @@ class LogsWindow(QMainWindow):
         """)
 
     def load_logs(self):
-        logs = self.db.get_user_entries()
-        self.table.setRowCount(len(logs))
-        for row, entry in enumerate(logs):
-            # entry: (id, farmland_size, previous_crop, current_crop, soil_type, recommendation, fertilizer, techniques)
-            self.table.setItem(row, 0, QTableWidgetItem(str(entry[1])))
-            self.table.setItem(row, 1, QTableWidgetItem(entry[2]))
-            self.table.setItem(row, 2, QTableWidgetItem(entry[3]))
-            self.table.setItem(row, 3, QTableWidgetItem(entry[4]))
-            self.table.setItem(row, 4, QTableWidgetItem(entry[5]))
-            self.table.setItem(row, 5, QTableWidgetItem(entry[6]))
-            self.table.setItem(row, 6, QTableWidgetItem(entry[7]))
+        self.model.reload()
+        if self.model.canFetchMore():
+            self.model.fetchMore()
         self.table.resizeColumnsToContents()
 
+    def apply_filter(self):
+        self.filter_timer.stop()
+        self.model.set_filters({self.filter_column.currentIndex(): self.filter_input.text()})
+
+    def apply_search(self):
+        self.search_timer.stop()
+        self.model.set_search(self.search_input.text())
+        searching = self.model.searching
+        # Search results come in relevance order and ignore the column filter
+        self.table.setSortingEnabled(not searching)
+        self.filter_column.setEnabled(not searching)
+        self.filter_input.setEnabled(not searching)
+        if not searching:
+            self.search_status.clear()
+        else:
+            order = "best first" if self.model.ranked else "newest first"
+            self.search_status.setText(f"{self.model.match_count:,} matches, {order}")
+
     def go_back(self):
         self.main_window.show()
         self.close()
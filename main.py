@@ -1,14 +1,24 @@
 
+import startup  # first, so the startup timings include the imports below
 import sys
 from PyQt6.QtWidgets import QApplication
 from main_window import MainWindow
 
 
 def main():
+    startup.mark("imports")
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()
-    sys.exit(app.exec())
+    startup.mark("window")
+    exit_code = app.exec()
+    window.shutdown()
+    if window.db is not None:
+        # Only loaded if the window opened the database (after the first frame)
+        from database import ConnectionManager
+
+        ConnectionManager.close_all()
+    sys.exit(exit_code)
 
 
 if __name__ == "__main__":
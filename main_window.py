@@ -7,10 +7,8 @@ from PyQt6.QtCore import QSize, QTimer, QPropertyAnimation, QEasingCurve, QRect,
 from PyQt6.QtGui import QPalette, QColor, QFont
 import sys
 
-from database import DatabaseManager
-from logic import CropRotationLogic, SoilRecommendationSystem, TechniqueSuggestion
-from data import CROPS, SOILS, TECHNIQUES
-from logs_window import LogsWindow
+import startup
+from catalog import CATALOG
 
 
 class AnimatedWidget(QWidget):
@@ -37,17 +35,85 @@ class MainWindow(QMainWindow):
         self.setWindowTitle("Smart Crop Rotation Assistant")
         self.setMinimumSize(QSize(1200, 700))  # Wider minimum size for grid layout
         self.resize(QSize(1400, 800))  # Larger default size
-        self.db = DatabaseManager()
-        self.rotation_logic = CropRotationLogic()
-        self._init_ui()
+        # The database, engine, logs and dashboard windows are created on first use (see _connect_database)
+        self.db = None
+        # Catalog changes polled while a recommendation was running, applied once the worker is idle
+        self._pending_catalog = {}
+        self.logs_window = None
+        self.dashboard_window = None
+        self._first_frame = False
+        # Style before building the widgets so each is polished once
         self._apply_theme()
+        self._init_ui()
         self._setup_animations()
 
+    def _connect_database(self):
+        """
+        Open the database and build everything that needs it. Runs right after
+        the first frame, or earlier if something needs the database first.
+        """
+        if self.db is not None:
+            return
+        # Imported here rather than at the top so they don't delay the first frame
+        from catalog_store import CatalogStore
+        from database import DatabaseManager
+        from engine import RecommendationEngine
+        from preview import RecommendationPreview
+        from retention import RetentionPolicy
+        from snapshot import Snapshot
+        from workers import MaintenanceWorker, RecommendationWorker
+
+        self.db = DatabaseManager()
+        # Reference data comes from the database; apply it before anything indexes the catalog
+        self.catalog_store = CatalogStore(self.db)
+        # A current snapshot saves reading the catalog and precomputed table from the database
+        self.snapshot = Snapshot(self.db)
+        changed = self.snapshot.restore_catalog(self.catalog_store)
+        self.engine = RecommendationEngine(db=self.db)
+        self.snapshot.restore_table(self.engine.table)
+        self.worker = RecommendationWorker(self.engine, self.db, self)
+        self.worker.finished.connect(self.show_recommendation)
+        self.worker.failed.connect(lambda request_id, message: self.show_error(message))
+        self.worker.idle.connect(self._apply_pending_catalog)
+        self.preview = RecommendationPreview(self.engine)
+        if changed:
+            self._set_catalog_items()
+
+        # Hot-reload catalog edits made in the database while the app runs
+        self.catalog_timer = QTimer(self)
+        self.catalog_timer.timeout.connect(self.reload_catalog)
+        self.catalog_timer.start(2000)
+
+        # Free unused pages (and archive expired entries, if retention is configured) in small steps while idle
+        self.maintenance = MaintenanceWorker(RetentionPolicy(self.db), self)
+        self.maintenance.stepped.connect(lambda more: more or self.maintenance_timer.stop())
+        self.maintenance.failed.connect(lambda message: self.statusBar().showMessage(f"Archiving stopped: {message}"))
+        self.maintenance_timer = QTimer(self)
+        self.maintenance_timer.timeout.connect(self.run_maintenance)
+        self.maintenance_timer.start(250)
+        startup.mark("interactive")
+
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        if not self._first_frame:
+            self._first_frame = True
+            startup.mark("first frame")
+            QTimer.singleShot(0, self._connect_database)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.fade_timer.start()
+
+    def hideEvent(self, event):
+        # Also sent when minimized: no idle repaints while nothing is on screen
+        super().hideEvent(event)
+        self.fade_timer.stop()
+
     def _setup_animations(self):
-        # Subtle fade-in animation on startup
-        self.fade_timer = QTimer()
+        # Subtle background shift while the window is visible (see showEvent/hideEvent)
+        self.fade_timer = QTimer(self)
+        self.fade_timer.setInterval(3000)  # Change every 3 seconds
         self.fade_timer.timeout.connect(self._animate_background)
-        self.fade_timer.start(3000)  # Change every 3 seconds
         
     def _animate_background(self):
         # This will trigger a subtle color shift in the background
@@ -260,19 +326,28 @@ class MainWindow(QMainWindow):
 
         # Previous crop
         self.previous_crop_input = QComboBox()
-        self.previous_crop_input.addItems([c.name for c in CROPS])
+        self.previous_crop_input.addItems(CATALOG.crop_names)
         form_layout.addRow("🌱 Previous Crop:", self.previous_crop_input)
 
         # Current crop
         self.current_crop_input = QComboBox()
-        self.current_crop_input.addItems([c.name for c in CROPS])
+        self.current_crop_input.addItems(CATALOG.crop_names)
         form_layout.addRow("🌿 Current Crop:", self.current_crop_input)
 
         # Soil type
         self.soil_type_input = QComboBox()
-        self.soil_type_input.addItems([s.soil_type for s in SOILS])
+        self.soil_type_input.addItems(CATALOG.soil_types)
         form_layout.addRow("🏔️ Soil Type:", self.soil_type_input)
 
+        # Live preview: refresh the affected report sections shortly after the inputs change
+        self.preview_timer = QTimer(self)
+        self.preview_timer.setSingleShot(True)
+        self.preview_timer.setInterval(150)
+        self.preview_timer.timeout.connect(self.update_preview)
+        self.farmland_size_input.textChanged.connect(self.preview_timer.start)
+        for combo in (self.previous_crop_input, self.current_crop_input, self.soil_type_input):
+            combo.currentTextChanged.connect(self.preview_timer.start)
+
         form_widget.setLayout(form_layout)
         
         # Buttons section
@@ -292,33 +367,22 @@ class MainWindow(QMainWindow):
         self.logs_btn = QPushButton("📋 View Logs")
         self.logs_btn.clicked.connect(self.open_logs)
         
+        self.dashboard_btn = QPushButton("📈 Dashboard")
+        self.dashboard_btn.clicked.connect(self.open_dashboard)
+
         buttons_layout.addWidget(self.submit_btn)
         buttons_layout.addWidget(self.logs_btn)
+        buttons_layout.addWidget(self.dashboard_btn)
 
-        # Alternative picker (hidden until needed)
-        self.alternatives_widget = QWidget()
-        alternatives_layout = QVBoxLayout()
-        alternatives_layout.setContentsMargins(0, 10, 0, 0)
-        
-        self.alternative_label = QLabel("💡 Suggested Alternatives:")
-        self.alternative_label.setStyleSheet("font-weight: bold; color: #e65100;")
-        self.alternative_combo = QComboBox()
-        self.apply_alt_btn = QPushButton("✅ Apply Alternative")
-        self.apply_alt_btn.clicked.connect(self.apply_alternative)
-        
-        alternatives_layout.addWidget(self.alternative_label)
-        alternatives_layout.addWidget(self.alternative_combo)
-        alternatives_layout.addWidget(self.apply_alt_btn)
-        
-        self.alternatives_widget.setLayout(alternatives_layout)
-        self.alternatives_widget.setVisible(False)
+        # Alternative picker: built the first time there are alternatives to show
+        self.alternatives_widget = None
 
         # Assemble left panel
         left_layout.addWidget(title_label)
         left_layout.addWidget(form_widget)
         left_layout.addLayout(buttons_layout)
-        left_layout.addWidget(self.alternatives_widget)
         left_layout.addStretch()  # Push everything to top
+        self.left_layout = left_layout
         
         left_panel.setLayout(left_layout)
         
@@ -429,301 +493,126 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(main_widget)
 
     def handle_submit(self):
+        self._connect_database()
         # Clear previous content
         self.output_area.clear()
-        
-        # Validate size
-        try:
-            farmland_size = float(self.farmland_size_input.text())
-            if farmland_size <= 0:
-                raise ValueError
-        except ValueError:
-            return self.show_error("Please enter a valid farmland size (e.g., 2 or 3.5).")
-
-        prev_name = self.previous_crop_input.currentText()
-        curr_name = self.current_crop_input.currentText()
-        soil_type = self.soil_type_input.currentText()
 
-        # Objects
-        prev_crop = next((c for c in CROPS if c.name == prev_name), None)
-        curr_crop = next((c for c in CROPS if c.name == curr_name), None)
-        soil_obj = next((s for s in SOILS if s.soil_type == soil_type), None)
-        if not (prev_crop and curr_crop and soil_obj):
-            return self.show_error("Invalid crop or soil selection.")
+        # Compute, render and save on the worker pool; a newer submit supersedes this one
+        self.worker.submit(
+            self.farmland_size_input.text(),
+            self.previous_crop_input.currentText(),
+            self.current_crop_input.currentText(),
+            self.soil_type_input.currentText(),
+        )
+
+    def show_recommendation(self, request_id, rec, report, html):
+        self._show_alternatives(rec.alternatives)
+        if html is not None:
+            self.output_area.setHtml(html)
+        else:
+            # Fallback to plain text if HTML fails
+            from renderer import RENDERER
 
-        # Rotation check
-        rotation_msg, alternatives = self.rotation_logic.check_rotation(prev_name, curr_name)
+            self.output_area.setPlainText(RENDERER.text(report))
 
-        # Soil & fertilizer & techniques
-        soil_rec = SoilRecommendationSystem.recommend_soil_management(soil_obj, [prev_crop, curr_crop])
-        fertilizer = SoilRecommendationSystem.recommend_fertilizer(curr_name)
-        techniques = TechniqueSuggestion.suggest_for_crop(curr_name)
+    def update_preview(self):
+        # Preview only: nothing is saved until the user submits
+        self._connect_database()
+        try:
+            changed = self.preview.update(
+                self.farmland_size_input.text(),
+                self.previous_crop_input.currentText(),
+                self.current_crop_input.currentText(),
+                self.soil_type_input.currentText(),
+            )
+        except ValueError:
+            return
+        if "alternatives" in changed:
+            self._show_alternatives(self.preview.alternatives)
+        if self.preview.rendered:
+            self.output_area.setHtml(self.preview.document())
 
-        # Suggest next crops compatible with selected soil (and different from prev family)
-        next_crops = [
-            c.name for c in CROPS
-            if c.family != prev_crop.family and (soil_type in c.recommended_soil)
-        ]
+    def _init_alternatives(self):
+        self.alternatives_widget = QWidget()
+        alternatives_layout = QVBoxLayout()
+        alternatives_layout.setContentsMargins(0, 10, 0, 0)
+        
+        self.alternative_label = QLabel("💡 Suggested Alternatives:")
+        self.alternative_label.setStyleSheet("font-weight: bold; color: #e65100;")
+        self.alternative_combo = QComboBox()
+        self.apply_alt_btn = QPushButton("✅ Apply Alternative")
+        self.apply_alt_btn.clicked.connect(self.apply_alternative)
+        
+        alternatives_layout.addWidget(self.alternative_label)
+        alternatives_layout.addWidget(self.alternative_combo)
+        alternatives_layout.addWidget(self.apply_alt_btn)
+        
+        self.alternatives_widget.setLayout(alternatives_layout)
+        # Below the buttons, above the stretch
+        self.left_layout.insertWidget(self.left_layout.count() - 1, self.alternatives_widget)
 
+    def _show_alternatives(self, alternatives):
         # Show alternatives section only if rotation is bad
         if alternatives:
+            if self.alternatives_widget is None:
+                self._init_alternatives()
             self.alternatives_widget.setVisible(True)
-            # filter alternatives by soil and not same family as previous
-            filtered_alts = [
-                alt for alt in alternatives
-                if any(cs.name == alt for cs in CROPS) and
-                   next((c for c in CROPS if c.name == alt and soil_type in c.recommended_soil), None)
-            ]
-            # fallback to unfiltered if filtering empties
             self.alternative_combo.clear()
-            self.alternative_combo.addItems(filtered_alts or alternatives)
-        else:
+            self.alternative_combo.addItems(alternatives)
+        elif self.alternatives_widget is not None:
             self.alternatives_widget.setVisible(False)
 
-        # Generate and display recommendations
-        try:
-            output = self._generate_recommendation_html(
-                rotation_msg, alternatives, soil_rec, fertilizer, 
-                techniques, next_crops, farmland_size
-            )
-            self.output_area.setHtml(output)
-        except Exception as e:
-            # Fallback to plain text if HTML fails
-            plain_text = self._generate_recommendation_text(
-                rotation_msg, alternatives, soil_rec, fertilizer,
-                techniques, next_crops, farmland_size
-            )
-            self.output_area.setPlainText(plain_text)
+    def reload_catalog(self):
+        self._connect_database()
+        self._pending_catalog.update(self.catalog_store.poll())
+        # Don't swap indexes under a running computation: wait for the worker's idle signal
+        if not self.worker.busy:
+            self._apply_pending_catalog()
 
-        # Save to DB
-        try:
-            self.db.save_user_entry(
-                farmland_size,
-                prev_name,
-                curr_name,
-                soil_type,
-                rotation_msg,
-                fertilizer,
-                ", ".join(techniques) if techniques else ""
-            )
-        except Exception as e:
-            print(f"Database error: {e}")  # For debugging
-
-    def _generate_recommendation_html(self, rotation_msg, alternatives, soil_rec, fertilizer, techniques, next_crops, farmland_size):
-        """Generate well-formatted HTML for recommendations"""
-        output = []
-        output.append("""
-        <html>
-        <head>
-            <style>
-                body { 
-                    font-family: 'Segoe UI', Arial, sans-serif; 
-                    margin: 0; 
-                    padding: 0;
-                    line-height: 1.8;
-                    color: #2d2d2d;
-                }
-                .header-info {
-                    background: linear-gradient(135deg, #f0f8ff 0%, #e6f3ff 100%);
-                    border: 2px solid #4a90e2;
-                    border-radius: 10px;
-                    padding: 15px;
-                    margin-bottom: 20px;
-                    text-align: center;
-                }
-                .warning-box {
-                    background: linear-gradient(135deg, #fff8e1 0%, #fff3c4 100%);
-                    color: #e65100;
-                    padding: 15px;
-                    border-radius: 10px;
-                    border: 2px solid #ffcc02;
-                    margin: 15px 0px;
-                    box-shadow: 0px 3px 8px rgba(255,193,7,0.2);
-                    font-weight: bold;
-                }
-                .success-box {
-                    background: linear-gradient(135deg, #e8f5e8 0%, #d4f4d4 100%);
-                    color: #2e7d32;
-                    padding: 15px;
-                    border-radius: 10px;
-                    border: 2px solid #81c784;
-                    margin: 15px 0px;
-                    box-shadow: 0px 3px 8px rgba(129,199,132,0.2);
-                    font-weight: bold;
-                }
-                .section {
-                    margin: 20px 0px;
-                    padding: 15px;
-                    border-left: 4px solid #4caf50;
-                    background: rgba(248, 255, 248, 0.5);
-                    border-radius: 0px 8px 8px 0px;
-                    box-shadow: 0px 2px 5px rgba(0,0,0,0.1);
-                }
-                .section-title {
-                    color: #2d4a2d;
-                    font-size: 16px;
-                    font-weight: bold;
-                    margin-bottom: 10px;
-                    display: flex;
-                    align-items: center;
-                }
-                .section-content {
-                    color: #555;
-                    margin-left: 10px;
-                    font-size: 14px;
-                }
-                .highlight {
-                    background: rgba(76, 175, 80, 0.15);
-                    padding: 3px 6px;
-                    border-radius: 4px;
-                    font-weight: 500;
-                }
-                .grid-container {
-                    display: grid;
-                    grid-template-columns: 1fr 1fr;
-                    gap: 15px;
-                    margin: 15px 0;
-                }
-                .stat-card {
-                    background: white;
-                    border: 1px solid #90c695;
-                    border-radius: 8px;
-                    padding: 12px;
-                    text-align: center;
-                    box-shadow: 0px 2px 4px rgba(0,0,0,0.1);
-                }
-                .techniques-grid {
-                    display: flex;
-                    flex-wrap: wrap;
-                    gap: 8px;
-                    margin-top: 10px;
-                }
-                .technique-tag {
-                    background: linear-gradient(135deg, #4caf50, #45a049);
-                    color: white;
-                    padding: 6px 12px;
-                    border-radius: 20px;
-                    font-size: 12px;
-                    font-weight: bold;
-                }
-            </style>
-        </head>
-        <body>
-        """)
-        
-        # Header with farm info
-        output.append(f"""
-        <div class="header-info">
-            <h3 style="margin: 0; color: #4a90e2;">🚜 Farm Analysis Summary</h3>
-            <p style="margin: 5px 0;"><strong>Farmland Size:</strong> {farmland_size} acres/hectares</p>
-            <p style="margin: 5px 0;"><strong>Transition:</strong> {self.previous_crop_input.currentText()} → {self.current_crop_input.currentText()}</p>
-        </div>
-        """)
-        
-        # Rotation status
-        if alternatives:
-            output.append(f"""
-            <div class="warning-box">
-                <span style="font-size: 16px;">⚠️ Rotation Warning</span><br>
-                {rotation_msg}
-            </div>
-            """)
-        else:
-            output.append(f"""
-            <div class="success-box">
-                <span style="font-size: 16px;">✅ Rotation Success</span><br>
-                {rotation_msg}
-            </div>
-            """)
-
-        # Soil Management
-        if soil_rec:
-            output.append(f"""
-            <div class="section">
-                <div class="section-title">🌱 Soil Management Strategy</div>
-                <div class="section-content">{soil_rec}</div>
-            </div>
-            """)
-
-        # Fertilizer
-        if fertilizer:
-            output.append(f"""
-            <div class="section">
-                <div class="section-title">🧪 Fertilizer Recommendations</div>
-                <div class="section-content">{fertilizer}</div>
-            </div>
-            """)
-
-        # Techniques
-        if techniques:
-            techniques_html = ''.join(f'<span class="technique-tag">{t}</span>' for t in techniques)
-            output.append(f"""
-            <div class="section">
-                <div class="section-title">🔬 Modern Farming Techniques</div>
-                <div class="section-content">
-                    <div class="techniques-grid">{techniques_html}</div>
-                </div>
-            </div>
-            """)
-
-        # Next crops
-        if next_crops:
-            next_crops_html = ', '.join(f'<span class="highlight">{crop}</span>' for crop in next_crops)
-            output.append(f"""
-            <div class="section">
-                <div class="section-title">🌾 Recommended Next Crops</div>
-                <div class="section-content">
-                    <p>Based on your soil type and crop rotation principles:</p>
-                    {next_crops_html}
-                </div>
-            </div>
-            """)
-        else:
-            output.append(f"""
-            <div class="section">
-                <div class="section-title">🌾 Recommended Next Crops</div>
-                <div class="section-content">
-                    <p style="color: #e65100; font-style: italic;">
-                        No suitable crops found for your current soil type. 
-                        Consider soil amendment or consult with local agricultural experts.
-                    </p>
-                </div>
-            </div>
-            """)
-        
-        # Footer
-        output.append("""
-        <div style="margin-top: 30px; padding: 15px; background: rgba(232, 244, 232, 0.5); 
-                    border-radius: 8px; text-align: center; border: 1px dashed #90c695;">
-            <p style="margin: 0; font-size: 12px; color: #666; font-style: italic;">
-                💡 Tip: These recommendations are based on general agricultural principles. 
-                Always consult with local agricultural extension services for region-specific advice.
-            </p>
-        </div>
-        """)
-        
-        output.append("</body></html>")
-        return "".join(output)
+    def _apply_pending_catalog(self):
+        from catalog_store import apply_catalog
+        from preview import RecommendationPreview
 
-    def _generate_recommendation_text(self, rotation_msg, alternatives, soil_rec, fertilizer, techniques, next_crops, farmland_size):
-        """Generate plain text fallback for recommendations"""
-        output = []
-        
-        output.append(f"=== FARM ANALYSIS SUMMARY ===\n")
-        output.append(f"Farmland Size: {farmland_size} acres/hectares\n")
-        output.append(f"Crop Transition: {self.previous_crop_input.currentText()} → {self.current_crop_input.currentText()}\n\n")
-        
-        if alternatives:
-            output.append(f"⚠️ ROTATION WARNING:\n{rotation_msg}\n\n")
-        else:
-            output.append(f"✅ ROTATION SUCCESS:\n{rotation_msg}\n\n")
-        
-        output.append(f"🌱 SOIL MANAGEMENT:\n{soil_rec}\n\n")
-        output.append(f"🧪 FERTILIZER:\n{fertilizer}\n\n")
-        output.append(f"🔬 MODERN TECHNIQUES:\n{', '.join(techniques) if techniques else 'None available'}\n\n")
-        output.append(f"🌾 NEXT SUITABLE CROPS:\n{', '.join(next_crops) if next_crops else 'None found for current soil type'}\n\n")
-        
-        return "".join(output)
+        changes, self._pending_catalog = self._pending_catalog, {}
+        if not changes or not apply_catalog(changes):
+            return
+        self.engine.refresh()
+        self.preview = RecommendationPreview(self.engine)
+        self._set_catalog_items()
+
+    def run_maintenance(self):
+        if not self.worker.busy:
+            self.maintenance.step()
+
+    def _set_catalog_items(self):
+        self._set_combo_items(self.previous_crop_input, CATALOG.crop_names)
+        self._set_combo_items(self.current_crop_input, CATALOG.crop_names)
+        self._set_combo_items(self.soil_type_input, CATALOG.soil_types)
+        self.preview_timer.start()
+
+    @staticmethod
+    def _set_combo_items(combo, items):
+        # Keep the selection if it still exists
+        current = combo.currentText()
+        combo.blockSignals(True)
+        combo.clear()
+        combo.addItems(items)
+        if current in items:
+            combo.setCurrentText(current)
+        combo.blockSignals(False)
+
+    def save_snapshot(self):
+        """Snapshot the catalog and precomputed table for the next start."""
+        if self.db is not None:
+            self.snapshot.save(self.catalog_store, self.engine.table)
+
+    def shutdown(self):
+        """Finish background work and save the snapshot; call once the event loop has exited."""
+        if self.db is not None:
+            self.maintenance_timer.stop()
+            self.maintenance.shutdown()
+            self.worker.shutdown()
+            self.save_snapshot()
 
     def apply_alternative(self):
         alt = self.alternative_combo.currentText().strip()
@@ -734,15 +623,32 @@ class MainWindow(QMainWindow):
         self.handle_submit()
 
     def open_logs(self):
-        self.logs_window = LogsWindow(self)
+        if self.logs_window is None:
+            # Only load the logs UI when it is first opened
+            from logs_window import LogsWindow
+
+            self._connect_database()
+            self.logs_window = LogsWindow(self)
+        else:
+            self.logs_window.load_logs()
         self.logs_window.show()
         self.hide()
 
+    def open_dashboard(self):
+        if self.dashboard_window is None:
+            from dashboard import DashboardWindow
+
+            self._connect_database()
+            self.dashboard_window = DashboardWindow(self)
+        self.dashboard_window.show()
+        self.hide()
+
     def show_error(self, message):
         QMessageBox.critical(self, "Input Error", message)
 
 
 def main():
+    startup.mark("imports")
     app = QApplication(sys.argv)
     
     # Set application palette for better color support
@@ -752,7 +658,14 @@ def main():
     
     w = MainWindow()
     w.show()
-    sys.exit(app.exec())
+    startup.mark("window")
+    exit_code = app.exec()
+    w.shutdown()
+    if w.db is not None:
+        from database import ConnectionManager
+
+        ConnectionManager.close_all()
+    sys.exit(exit_code)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
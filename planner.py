@@ -0,0 +1,97 @@
+"""
+planner.py - Multi-season crop rotation planner.
+
+Finds the best N-season crop sequence for a field using memoized dynamic
+programming over (season, recent-families) states instead of enumerating
+every sequence. A crop may only be planted if its family was not grown in
+the last `min_gap` seasons and, by default, if it is recommended for the soil.
+"""
+from functools import lru_cache
+from typing import Callable, List, Optional, Sequence, Tuple
+
+from catalog import CATALOG, CropCatalog
+from classes import Crop
+
+# score(crop, soil_type, season, previous_family) -> float
+# The planner assumes the score only depends on these arguments, which is
+# what makes the per-state memoization exact.
+ScoreFunction = Callable[[Crop, str, int, Optional[str]], float]
+
+
+def default_score(crop: Crop, soil_type: str, season: int, previous_family: Optional[str]) -> float:
+    """Prefer a crop's best-listed soil and legumes after heavy feeders."""
+    if soil_type not in crop.recommended_soil:
+        score = 0.25
+    else:
+        score = 1.0 if crop.recommended_soil[0] == soil_type else 0.8
+    if crop.family == "legume" and previous_family not in (None, "legume"):
+        score += 0.3
+    return score
+
+
+class RotationPlan:
+    def __init__(self, crops: List[Crop], score: float):
+        self.crops = crops
+        self.score = score
+
+    @property
+    def crop_names(self) -> List[str]:
+        return [c.name for c in self.crops]
+
+    def __repr__(self):
+        return f"RotationPlan({' → '.join(self.crop_names)}, score={self.score:.2f})"
+
+
+class RotationPlanner:
+    def __init__(self, catalog: CropCatalog = CATALOG, score: ScoreFunction = default_score, min_gap: int = 1):
+        if min_gap < 1:
+            raise ValueError("min_gap must be at least 1")
+        self.catalog = catalog
+        self.score = score
+        self.min_gap = min_gap
+
+    def plan(self, soil_type: str, history: Sequence[str], seasons: int, strict_soil: bool = True) -> Optional[RotationPlan]:
+        """
+        Best plan for the next `seasons` seasons after `history` (oldest first).
+
+        Returns None when no sequence satisfies the rotation and soil rules.
+        """
+        if seasons <= 0:
+            return RotationPlan([], 0.0)
+
+        candidates = {
+            family: self.catalog.crops_for(family, soil_type) if strict_soil else self.catalog.crops_in_family(family)
+            for family in self.catalog.families
+        }
+        candidates = {family: crops for family, crops in candidates.items() if crops}
+
+        @lru_cache(maxsize=None)
+        def best_in_family(season: int, previous_family: Optional[str], family: str) -> Tuple[float, Crop]:
+            return max(
+                ((self.score(c, soil_type, season, previous_family), c) for c in candidates[family]),
+                key=lambda pair: pair[0],
+            )
+
+        @lru_cache(maxsize=None)
+        def best_from(season: int, recent: Tuple[Optional[str], ...]) -> Tuple[float, Tuple[Crop, ...]]:
+            if season == seasons:
+                return 0.0, ()
+            best = (float("-inf"), ())
+            for family in candidates:
+                if family in recent:
+                    continue
+                score, crop = best_in_family(season, recent[-1], family)
+                rest_score, rest = best_from(season + 1, (recent + (family,))[-self.min_gap:])
+                if score + rest_score > best[0]:
+                    best = (score + rest_score, (crop,) + rest)
+            return best
+
+        score, crops = best_from(0, self._initial_state(history))
+        if len(crops) != seasons:
+            return None
+        return RotationPlan(list(crops), score)
+
+    def _initial_state(self, history: Sequence[str]) -> Tuple[Optional[str], ...]:
+        families = [self.catalog.family_of(name) for name in history]
+        recent = ([None] * self.min_gap + families)[-self.min_gap:]
+        return tuple(recent)
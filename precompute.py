@@ -0,0 +1,115 @@
+"""
+precompute.py - Precomputed recommendations for every (previous, current, soil) combination.
+
+Recommendations only depend on the previous crop, current crop and soil, so
+for a given catalog they can be computed once and looked up in O(1). The
+table is keyed by a hash of the catalog contents and recommendation rules;
+when either changes the hash changes and the table is rebuilt. If a
+DatabaseManager is given, the table is persisted in crop_assistant.db and
+loaded from there on the first lookup.
+"""
+import hashlib
+import json
+import threading
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from catalog import CropCatalog
+from classes import Crop, Soil
+from logic import SoilRecommendationSystem, TechniqueSuggestion
+
+# Bump when recommendation code changes in a way the data hash can't see
+TABLE_FORMAT_VERSION = 2
+
+# Catalogs whose full key space exceeds this are computed on demand instead
+PRECOMPUTE_LIMIT = 250_000
+
+# (rotation_msg, alternatives, soil_rec, fertilizer, techniques, next_crops)
+Result = Tuple[str, List[str], str, str, List[str], List[str]]
+Key = Tuple[str, str, str]
+
+
+def catalog_hash(catalog: CropCatalog, settings: Optional[Dict] = None) -> str:
+    """Stable fingerprint of the catalog contents, the recommendation rules and engine settings."""
+    contents = {
+        "version": TABLE_FORMAT_VERSION,
+        "settings": settings or {},
+        "crops": [[c.name, c.family, list(c.recommended_soil)] for c in catalog.crops],
+        "soils": [[s.soil_type, s.properties] for s in catalog.soils],
+        "techniques": [[t.name, t.description, list(t.suitable_soil)] for t in catalog.techniques],
+        "fertilizer": [r.as_dict() for r in SoilRecommendationSystem.FERTILIZER_TABLE.rules],
+        "fertilizer_default": SoilRecommendationSystem.FERTILIZER_TABLE.default,
+        "soil_rules": [r.as_dict() for r in SoilRecommendationSystem.SOIL_TABLE.rules],
+        "soil_default": SoilRecommendationSystem.SOIL_TABLE.default,
+        "techs_by_family": TechniqueSuggestion.TECHS_BY_FAMILY,
+        "technique_weights": TechniqueSuggestion.INDEX.weights,
+    }
+    encoded = json.dumps(contents, sort_keys=True, ensure_ascii=False, default=str).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()[:16]
+
+
+class RecommendationTable:
+    def __init__(
+        self,
+        catalog: CropCatalog,
+        compute: Callable[[Crop, Crop, Soil], Result],
+        db=None,
+        settings: Optional[Dict] = None,
+    ):
+        self.catalog = catalog
+        self.compute = compute
+        self.db = db
+        self.settings = settings
+        self.catalog_hash = catalog_hash(catalog, settings)
+        self.enabled = len(catalog.crops) ** 2 * len(catalog.soils) <= PRECOMPUTE_LIMIT
+        self._results: Optional[Dict[Key, Result]] = None
+        self._load_lock = threading.Lock()
+        self._restore: Optional[Callable[[], Dict[Key, Result]]] = None
+
+    def lookup(self, previous_crop: str, current_crop: str, soil_type: str) -> Optional[Result]:
+        """Result for canonical catalog names, or None if the table is disabled."""
+        if not self.enabled:
+            return None
+        if self._results is None:
+            # Lookups may come from worker threads; build or load only once
+            with self._load_lock:
+                if self._results is None:
+                    self._results = self._load()
+        return self._results.get((previous_crop, current_crop, soil_type))
+
+    @property
+    def results(self) -> Optional[Dict[Key, Result]]:
+        """The loaded table, or None before the first lookup."""
+        return self._results
+
+    def restore(self, load: Callable[[], Dict[Key, Result]]):
+        """
+        On the first lookup, load the table for this catalog hash with `load`
+        (e.g. from a snapshot); if it returns None, load as usual.
+        """
+        self._restore = load
+
+    def _load(self) -> Dict[Key, Result]:
+        if self._restore is not None:
+            results = self._restore()
+            if results is not None:
+                return results
+        if self.db is not None:
+            results = {
+                (prev, curr, soil): tuple(json.loads(payload))
+                for prev, curr, soil, payload in self.db.load_precomputed(self.catalog_hash)
+            }
+            if results:
+                return results
+        results = dict(self.build())
+        if self.db is not None:
+            self.db.replace_precomputed(
+                self.catalog_hash,
+                ((*key, json.dumps(result, ensure_ascii=False)) for key, result in results.items()),
+            )
+        return results
+
+    def build(self) -> Iterator[Tuple[Key, Result]]:
+        for soil in self.catalog.soils:
+            for prev_crop in self.catalog.crops:
+                for curr_crop in self.catalog.crops:
+                    yield (prev_crop.name, curr_crop.name, soil.soil_type), self.compute(prev_crop, curr_crop, soil)
@@ -0,0 +1,152 @@
+"""
+preview.py - Incremental live preview of the recommendation report.
+
+The values handle_submit shows are nodes in a small dependency graph over
+the form inputs. When an input changes only the nodes downstream of it are
+recomputed, and a node whose value comes out unchanged stops propagation,
+so e.g. switching between two cereals never re-renders the technique
+section. Only report sections with a changed input are rendered again.
+"""
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from engine import RecommendationEngine
+from logic import SoilRecommendationSystem
+from renderer import RENDERER, SECTIONS, Report, ReportRenderer
+
+
+class DependencyGraph:
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self._order: List[str] = []
+        self._deps: Dict[str, Tuple[str, ...]] = {}
+        self._funcs: Dict[str, Callable] = {}
+        self._pending: Set[str] = set()
+
+    def add_input(self, name: str):
+        self._order.append(name)
+        self._deps[name] = ()
+
+    def add(self, name: str, deps: Tuple[str, ...], func: Callable):
+        """Add a node computed as func(*dep values); deps must already be in the graph."""
+        missing = [dep for dep in deps if dep not in self._deps]
+        if missing:
+            raise ValueError(f"Unknown dependencies for {name}: {', '.join(missing)}")
+        self._order.append(name)
+        self._deps[name] = deps
+        self._funcs[name] = func
+
+    def update(self, **inputs) -> Set[str]:
+        """Set input values and recompute what depends on them; returns the names that changed."""
+        changed = set(self._pending)
+        for name, value in inputs.items():
+            if name in self._funcs or name not in self._deps:
+                raise ValueError(f"Unknown input: {name}")
+            if name not in self.values or self.values[name] != value:
+                self.values[name] = value
+                changed.add(name)
+        try:
+            for name in self._order:
+                func = self._funcs.get(name)
+                if func is None:
+                    continue
+                if name in self.values and changed.isdisjoint(self._deps[name]):
+                    continue
+                value = func(*(self.values[dep] for dep in self._deps[name]))
+                if name not in self.values or self.values[name] != value:
+                    self.values[name] = value
+                    changed.add(name)
+        except Exception:
+            # Retry everything downstream of these on the next update
+            self._pending = changed
+            raise
+        self._pending = set()
+        return changed
+
+
+# Graph nodes each report section is rendered from
+SECTION_DEPS = {
+    "header": ("size", "prev", "curr"),
+    "rotation": ("rotation",),
+    "soil": ("soil_rec",),
+    "fertilizer": ("fertilizer",),
+    "techniques": ("techniques",),
+    "next_crops": ("next_crops",),
+}
+
+
+class RecommendationPreview:
+    def __init__(self, engine: RecommendationEngine, renderer: ReportRenderer = RENDERER, fmt: str = "html"):
+        self.engine = engine
+        self.renderer = renderer
+        self.fmt = fmt
+        self.graph = self._build_graph()
+        self.report: Optional[Report] = None
+        self.rendered: List[str] = []
+        self._sections: Dict[str, str] = {}
+
+    def _build_graph(self) -> DependencyGraph:
+        catalog = self.engine.catalog
+        graph = DependencyGraph()
+        for name in ("farmland_size", "previous_crop", "current_crop", "soil_type"):
+            graph.add_input(name)
+        graph.add("size", ("farmland_size",), self.engine.parse_size)
+        graph.add("prev", ("previous_crop",), lambda name: _resolve(catalog.crop, name))
+        graph.add("curr", ("current_crop",), lambda name: _resolve(catalog.crop, name))
+        graph.add("soil", ("soil_type",), lambda name: _resolve(catalog.soil, name))
+        graph.add(
+            "rotation", ("prev", "curr"),
+            lambda prev, curr: self.engine.rotation_logic.check_rotation(prev.name, curr.name),
+        )
+        graph.add(
+            "soil_rec", ("soil", "prev", "curr"),
+            lambda soil, prev, curr: SoilRecommendationSystem.recommend_soil_management(soil, [prev, curr]),
+        )
+        graph.add("fertilizer", ("curr",), self.engine.fertilizer_for)
+        graph.add("techniques", ("curr", "soil"), self.engine.techniques_for)
+        graph.add(
+            "next_crops", ("soil", "prev"),
+            lambda soil, prev: [c.name for c in catalog.rotation_candidates(soil.soil_type, prev.family)],
+        )
+        graph.add(
+            "alternatives", ("rotation", "prev", "soil"),
+            lambda rotation, prev, soil: self.engine.rank_alternatives(rotation[1], prev, soil.soil_type),
+        )
+        return graph
+
+    @property
+    def alternatives(self) -> List[str]:
+        return list(self.graph.values.get("alternatives", []))
+
+    def update(self, farmland_size, previous_crop: str, current_crop: str, soil_type: str) -> Set[str]:
+        """
+        Recompute for new form values and re-render the affected sections.
+        Returns the graph nodes that changed; raises ValueError on invalid input.
+        """
+        changed = self.graph.update(
+            farmland_size=farmland_size, previous_crop=previous_crop,
+            current_crop=current_crop, soil_type=soil_type,
+        )
+        values = self.graph.values
+        rotation_msg, rotation_alternatives = values["rotation"]
+        self.report = Report(
+            values["size"], values["prev"].name, values["curr"].name, not rotation_alternatives,
+            rotation_msg, values["soil_rec"], values["fertilizer"],
+            tuple(values["techniques"]), tuple(values["next_crops"]),
+        )
+        self.rendered = [
+            section for section in SECTIONS
+            if section not in self._sections or not changed.isdisjoint(SECTION_DEPS[section])
+        ]
+        for section in self.rendered:
+            self._sections[section] = self.renderer.section(self.fmt, section, self.report)
+        return changed
+
+    def document(self) -> str:
+        return self.renderer.document(self.fmt, [self._sections[section] for section in SECTIONS])
+
+
+def _resolve(lookup: Callable, name: str):
+    found = lookup(name)
+    if found is None:
+        raise ValueError("Invalid crop or soil selection.")
+    return found
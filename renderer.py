@@ -0,0 +1,358 @@
+"""
+renderer.py - Recommendation report rendering (HTML and plain text), free of Qt.
+
+The report layout is compiled once into static fragments with named slots.
+Both output formats are rendered from the same Report, and rendered
+fragments are cached by their inputs, so repeated crop/soil combinations
+only pay for the parts that changed (usually the farmland size).
+"""
+from functools import lru_cache
+from operator import attrgetter
+from string import Formatter
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+
+class Template:
+    """A format string split once into literal text and slot names."""
+
+    __slots__ = ("literals", "slots", "_getter")
+
+    def __init__(self, source: str):
+        literals: List[str] = []
+        slots: List[str] = []
+        for literal, field, _, _ in Formatter().parse(source):
+            literals.append(literal)
+            if field is not None:
+                slots.append(field)
+        # Always one more literal than slots, so render() can interleave them
+        if len(literals) == len(slots):
+            literals.append("")
+        self.literals = literals
+        self.slots = tuple(slots)
+        self._getter = attrgetter(*slots) if slots else None
+
+    def values(self, obj) -> Tuple:
+        """Slot values read from the attributes of `obj`."""
+        if self._getter is None:
+            return ()
+        values = self._getter(obj)
+        return values if len(self.slots) > 1 else (values,)
+
+    def render(self, values: Tuple, filters: Dict[str, Callable]) -> str:
+        parts = [self.literals[0]]
+        for slot, value, literal in zip(self.slots, values, self.literals[1:]):
+            convert = filters.get(slot, str)
+            parts.append(convert(value))
+            parts.append(literal)
+        return "".join(parts)
+
+
+HTML_HEAD = """
+        <html>
+        <head>
+            <style>
+                body { 
+                    font-family: 'Segoe UI', Arial, sans-serif; 
+                    margin: 0; 
+                    padding: 0;
+                    line-height: 1.8;
+                    color: #2d2d2d;
+                }
+                .header-info {
+                    background: linear-gradient(135deg, #f0f8ff 0%, #e6f3ff 100%);
+                    border: 2px solid #4a90e2;
+                    border-radius: 10px;
+                    padding: 15px;
+                    margin-bottom: 20px;
+                    text-align: center;
+                }
+                .warning-box {
+                    background: linear-gradient(135deg, #fff8e1 0%, #fff3c4 100%);
+                    color: #e65100;
+                    padding: 15px;
+                    border-radius: 10px;
+                    border: 2px solid #ffcc02;
+                    margin: 15px 0px;
+                    box-shadow: 0px 3px 8px rgba(255,193,7,0.2);
+                    font-weight: bold;
+                }
+                .success-box {
+                    background: linear-gradient(135deg, #e8f5e8 0%, #d4f4d4 100%);
+                    color: #2e7d32;
+                    padding: 15px;
+                    border-radius: 10px;
+                    border: 2px solid #81c784;
+                    margin: 15px 0px;
+                    box-shadow: 0px 3px 8px rgba(129,199,132,0.2);
+                    font-weight: bold;
+                }
+                .section {
+                    margin: 20px 0px;
+                    padding: 15px;
+                    border-left: 4px solid #4caf50;
+                    background: rgba(248, 255, 248, 0.5);
+                    border-radius: 0px 8px 8px 0px;
+                    box-shadow: 0px 2px 5px rgba(0,0,0,0.1);
+                }
+                .section-title {
+                    color: #2d4a2d;
+                    font-size: 16px;
+                    font-weight: bold;
+                    margin-bottom: 10px;
+                    display: flex;
+                    align-items: center;
+                }
+                .section-content {
+                    color: #555;
+                    margin-left: 10px;
+                    font-size: 14px;
+                }
+                .highlight {
+                    background: rgba(76, 175, 80, 0.15);
+                    padding: 3px 6px;
+                    border-radius: 4px;
+                    font-weight: 500;
+                }
+                .grid-container {
+                    display: grid;
+                    grid-template-columns: 1fr 1fr;
+                    gap: 15px;
+                    margin: 15px 0;
+                }
+                .stat-card {
+                    background: white;
+                    border: 1px solid #90c695;
+                    border-radius: 8px;
+                    padding: 12px;
+                    text-align: center;
+                    box-shadow: 0px 2px 4px rgba(0,0,0,0.1);
+                }
+                .techniques-grid {
+                    display: flex;
+                    flex-wrap: wrap;
+                    gap: 8px;
+                    margin-top: 10px;
+                }
+                .technique-tag {
+                    background: linear-gradient(135deg, #4caf50, #45a049);
+                    color: white;
+                    padding: 6px 12px;
+                    border-radius: 20px;
+                    font-size: 12px;
+                    font-weight: bold;
+                }
+            </style>
+        </head>
+        <body>
+        """
+
+HTML_HEADER = """
+        <div class="header-info">
+            <h3 style="margin: 0; color: #4a90e2;">🚜 Farm Analysis Summary</h3>
+            <p style="margin: 5px 0;"><strong>Farmland Size:</strong> {farmland_size} acres/hectares</p>
+            <p style="margin: 5px 0;"><strong>Transition:</strong> {previous_crop} → {current_crop}</p>
+        </div>
+        """
+
+HTML_WARNING = """
+            <div class="warning-box">
+                <span style="font-size: 16px;">⚠️ Rotation Warning</span><br>
+                {rotation_msg}
+            </div>
+            """
+
+HTML_SUCCESS = """
+            <div class="success-box">
+                <span style="font-size: 16px;">✅ Rotation Success</span><br>
+                {rotation_msg}
+            </div>
+            """
+
+HTML_SOIL = """
+            <div class="section">
+                <div class="section-title">🌱 Soil Management Strategy</div>
+                <div class="section-content">{soil_rec}</div>
+            </div>
+            """
+
+HTML_FERTILIZER = """
+            <div class="section">
+                <div class="section-title">🧪 Fertilizer Recommendations</div>
+                <div class="section-content">{fertilizer}</div>
+            </div>
+            """
+
+HTML_TECHNIQUES = """
+            <div class="section">
+                <div class="section-title">🔬 Modern Farming Techniques</div>
+                <div class="section-content">
+                    <div class="techniques-grid">{techniques}</div>
+                </div>
+            </div>
+            """
+
+HTML_NEXT_CROPS = """
+            <div class="section">
+                <div class="section-title">🌾 Recommended Next Crops</div>
+                <div class="section-content">
+                    <p>Based on your soil type and crop rotation principles:</p>
+                    {next_crops}
+                </div>
+            </div>
+            """
+
+HTML_NO_NEXT_CROPS = """
+            <div class="section">
+                <div class="section-title">🌾 Recommended Next Crops</div>
+                <div class="section-content">
+                    <p style="color: #e65100; font-style: italic;">
+                        No suitable crops found for your current soil type. 
+                        Consider soil amendment or consult with local agricultural experts.
+                    </p>
+                </div>
+            </div>
+            """
+
+HTML_FOOTER = """
+        <div style="margin-top: 30px; padding: 15px; background: rgba(232, 244, 232, 0.5); 
+                    border-radius: 8px; text-align: center; border: 1px dashed #90c695;">
+            <p style="margin: 0; font-size: 12px; color: #666; font-style: italic;">
+                💡 Tip: These recommendations are based on general agricultural principles. 
+                Always consult with local agricultural extension services for region-specific advice.
+            </p>
+        </div>
+        </body></html>"""
+
+TEXT_HEADER = (
+    "=== FARM ANALYSIS SUMMARY ===\n"
+    "Farmland Size: {farmland_size} acres/hectares\n"
+    "Crop Transition: {previous_crop} → {current_crop}\n\n"
+)
+TEXT_WARNING = "⚠️ ROTATION WARNING:\n{rotation_msg}\n\n"
+TEXT_SUCCESS = "✅ ROTATION SUCCESS:\n{rotation_msg}\n\n"
+TEXT_SOIL = "🌱 SOIL MANAGEMENT:\n{soil_rec}\n\n"
+TEXT_FERTILIZER = "🧪 FERTILIZER:\n{fertilizer}\n\n"
+TEXT_TECHNIQUES = "🔬 MODERN TECHNIQUES:\n{techniques}\n\n"
+TEXT_NEXT_CROPS = "🌾 NEXT SUITABLE CROPS:\n{next_crops}\n\n"
+
+# Compiled layouts: format -> fragment name -> Template
+TEMPLATES: Dict[str, Dict[str, Template]] = {
+    "html": {
+        "header": Template(HTML_HEADER),
+        "warning": Template(HTML_WARNING),
+        "success": Template(HTML_SUCCESS),
+        "soil": Template(HTML_SOIL),
+        "fertilizer": Template(HTML_FERTILIZER),
+        "techniques": Template(HTML_TECHNIQUES),
+        "next_crops": Template(HTML_NEXT_CROPS),
+        "no_next_crops": Template(HTML_NO_NEXT_CROPS),
+    },
+    "text": {
+        "header": Template(TEXT_HEADER),
+        "warning": Template(TEXT_WARNING),
+        "success": Template(TEXT_SUCCESS),
+        "soil": Template(TEXT_SOIL),
+        "fertilizer": Template(TEXT_FERTILIZER),
+        "techniques": Template(TEXT_TECHNIQUES),
+        "next_crops": Template(TEXT_NEXT_CROPS),
+    },
+}
+
+# Per-format conversion of list slots to text
+FILTERS: Dict[str, Dict[str, Callable]] = {
+    "html": {
+        "techniques": lambda techniques: "".join(f'<span class="technique-tag">{t}</span>' for t in techniques),
+        "next_crops": lambda crops: ", ".join(f'<span class="highlight">{crop}</span>' for crop in crops),
+    },
+    "text": {
+        "techniques": lambda techniques: ", ".join(techniques) if techniques else "None available",
+        "next_crops": lambda crops: ", ".join(crops) if crops else "None found for current soil type",
+    },
+}
+
+
+# Report sections in display order, and the Report field each optional one shows
+SECTIONS = ("header", "rotation", "soil", "fertilizer", "techniques", "next_crops")
+SECTION_FIELDS = {"soil": "soil_rec", "fertilizer": "fertilizer", "techniques": "techniques"}
+
+
+class Report(NamedTuple):
+    """Everything a rendered report shows; hashable so fragments can be cached."""
+
+    farmland_size: float
+    previous_crop: str
+    current_crop: str
+    rotation_ok: bool
+    rotation_msg: str
+    soil_rec: str
+    fertilizer: str
+    techniques: Tuple[str, ...]
+    next_crops: Tuple[str, ...]
+
+    @classmethod
+    def from_recommendation(cls, rec) -> "Report":
+        return cls(
+            rec.farmland_size, rec.previous_crop, rec.current_crop, rec.rotation_ok,
+            rec.rotation_msg, rec.soil_rec, rec.fertilizer, tuple(rec.techniques), tuple(rec.next_crops),
+        )
+
+
+class ReportRenderer:
+    def __init__(self, cache_size: int = 4096):
+        # Per-instance LRU cache of rendered fragments keyed by (format, name, slot values)
+        self._fragment = lru_cache(maxsize=cache_size)(self._render_fragment)
+
+    def html(self, report: Report) -> str:
+        return self.document("html", [self.section("html", name, report) for name in SECTIONS])
+
+    def text(self, report: Report) -> str:
+        return self.document("text", [self.section("text", name, report) for name in SECTIONS])
+
+    def section(self, fmt: str, section: str, report: Report) -> str:
+        """One rendered section of the report ("" if the format leaves it out)."""
+        name = self._template_name(fmt, section, report)
+        if name is None:
+            return ""
+        return self._fragment(fmt, name, TEMPLATES[fmt][name].values(report))
+
+    @staticmethod
+    def document(fmt: str, sections: Iterable[str]) -> str:
+        """Join rendered sections (in SECTIONS order) into a full report."""
+        if fmt == "html":
+            return "".join([HTML_HEAD, *sections, HTML_FOOTER])
+        return "".join(sections)
+
+    def cache_info(self):
+        return self._fragment.cache_info()
+
+    def cache_clear(self):
+        self._fragment.cache_clear()
+
+    @staticmethod
+    def _template_name(fmt: str, section: str, report: Report) -> Optional[str]:
+        html = fmt == "html"
+        if section == "rotation":
+            return "success" if report.rotation_ok else "warning"
+        if section == "next_crops":
+            return "next_crops" if report.next_crops or not html else "no_next_crops"
+        # The HTML report leaves out empty sections; the text report always lists them
+        if html and section != "header" and not getattr(report, SECTION_FIELDS[section]):
+            return None
+        return section
+
+    @staticmethod
+    def _render_fragment(fmt: str, name: str, values: Tuple) -> str:
+        return TEMPLATES[fmt][name].render(values, FILTERS[fmt])
+
+
+RENDERER = ReportRenderer()
+
+
+def render_html(rec) -> str:
+    """HTML report for an engine Recommendation."""
+    return RENDERER.html(Report.from_recommendation(rec))
+
+
+def render_text(rec) -> str:
+    """Plain-text report for an engine Recommendation."""
+    return RENDERER.text(Report.from_recommendation(rec))
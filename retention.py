@@ -0,0 +1,213 @@
+"""
+retention.py - Keeps crop_assistant.db small by archiving old entries per season.
+
+Archiving is opt-in, since the logs window and dashboard only show the live
+log. With a retention age set (CROP_ASSISTANT_RETENTION_DAYS or
+--max-age-days; the default 0 keeps everything), older entries are moved out
+of user_entries into one archive database per growing season, next to the
+live one:
+
+    crop_assistant.db
+    crop_assistant_archive/2024-s1.db    entries from January to June 2024
+    crop_assistant_archive/2024-s2.db    entries from July to December 2024
+    crop_assistant_archive/undated.db    entries without a valid timestamp
+
+Entries saved before the log had timestamps (created_at NULL) count as the
+oldest; imported ones with a malformed timestamp are archived as undated
+once it sorts before the cutoff.
+
+Nothing is lost: history() attaches the archives read-only to a private
+connection with an all_entries view over the live log and every archive.
+Payload texts (see database.py) that no entry refers to any more are
+deleted after archiving. The live database uses auto_vacuum=INCREMENTAL, so
+the pages freed are handed back to the file system a few at a time by
+step(), which the GUI calls while idle.
+
+Usage:
+    python retention.py [database] [--max-age-days N] [--list]
+"""
+import argparse
+import logging
+import os
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional
+
+from database import DatabaseManager
+
+log = logging.getLogger(__name__)
+
+
+def _retention_days(value: Optional[str]) -> int:
+    """CROP_ASSISTANT_RETENTION_DAYS as a number of days; 0 (keep everything) if unset or invalid."""
+    if not value:
+        return 0
+    try:
+        days = int(value)
+    except ValueError:
+        days = -1
+    if days < 0:
+        log.warning("Ignoring CROP_ASSISTANT_RETENTION_DAYS=%r: expected a whole number of days", value)
+        return 0
+    return days
+
+
+RETENTION_DAYS = _retention_days(os.environ.get("CROP_ASSISTANT_RETENTION_DAYS"))
+
+# First month of each growing season; an archive holds one season
+SEASON_START_MONTHS = (1, 7)
+
+# Work done per step(), small enough not to hold up the GUI
+ARCHIVE_BATCH = 200
+VACUUM_PAGES = 256
+
+# Existing databases are converted to incremental vacuum on their own only up
+# to this size, since that takes a full VACUUM; use the CLI for bigger ones.
+AUTO_CONVERT_BYTES = 16 * 1024 * 1024
+
+# Season of entries whose created_at is NULL or malformed
+UNDATED = "undated"
+
+_ARCHIVE_NAME = re.compile(r"^(\d{4}-s\d+|undated)\.db$")
+_TIMESTAMP = re.compile(r"^(\d{4})-(\d{2})-\d{2}")
+
+
+def season_of(created_at: Optional[str]) -> str:
+    """'2024-08-01 10:00:00' -> '2024-s2'; UNDATED for NULL or malformed timestamps."""
+    match = _TIMESTAMP.match(created_at or "")
+    if match is None or not 1 <= int(match.group(2)) <= 12:
+        return UNDATED
+    year, month = int(match.group(1)), int(match.group(2))
+    season = sum(1 for start in SEASON_START_MONTHS if month >= start)
+    return f"{year}-s{season}"
+
+
+class RetentionPolicy:
+    def __init__(self, db: DatabaseManager, max_age_days: int = RETENTION_DAYS, archive_dir: Optional[str] = None):
+        self.db = db
+        self.max_age_days = max_age_days
+        db_path = db.connections.db_path
+        if archive_dir is None and db_path != ":memory:":
+            archive_dir = os.path.splitext(db_path)[0] + "_archive"
+        self.archive_dir = archive_dir
+        # Cleared once there is nothing left to archive this session
+        self._archiving = bool(max_age_days) and archive_dir is not None
+        # Entries deleted anywhere may leave payload texts unreferenced: check once
+        # per session, and again after each round of archiving
+        self._payloads_dirty = True
+
+    @property
+    def cutoff(self) -> str:
+        """Entries created before this (UTC, CURRENT_TIMESTAMP format) are archived."""
+        moment = datetime.now(timezone.utc) - timedelta(days=self.max_age_days)
+        return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+    def archive_path(self, season: str) -> str:
+        return os.path.join(self.archive_dir, f"{season}.db")
+
+    def archives(self) -> Dict[str, str]:
+        """season -> archive file, oldest season first (UNDATED before all)."""
+        if self.archive_dir is None or not os.path.isdir(self.archive_dir):
+            return {}
+        names = sorted(
+            (name for name in os.listdir(self.archive_dir) if _ARCHIVE_NAME.match(name)),
+            key=lambda name: (name != f"{UNDATED}.db", name),
+        )
+        return {name[:-3]: os.path.join(self.archive_dir, name) for name in names}
+
+    def archive_batch(self, limit: int = ARCHIVE_BATCH) -> int:
+        """Move up to `limit` of the oldest expired entries to their archives; returns how many moved."""
+        if not self._archiving:
+            return 0
+        rows = self.db.entries_older_than(self.cutoff, limit)
+        if not rows:
+            self._archiving = False
+            return 0
+        by_season: Dict[str, list] = {}
+        for entry_id, created_at in rows:
+            by_season.setdefault(season_of(created_at), []).append(entry_id)
+        self._payloads_dirty = True
+        os.makedirs(self.archive_dir, exist_ok=True)
+        # A season whose archive can't be written doesn't hold up the others
+        moved, error = 0, None
+        for season, ids in by_season.items():
+            try:
+                moved += self.db.move_entries(ids, self.archive_path(season))
+            except sqlite3.Error as e:
+                error = e
+        if error is not None and not moved:
+            raise error
+        return moved
+
+    def archive_all(self, batch_size: int = 10_000) -> int:
+        total = 0
+        while True:
+            moved = self.archive_batch(batch_size)
+            if not moved:
+                return total
+            total += moved
+
+    def step(self) -> bool:
+        """
+        One small piece of maintenance: archive a batch, else delete unused
+        payloads, else free a few pages. Returns False once there is nothing
+        left to do.
+        """
+        if self.archive_batch():
+            return True
+        if self._payloads_dirty:
+            self._payloads_dirty = False
+            self.db.delete_unused_payloads()
+            return True
+        if self.db.auto_vacuum != "INCREMENTAL":
+            page_size, pages, _ = self.db.storage()
+            if page_size * pages > AUTO_CONVERT_BYTES:
+                return False
+            self.db.enable_incremental_vacuum()
+        return self.db.incremental_vacuum(VACUUM_PAGES) > 0
+
+    def compact(self):
+        """Delete unused payloads and free every unused page now, converting to incremental vacuum first if needed."""
+        self._payloads_dirty = False
+        self.db.delete_unused_payloads()
+        self.db.enable_incremental_vacuum()
+        self.db.incremental_vacuum(0)
+
+    @contextmanager
+    def history(self):
+        """Read-only connection whose temp view all_entries spans the live log and every archive."""
+        archives = {f"season_{season.replace('-', '_')}": path for season, path in self.archives().items()}
+        with self.db.history(archives) as conn:
+            yield conn
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Archive old entries out of crop_assistant.db.")
+    parser.add_argument("database", nargs="?", default="crop_assistant.db")
+    parser.add_argument(
+        "--max-age-days", type=int, default=RETENTION_DAYS,
+        help=f"Archive entries older than this (default {RETENTION_DAYS}; 0 only frees unused pages)",
+    )
+    parser.add_argument("--list", action="store_true", help="Only list the live database and archives")
+    args = parser.parse_args(argv)
+
+    db = DatabaseManager(args.database)
+    try:
+        policy = RetentionPolicy(db, args.max_age_days)
+        if not args.list:
+            moved = policy.archive_all()
+            policy.compact()
+            if args.max_age_days:
+                print(f"Archived {moved} entries older than {args.max_age_days} days.")
+        page_size, pages, free = db.storage()
+        print(f"{args.database}: {db.entry_stats()[0]} entries, {page_size * pages / 1e6:.1f} MB ({free} free pages)")
+        for path in policy.archives().values():
+            print(f"{path}: {db.count_archived(path)} entries")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+rules.py - Data-driven recommendation rules compiled into an indexed decision table.
+
+A rule matches when every attribute it names has one of the listed values
+in the facts (soil properties, crop family, previous crop family, ...);
+attributes it doesn't name are wildcards. DecisionTable compiles the rules
+into a predicate index: for each attribute, a bitset of the rules that
+accept each value plus a bitset of rules that don't care. Evaluating facts
+ANDs one bitset per indexed attribute, so the cost follows the number of
+attributes rather than the number of rules.
+"""
+import json
+from typing import Any, Dict, Iterable, List, Optional
+
+from classes import Crop, Soil
+
+
+class Rule:
+    __slots__ = ("advice", "conditions", "priority", "name")
+
+    def __init__(self, advice: str, when: Optional[Dict[str, Any]] = None, priority: int = 0, name: Optional[str] = None):
+        self.advice = advice
+        # attribute -> accepted values; a list in the rule data means "any of"
+        self.conditions = {
+            attribute: frozenset(value) if isinstance(value, (list, tuple, set, frozenset)) else frozenset([value])
+            for attribute, value in (when or {}).items()
+        }
+        self.priority = priority
+        self.name = name
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "Rule":
+        return cls(data["advice"], data.get("when"), data.get("priority", 0), data.get("name"))
+
+    def as_dict(self) -> Dict:
+        return {
+            "name": self.name,
+            "advice": self.advice,
+            "when": {attribute: sorted(values, key=repr) for attribute, values in sorted(self.conditions.items())},
+            "priority": self.priority,
+        }
+
+
+class DecisionTable:
+    def __init__(self, rules: Iterable[Rule], default: Optional[str] = None):
+        # Higher priority first; ties keep their order in the rule data
+        self.rules: List[Rule] = sorted(rules, key=lambda rule: -rule.priority)
+        self.default = default
+        self._all = (1 << len(self.rules)) - 1
+        self._index: Dict[str, Dict[Any, int]] = {}
+        self._unconstrained: Dict[str, int] = {}
+        self._compile()
+
+    def _compile(self):
+        attributes = sorted({attribute for rule in self.rules for attribute in rule.conditions})
+        for attribute in attributes:
+            by_value: Dict[Any, int] = {}
+            unconstrained = 0
+            for i, rule in enumerate(self.rules):
+                values = rule.conditions.get(attribute)
+                if values is None:
+                    unconstrained |= 1 << i
+                    continue
+                for value in values:
+                    by_value[value] = by_value.get(value, 0) | 1 << i
+            self._index[attribute] = by_value
+            self._unconstrained[attribute] = unconstrained
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def match(self, facts: Dict[str, Any]) -> int:
+        """Bitset of matching rules (bit i is self.rules[i])."""
+        matched = self._all
+        for attribute, by_value in self._index.items():
+            matched &= by_value.get(facts.get(attribute), 0) | self._unconstrained[attribute]
+            if not matched:
+                break
+        return matched
+
+    def evaluate(self, facts: Dict[str, Any]) -> List[str]:
+        """Advice of every matching rule in priority order, or [default] if none match."""
+        advice = [self.rules[i].advice for i in _bits(self.match(facts))]
+        if not advice and self.default is not None:
+            advice.append(self.default)
+        return advice
+
+    def first(self, facts: Dict[str, Any]) -> Optional[str]:
+        """Advice of the highest-priority matching rule, or the default."""
+        matched = self.match(facts)
+        if not matched:
+            return self.default
+        return self.rules[(matched & -matched).bit_length() - 1].advice
+
+    def evaluate_many(self, facts_list: Iterable[Dict[str, Any]]) -> List[List[str]]:
+        """evaluate() for many fact sets; identical indexed facts are matched only once."""
+        attributes = tuple(self._index)
+        memo: Dict[tuple, List[str]] = {}
+        results = []
+        for facts in facts_list:
+            key = tuple(facts.get(attribute) for attribute in attributes)
+            if key not in memo:
+                memo[key] = self.evaluate(facts)
+            results.append(memo[key])
+        return results
+
+
+def _bits(mask: int) -> Iterable[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def soil_facts(soil: Soil, crops: Iterable[Optional[Crop]] = ()) -> Dict[str, Any]:
+    """
+    Facts for a soil and the crop history ([..., previous, current]):
+    soil_type plus every soil property, family, previous_family and same_family.
+    """
+    facts: Dict[str, Any] = dict(soil.properties)
+    facts["soil_type"] = soil.soil_type
+    crops = [crop for crop in crops if crop is not None]
+    if crops:
+        facts["family"] = crops[-1].family
+    if len(crops) > 1:
+        facts["previous_family"] = crops[-2].family
+        facts["same_family"] = crops[-1].family == crops[-2].family
+    return facts
+
+
+def rules_from_dicts(items: Iterable[Dict]) -> List[Rule]:
+    return [Rule.from_dict(item) for item in items]
+
+
+def load_rules(path: str) -> List[Rule]:
+    """Rules from a JSON file holding a list of {"advice", "when", "priority", "name"} objects."""
+    with open(path, encoding="utf-8") as f:
+        return rules_from_dicts(json.load(f))
@@ -0,0 +1,136 @@
+"""
+snapshot.py - Single-file snapshot of the catalog and precomputed table for fast cold starts.
+
+Without it, startup reads every catalog part from crop_assistant.db and the
+first recommendation decodes the whole precomputed table from JSON rows.
+The snapshot keeps both in one file next to the database, read with a
+single read(): a marshal record with the catalog rows, followed by one with
+the precomputed table, which is only decoded on the first lookup. The
+catalog is used while the database's catalog_versions still match the ones
+the snapshot was written for, and the table only while its catalog hash
+matches the running engine's; otherwise startup reads the database as
+before and the snapshot is rewritten on exit.
+"""
+import marshal
+import os
+import sys
+from typing import Any, Dict, Optional, Set
+
+from catalog_store import CatalogStore, apply_catalog
+from database import DatabaseManager
+from precompute import RecommendationTable
+
+MAGIC = b"CROPSNAP"
+
+# Bump when the snapshot layout changes; marshal's format can differ between Python versions
+SNAPSHOT_FORMAT = (1, sys.version_info[0], sys.version_info[1])
+
+
+def snapshot_path(db_path: str) -> Optional[str]:
+    """crop_assistant.db -> crop_assistant.snapshot; None for in-memory databases."""
+    if db_path == ":memory:":
+        return None
+    return os.path.splitext(db_path)[0] + ".snapshot"
+
+
+def read_snapshot(path: str):
+    """
+    (header, table record) from the snapshot at `path`, or (None, None) if it
+    is missing, damaged or from another format. The table record is still
+    marshalled; decode it with marshal.loads().
+    """
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None, None
+    if not data.startswith(MAGIC):
+        return None, None
+    try:
+        size = int.from_bytes(data[len(MAGIC):len(MAGIC) + 4], "little")
+        start = len(MAGIC) + 4
+        header = marshal.loads(data[start:start + size])
+    except (EOFError, ValueError, TypeError):
+        return None, None
+    if not isinstance(header, dict) or header.get("format") != SNAPSHOT_FORMAT:
+        return None, None
+    return header, data[start + size:]
+
+
+def write_snapshot(path: str, header: Dict[str, Any], table_record: bytes):
+    encoded = marshal.dumps(header)
+    # Write aside and rename so a crash never leaves a half-written snapshot
+    temp_path = path + ".tmp"
+    with open(temp_path, "wb") as f:
+        f.write(MAGIC + len(encoded).to_bytes(4, "little") + encoded + table_record)
+    os.replace(temp_path, path)
+
+
+def _decode_table(record: bytes) -> Optional[Dict]:
+    try:
+        results = marshal.loads(record)
+    except (EOFError, ValueError, TypeError):
+        return None
+    return results if isinstance(results, dict) else None
+
+
+class Snapshot:
+    def __init__(self, db: DatabaseManager, path: Optional[str] = None):
+        self.db = db
+        self.path = path or snapshot_path(db.connections.db_path)
+        self.header: Optional[Dict[str, Any]] = None
+        self._table_record = b""
+
+    def _database_id(self):
+        # A different file at the same path may reuse the same version counters
+        db_path = self.db.connections.db_path
+        try:
+            return [os.path.abspath(db_path), os.stat(db_path).st_ino]
+        except OSError:
+            return None
+
+    def restore_catalog(self, store: CatalogStore) -> Set[str]:
+        """
+        Bring the running catalog up to date with the database, from the
+        snapshot if it is still current. Returns the parts that changed.
+        """
+        header, table_record = read_snapshot(self.path) if self.path else (None, None)
+        if (
+            header is not None
+            and header["database"] == self._database_id()
+            and header["versions"] == self.db.catalog_versions()
+        ):
+            self.header, self._table_record = header, table_record
+            store.restore(header["versions"], header["catalog"])
+            return apply_catalog(store.rows)
+        self.header, self._table_record = None, b""
+        return apply_catalog(store.poll())
+
+    def restore_table(self, table: RecommendationTable) -> bool:
+        """Have the table load from the snapshot if it holds one for the same catalog hash."""
+        if self.header is None or self.header["table_hash"] != table.catalog_hash:
+            return False
+        table.restore(lambda record=self._table_record: _decode_table(record))
+        return True
+
+    def save(self, store: CatalogStore, table: RecommendationTable):
+        """Write the current state, unless it is what the snapshot already holds."""
+        if self.path is None or not store.versions:
+            return
+        kept = self.header is not None and self.header["table_hash"] == table.catalog_hash
+        header = {
+            "format": SNAPSHOT_FORMAT,
+            "database": self._database_id(),
+            "versions": store.versions,
+            "catalog": store.rows,
+            "table_hash": table.catalog_hash if kept or table.results is not None else None,
+        }
+        if header == self.header:
+            return
+        # A table restored from the snapshot and never looked up is copied still encoded
+        table_record = self._table_record if kept else marshal.dumps(table.results)
+        try:
+            write_snapshot(self.path, header, table_record)
+        except OSError:
+            return
+        self.header, self._table_record = header, table_record
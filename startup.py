@@ -0,0 +1,39 @@
+"""
+startup.py - Startup phase timings, printed in the style of python -X importtime.
+
+Set CROP_ASSISTANT_STARTUP_TIMING=1 to have each phase of the GUI start, up
+to the first interactive frame, printed to stderr as it completes:
+
+    startup time: self [ms] | cumulative | phase
+    startup time:      231.0 |      231.0 | imports
+    startup time:       28.4 |      259.4 | window
+    ...
+
+Times are measured from the import of this module, so entry points import
+it before anything else. Combine with -X importtime to break the imports
+phase down further.
+"""
+import os
+import sys
+import time
+from typing import List, Tuple
+
+ENABLED = os.environ.get("CROP_ASSISTANT_STARTUP_TIMING", "") not in ("", "0")
+
+_start = time.perf_counter()
+_last = _start
+# (phase, self seconds, cumulative seconds)
+phases: List[Tuple[str, float, float]] = []
+
+
+def mark(phase: str):
+    """Record that `phase` just finished."""
+    global _last
+    now = time.perf_counter()
+    phases.append((phase, now - _last, now - _start))
+    _last = now
+    if ENABLED:
+        if len(phases) == 1:
+            print("startup time: self [ms] | cumulative | phase", file=sys.stderr)
+        _, elapsed, total = phases[-1]
+        print(f"startup time: {elapsed * 1000:10.1f} | {total * 1000:10.1f} | {phase}", file=sys.stderr)
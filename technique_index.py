@@ -0,0 +1,133 @@
+"""
+technique_index.py - Ranked farming technique suggestions by (family, soil).
+
+Merges the family technique lists (TechniqueSuggestion.TECHS_BY_FAMILY) with
+data.TECHNIQUES and their suitable_soil constraints. Each technique gets a
+bit; per-family and per-soil bitsets are built once, so the candidates for
+a (family, soil) pair are a single intersection. Results are ranked by
+score and cached per pair, and score_fields() scores every technique for
+a whole list of fields with one vectorized lookup.
+"""
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional, Tuple
+
+from classes import FarmingTechnique
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# Score contributions: listed for the crop family, soil listed explicitly, "All" soils
+FAMILY_WEIGHT = 2.0
+SOIL_WEIGHT = 1.0
+WILDCARD_WEIGHT = 0.5
+
+
+class TechniqueIndex:
+    def __init__(
+        self,
+        techs_by_family: Dict[str, List[str]],
+        techniques: Iterable[FarmingTechnique],
+        soil_types: Iterable[str],
+        family_weight: float = FAMILY_WEIGHT,
+        soil_weight: float = SOIL_WEIGHT,
+        wildcard_weight: float = WILDCARD_WEIGHT,
+    ):
+        self.names: List[str] = []
+        self.families: List[str] = list(techs_by_family)
+        self.soil_types: List[str] = list(soil_types)
+        self.weights = (family_weight, soil_weight, wildcard_weight)
+        self._ids: Dict[str, int] = {}
+        self._family_bits: Dict[str, int] = {}
+        self._soil_bits: Dict[str, int] = {}
+        self._generic = 0      # from TECHNIQUES: not tied to a family
+        self._constrained = 0  # restricted to the soils in _soil_bits
+        self._all_soils = 0    # explicitly suitable for "All" soils
+        self._ranked: Dict[Tuple[Optional[str], Optional[str]], List[str]] = {}
+        self._scores: Optional["np.ndarray"] = None
+
+        for family, names in techs_by_family.items():
+            for name in names:
+                self._family_bits[family] = self._family_bits.get(family, 0) | self._bit(name)
+        for technique in techniques:
+            bit = self._bit(technique.name)
+            self._generic |= bit
+            if "All" in technique.suitable_soil:
+                self._all_soils |= bit
+                continue
+            self._constrained |= bit
+            for soil_type in technique.suitable_soil:
+                self._soil_bits[soil_type] = self._soil_bits.get(soil_type, 0) | bit
+
+    def _bit(self, name: str) -> int:
+        # Techniques from both sources are merged case-insensitively; the first spelling wins
+        key = name.strip().lower()
+        if key not in self._ids:
+            self._ids[key] = len(self.names)
+            self.names.append(name)
+        return 1 << self._ids[key]
+
+    def candidates(self, family: Optional[str], soil_type: Optional[str] = None) -> int:
+        """Bitset of techniques for the family that suit the soil (any soil if None)."""
+        techniques = self._family_bits.get(family, 0) | self._generic
+        if soil_type is None:
+            return techniques
+        return techniques & (self._soil_bits.get(soil_type, 0) | ~self._constrained)
+
+    def score(self, index: int, family: Optional[str], soil_type: Optional[str]) -> float:
+        family_weight, soil_weight, wildcard_weight = self.weights
+        bit = 1 << index
+        score = 0.0
+        if self._family_bits.get(family, 0) & bit:
+            score += family_weight
+        if self._soil_bits.get(soil_type, 0) & bit:
+            score += soil_weight
+        if self._all_soils & bit:
+            score += wildcard_weight
+        return score
+
+    def suggest(self, family: Optional[str], soil_type: Optional[str] = None) -> List[str]:
+        """Technique names suitable for (family, soil), best first."""
+        key = (family, soil_type)
+        if key not in self._ranked:
+            mask = self.candidates(family, soil_type)
+            ids = [i for i in range(len(self.names)) if mask >> i & 1]
+            # Highest score first; ties keep source order (family lists, then TECHNIQUES)
+            ids.sort(key=lambda i: -self.score(i, family, soil_type))
+            self._ranked[key] = [self.names[i] for i in ids]
+        return list(self._ranked[key])
+
+    def score_matrix(self) -> "np.ndarray":
+        """
+        Scores with shape (families + 1, soils + 1, techniques); unsuitable
+        techniques score 0 and the last family/soil rows are for unknown values.
+        """
+        if self._scores is None:
+            # numpy is only needed for bulk scoring; importing it lazily keeps app startup fast
+            import numpy as np
+
+            scores = np.zeros((len(self.families) + 1, len(self.soil_types) + 1, len(self.names)), dtype=np.float32)
+            # An unknown soil only keeps techniques without soil constraints
+            for f, family in enumerate(self.families + [None]):
+                for s, soil_type in enumerate(self.soil_types + [""]):
+                    mask = self.candidates(family, soil_type)
+                    for i in range(len(self.names)):
+                        if mask >> i & 1:
+                            scores[f, s, i] = self.score(i, family, soil_type)
+            self._scores = scores
+        return self._scores
+
+    def score_fields(self, fields: Iterable[Tuple[str, str]]) -> "np.ndarray":
+        """
+        Applicability scores for many (family, soil_type) fields in one pass:
+        an array of shape (fields, techniques) whose columns follow self.names.
+        """
+        import numpy as np
+
+        scores = self.score_matrix()
+        family_ids = {family: i for i, family in enumerate(self.families)}
+        soil_ids = {soil_type: i for i, soil_type in enumerate(self.soil_types)}
+        unknown_family, unknown_soil = len(self.families), len(self.soil_types)
+        pairs = np.array(
+            [(family_ids.get(family, unknown_family), soil_ids.get(soil_type, unknown_soil)) for family, soil_type in fields],
+            dtype=np.intp,
+        ).reshape(-1, 2)
+        return scores[pairs[:, 0], pairs[:, 1]]
@@ -0,0 +1,18 @@
+import os
+import sys
+
+import pytest
+
+# The modules live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Worker tests need a QApplication but no display
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from database import ConnectionManager  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    """Path of a fresh database file; every connection to it is closed afterwards."""
+    yield str(tmp_path / "crop_assistant.db")
+    ConnectionManager.close_all()
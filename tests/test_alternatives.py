@@ -0,0 +1,55 @@
+import pytest
+
+from alternatives import AlternativeSuggester, AlternativeWeights
+from catalog import CATALOG
+
+# Dyadic weights keep the sums exact, so ties are decided by catalog order only
+WEIGHTS = AlternativeWeights(
+    soil=2.0, diversity=1.0,
+    family_bonus={"legume": 0.5, "fiber": -0.25},
+    crop_bonus={"Lentil": 0.25, "Potato": 0.75, "Cotton": 1.5},
+)
+HISTORIES = [[], ["Wheat"], ["Soybean", "Wheat"], ["Potato", "Lentil", "Maize", "Tomato"], ["Mango"]]
+
+
+def full_ranking(weights, soil_type, history, require_soil=False):
+    families = [CATALOG.family_of(name) for name in history]
+    exclude = families[-1] if families else None
+    ranked = []
+    for position, crop in enumerate(CATALOG.crops):
+        suits = soil_type in crop.recommended_soil
+        if crop.family == exclude or (require_soil and not suits):
+            continue
+        diversity = 1.0
+        for seasons_ago, family in enumerate(reversed(families), start=1):
+            if family == crop.family:
+                diversity = (seasons_ago - 1) / len(families)
+                break
+        score = (
+            weights.diversity * diversity + weights.family_bonus.get(crop.family, 0.0)
+            + (weights.soil if suits else 0.0) + weights.crop_bonus.get(crop.name, 0.0)
+        )
+        ranked.append((-score, position, crop.name))
+    return [(name, -neg_score) for neg_score, _, name in sorted(ranked)]
+
+
+@pytest.mark.parametrize("weights", [AlternativeWeights(), WEIGHTS])
+@pytest.mark.parametrize("require_soil", [False, True])
+def test_top_k_matches_full_ranking(weights, require_soil):
+    suggester = AlternativeSuggester(CATALOG, weights)
+    for soil_type in CATALOG.soil_types:
+        for history in HISTORIES:
+            expected = full_ranking(weights, soil_type, history, require_soil)
+            for k in (1, 3, 5, len(CATALOG.crops), None):
+                results = suggester.suggest(soil_type, history, k, require_soil=require_soil)
+                assert [(crop.name, score) for crop, score in results] == expected[:k]
+                assert suggester.suggest_names(soil_type, history, k, require_soil=require_soil) == [
+                    name for name, _ in expected[:k]
+                ]
+
+
+def test_exclude_family():
+    suggester = AlternativeSuggester()
+    names = suggester.suggest_names("Loamy", ["Wheat"], None, exclude_family="legume")
+    assert "Maize" in names
+    assert not any(CATALOG.family_of(name) == "legume" for name in names)
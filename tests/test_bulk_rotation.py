@@ -0,0 +1,45 @@
+from itertools import product
+
+from bulk_rotation import STATUS_OK, STATUS_SAME_FAMILY, STATUS_UNKNOWN, RotationCodebook, audit_transitions
+from catalog import CATALOG
+from crop_names import CropNameResolver
+from database import DatabaseManager
+from logic import CropRotationLogic
+
+NAMES = CATALOG.crop_names + ["wheat", "MAIZE", "Mango", ""]
+
+
+def _status(message):
+    return {"✅": STATUS_OK, "⚠": STATUS_SAME_FAMILY, "❓": STATUS_UNKNOWN}[message[0]]
+
+
+def test_check_matches_logic():
+    logic, codebook = CropRotationLogic(), RotationCodebook()
+    pairs = list(product(NAMES, NAMES))
+    status, alt_set = codebook.check_names([p for p, _ in pairs], [c for _, c in pairs])
+    for (previous, current), row_status, row_alt in zip(pairs, status, alt_set):
+        message, alternatives = logic.check_rotation(previous, current)
+        assert row_status == _status(message), (previous, current)
+        assert codebook.message(row_status, previous, current) == message
+        assert codebook.alternatives(row_alt) == alternatives
+
+
+def test_resolved_names_match_logic():
+    resolver = CropNameResolver()
+    logic, codebook = CropRotationLogic(resolver=resolver), RotationCodebook(resolver=resolver)
+    pairs = [("Wheet", "Maize"), ("Soybeans", "Wheat"), ("Wheat", "Xyzzy")]
+    status, _ = codebook.check_names([p for p, _ in pairs], [c for _, c in pairs])
+    for (previous, current), row_status in zip(pairs, status):
+        assert row_status == _status(logic.check_rotation(previous, current)[0])
+
+
+def test_audit_counts_match_logic(db_path):
+    db = DatabaseManager(db_path)
+    pairs = list(product(CATALOG.crop_names[:8], CATALOG.crop_names[:8])) + [("Mango", "Wheat"), (None, "Wheat")]
+    db.save_user_entries((1.0, previous, current, "Loamy", "", "", "") for previous, current in pairs)
+    logic = CropRotationLogic()
+    expected = {"ok": 0, "same_family": 0, "unknown": 0}
+    for previous, current in pairs:
+        key = ("ok", "same_family", "unknown")[_status(logic.check_rotation(previous or "", current)[0])]
+        expected[key] += 1
+    assert audit_transitions(db, batch_size=7) == expected
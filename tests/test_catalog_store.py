@@ -0,0 +1,33 @@
+import pytest
+
+from catalog import CATALOG
+from catalog_store import PARTS, CatalogStore, apply_catalog, current_rows
+from database import DatabaseManager
+from logic import SoilRecommendationSystem
+
+
+@pytest.fixture
+def store(db_path):
+    """A store over a fresh database; the shared catalog is put back afterwards."""
+    original = {part: current_rows(part) for part in PARTS}
+    yield CatalogStore(DatabaseManager(db_path))
+    apply_catalog(original)
+
+
+def test_first_poll_changes_nothing(store):
+    assert apply_catalog(store.poll()) == set()
+    assert store.poll() == {}
+
+
+def test_hot_reload(store):
+    apply_catalog(store.poll())
+    crops = current_rows("crops") + [("Sorghum", "cereal", ["Sandy"])]
+    families = [(family, "Sorghum mix" if family == "cereal" else advice, techniques)
+                for family, advice, techniques in current_rows("families")]
+    store.save("crops", crops)
+    store.save("families", families)
+
+    assert apply_catalog(store.poll()) == {"crops", "families"}
+    assert CATALOG.family_of("Sorghum") == "cereal"
+    assert SoilRecommendationSystem.recommend_fertilizer("Sorghum") == "Sorghum mix"
+    assert store.poll() == {}
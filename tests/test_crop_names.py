@@ -0,0 +1,63 @@
+import pytest
+
+from catalog import CATALOG, CropCatalog
+from classes import Crop
+from crop_names import CropNameResolver, normalize
+
+
+@pytest.mark.parametrize("query, name, method", [
+    ("wheat", "Wheat", "exact"),
+    ("  MAIZE ", "Maize", "exact"),
+    ("corn", "Maize", "alias"),
+    ("Soy", "Soybean", "alias"),
+    ("Potatoes", "Potato", "normalized"),
+    ("sun-flowers", "Sunflower", "fuzzy"),
+    ("Wheet", "Wheat", "fuzzy"),
+    ("Chikpea", "Chickpea", "fuzzy"),
+    ("Cabage", "Cabbage", "fuzzy"),
+])
+def test_resolves(query, name, method):
+    found = CropNameResolver().resolve(query)
+    assert (found.query, found.name, found.method) == (query, name, method)
+    assert 0.8 <= found.confidence <= 1.0
+
+
+@pytest.mark.parametrize("query", ["Mango", "Rye", "xyzzy", "", None])
+def test_rejects(query):
+    resolver = CropNameResolver()
+    assert resolver.resolve(query) is None
+    assert resolver.canonical(query) is None
+
+
+def test_min_confidence():
+    assert CropNameResolver(min_confidence=0.5).canonical("Rye") == "Rice"
+    assert CropNameResolver(min_confidence=0.9).canonical("Wheet") is None
+    assert CropNameResolver(min_confidence=0.9).canonical("Potatoes") == "Potato"
+
+
+def test_every_catalog_name_resolves_to_itself():
+    resolver = CropNameResolver()
+    for name in CATALOG.crop_names:
+        assert resolver.canonical(name.upper()) == name
+        assert resolver.canonical(name + "s") == name
+
+
+def test_normalize():
+    assert normalize("  Sweet-Potatoes!! ") == "sweet potato"
+    assert normalize("Berries") == "berry"
+    assert normalize("Grass") == "grass"
+
+
+def test_repeated_names_are_cached():
+    resolver = CropNameResolver()
+    resolver.resolve_many(["Wheet", "Wheet", "corn", "Wheet"])
+    assert resolver.cache_info().hits == 2
+
+
+def test_rebuild_after_catalog_change():
+    catalog = CropCatalog([Crop("Sorghum", "cereal", ["Sandy"])])
+    resolver = CropNameResolver(catalog)
+    assert resolver.canonical("Milet") is None
+    catalog.update(crops=catalog.crops + [Crop("Millet", "cereal", ["Sandy"])])
+    resolver.rebuild()
+    assert resolver.canonical("Milet") == "Millet"
@@ -0,0 +1,56 @@
+import io
+
+import pytest
+
+from catalog import CATALOG, CropCatalog
+from classes import Crop
+from data import SOILS
+from engine import RecommendationEngine, read_entries
+from logic import SoilRecommendationSystem
+
+# Crops the bundled catalog doesn't have
+CUSTOM = CropCatalog(
+    [Crop("Sorghum", "cereal", ["Sandy", "Loamy"]), Crop("Millet", "cereal", ["Sandy"]), Crop("Cowpea", "legume", ["Sandy"])],
+    SOILS,
+    CATALOG.techniques,
+)
+
+
+@pytest.mark.parametrize("precompute", [False, True])
+def test_custom_catalog(precompute):
+    assert CATALOG.crop("Cowpea") is None
+    engine = RecommendationEngine(CUSTOM, precompute=precompute)
+    rec = engine.recommend(2, "Sorghum", "Cowpea", "Sandy")
+    assert rec.rotation_ok
+    assert rec.fertilizer == SoilRecommendationSystem.FERTILIZER_TABLE.first({"family": "legume"})
+    assert rec.techniques and rec.techniques != ["No specific techniques available."]
+    assert rec.next_crops == ["Cowpea"]
+
+
+def test_custom_catalog_same_family():
+    rec = RecommendationEngine(CUSTOM, precompute=False).recommend(1, "Sorghum", "Millet", "Sandy")
+    assert not rec.rotation_ok
+    assert rec.alternatives == ["Cowpea"]
+    assert rec.fertilizer == SoilRecommendationSystem.FERTILIZER_TABLE.first({"family": "cereal"})
+
+
+def test_custom_catalog_rejects_unknown_crops():
+    engine = RecommendationEngine(CUSTOM, precompute=False)
+    with pytest.raises(ValueError):
+        engine.recommend(1, "Wheat", "Cowpea", "Sandy")
+
+
+def test_batch_keeps_going_past_bad_lines():
+    lines = [
+        '{"farmland_size": 2, "previous_crop": "Wheat", "current_crop": "Soybean", "soil_type": "Loamy"}',
+        '{"farmland_size": 2, "previous_crop": "Wheat"',
+        '["not", "an", "object"]',
+        '',
+        '{"farmland_size": "x", "previous_crop": "Wheat", "current_crop": "Soybean", "soil_type": "Loamy"}',
+        '{"farmland_size": 1, "previous_crop": "Maize", "current_crop": "Rice", "soil_type": "Clay"}',
+    ]
+    engine = RecommendationEngine(precompute=False)
+    rows = list(engine.recommend_many(read_entries(io.StringIO("\n".join(lines)), "jsonl")))
+    assert [row["error"].split(":")[0] for row in rows] == ["", "Line 2", "Line 3", "Please enter a valid farmland size (e.g., 2 or 3.5).", ""]
+    assert rows[2]["error"] == "Line 3: expected a JSON object, not list"
+    assert rows[-1]["current_crop"] == "Rice" and not rows[-1]["rotation_ok"]
@@ -0,0 +1,83 @@
+import sqlite3
+
+import pytest
+
+import database
+from database import SCHEMA_VERSION, ConnectionManager, DatabaseManager
+
+ENTRY = (2.0, "Wheat", "Soybean", "Loamy", "✅ Good rotation: Soybean after Wheat.", "Balanced NPK", "Mulching, Drip irrigation")
+
+
+def _baseline_db(path, entries):
+    """A database as the original app left it: user_version 0, denormalized user_entries."""
+    conn = sqlite3.connect(path)
+    database._migrate_1_initial(conn)
+    conn.executemany(
+        "INSERT INTO user_entries (farmland_size, previous_crop, current_crop, soil_type, "
+        "recommendation, fertilizer, techniques) VALUES (?, ?, ?, ?, ?, ?, ?)",
+        entries,
+    )
+    conn.commit()
+    conn.close()
+
+
+def _schema(path):
+    conn = sqlite3.connect(path)
+    try:
+        return sorted(conn.execute("SELECT type, name, sql FROM sqlite_master WHERE name NOT LIKE 'sqlite_%'"))
+    finally:
+        conn.close()
+
+
+def test_fresh_database_is_current(db_path):
+    db = DatabaseManager(db_path)
+    assert db.schema_version == SCHEMA_VERSION
+    db.save_user_entry(*ENTRY)
+    assert [row[1:] for row in db.get_user_entries()] == [ENTRY]
+    assert db.entry_stats()[0] == 1
+
+
+def test_baseline_database_keeps_its_entries(db_path):
+    entries = [ENTRY, (1.5, "Maize", "Rice", "Clay", "⚠️ Avoid planting Rice after Maize.", "Urea", None)]
+    _baseline_db(db_path, entries)
+    db = DatabaseManager(db_path)
+    assert db.schema_version == SCHEMA_VERSION
+    assert sorted(row[1:] for row in db.get_user_entries()) == sorted(entries)
+    # Summary tables and the search index cover the migrated rows
+    assert db.entry_stats()[0] == 2
+    assert db.count_matches("Soybean") == 1
+
+
+@pytest.mark.parametrize("failing", range(1, SCHEMA_VERSION))
+def test_failed_migration_rolls_back(db_path, tmp_path, monkeypatch, failing):
+    # The schema a clean upgrade has just before the failing migration
+    reference = str(tmp_path / "reference.db")
+    _baseline_db(reference, [ENTRY])
+    monkeypatch.setattr(database, "MIGRATIONS", database.MIGRATIONS[:failing])
+    DatabaseManager(reference)
+    ConnectionManager.close_all()
+
+    monkeypatch.undo()
+    migration = database.MIGRATIONS[failing]
+
+    def fail_after(conn):
+        migration(conn)
+        raise RuntimeError("injected failure")
+
+    _baseline_db(db_path, [ENTRY])
+    monkeypatch.setattr(database, "MIGRATIONS", database.MIGRATIONS[:failing] + [fail_after] + database.MIGRATIONS[failing + 1:])
+    with pytest.raises(RuntimeError, match="injected failure"):
+        DatabaseManager(db_path)
+    ConnectionManager.close_all()
+
+    # Every migration before the failed one is committed, nothing of the failed one is
+    conn = sqlite3.connect(db_path)
+    assert conn.execute("PRAGMA user_version").fetchone()[0] == failing
+    conn.close()
+    assert _schema(db_path) == _schema(reference)
+
+    # Run again with the real migration, the upgrade completes
+    monkeypatch.undo()
+    db = DatabaseManager(db_path)
+    assert db.schema_version == SCHEMA_VERSION
+    assert [row[1:] for row in db.get_user_entries()] == [ENTRY]
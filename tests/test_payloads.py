@@ -0,0 +1,65 @@
+import sqlite3
+
+from database import DatabaseManager
+from retention import RetentionPolicy
+
+ENTRY = (2.0, "Wheat", "Soybean", "Loamy", "✅ Good rotation: Soybean after Wheat.", "Balanced NPK", "Mulching, Drip irrigation")
+OTHER = (1.0, "Maize", "Beans", "Clay", "✅ Good rotation: Beans after Maize.", "Low N; apply SSP", "Drip irrigation")
+
+
+def _count(db_path, sql):
+    conn = sqlite3.connect(db_path)
+    try:
+        return conn.execute(sql).fetchone()[0]
+    finally:
+        conn.close()
+
+
+def test_texts_are_stored_once(db_path):
+    db = DatabaseManager(db_path)
+    db.save_user_entries([ENTRY] * 50 + [OTHER] * 50)
+    assert _count(db_path, "SELECT COUNT(*) FROM payloads") == 6
+    assert sorted(set(row[1:] for row in db.get_user_entries())) == sorted([ENTRY, OTHER])
+
+
+def test_entries_by_technique(db_path):
+    db = DatabaseManager(db_path)
+    db.save_user_entries([ENTRY, OTHER, ENTRY])
+    assert [row[0] for row in db.get_entries_with_technique("Drip irrigation")] == [3, 2, 1]
+    assert [row[0] for row in db.get_entries_with_technique("Mulching")] == [3, 1]
+    assert db.get_entries_with_technique("Terracing") == []
+
+
+def test_unused_payloads_are_deleted(db_path):
+    db = DatabaseManager(db_path)
+    db.save_user_entries([ENTRY, OTHER])
+    with db.connections.transaction() as conn:
+        conn.execute("DELETE FROM user_entries WHERE id = 2")
+    # Its recommendation and fertilizer; "Drip irrigation" alone was its technique list
+    assert db.delete_unused_payloads() == 3
+    assert db.delete_unused_payloads() == 0
+    assert _count(db_path, "SELECT COUNT(*) FROM entry_techniques") == 2
+    assert [row[1:] for row in db.get_user_entries()] == [ENTRY]
+
+
+def test_cleanup_invalidates_other_managers_caches(db_path):
+    writer, maintenance = DatabaseManager(db_path), DatabaseManager(db_path)
+    writer.save_user_entry(*OTHER)
+    with writer.connections.transaction() as conn:
+        conn.execute("DELETE FROM user_entries")
+    assert maintenance.delete_unused_payloads() == 3
+    # writer still remembers the deleted payload ids
+    writer.save_user_entry(*OTHER)
+    assert [row[1:] for row in writer.get_user_entries()] == [OTHER]
+
+
+def test_maintenance_deletes_archived_payloads(db_path):
+    db = DatabaseManager(db_path)
+    db.save_user_entries([ENTRY + ("2020-01-01 00:00:00",), OTHER])
+    policy = RetentionPolicy(db, max_age_days=30)
+    while policy.step():
+        pass
+    assert [row[1:] for row in db.get_user_entries()] == [OTHER]
+    assert _count(db_path, "SELECT COUNT(*) FROM payloads") == 3
+    with policy.history() as conn:
+        assert conn.execute("SELECT techniques FROM all_entries ORDER BY id").fetchall() == [(ENTRY[-1],), (OTHER[-1],)]
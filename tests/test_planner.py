@@ -0,0 +1,52 @@
+from itertools import product
+
+import pytest
+
+from catalog import CATALOG, CropCatalog
+from classes import Crop
+from planner import RotationPlanner, default_score
+
+
+def brute_force(soil_type, history, seasons, min_gap, strict_soil=True):
+    crops = [c for c in CATALOG.crops if not strict_soil or soil_type in c.recommended_soil]
+    recent = [None] * min_gap + [CATALOG.family_of(name) for name in history]
+    best = None
+    for sequence in product(crops, repeat=seasons):
+        families, score = list(recent), 0.0
+        for season, crop in enumerate(sequence):
+            if crop.family in families[-min_gap:]:
+                break
+            score += default_score(crop, soil_type, season, families[-1])
+            families.append(crop.family)
+        else:
+            if best is None or score > best:
+                best = score
+    return best
+
+
+@pytest.mark.parametrize("soil_type", CATALOG.soil_types)
+@pytest.mark.parametrize("min_gap", [1, 2])
+def test_plan_is_optimal(soil_type, min_gap):
+    planner = RotationPlanner(min_gap=min_gap)
+    for history, seasons in ([], 3), (["Wheat"], 3), (["Soybean", "Maize"], 2):
+        plan = planner.plan(soil_type, history, seasons)
+        expected = brute_force(soil_type, history, seasons, min_gap)
+        if expected is None:
+            assert plan is None
+            continue
+        assert plan.score == pytest.approx(expected)
+        families = [CATALOG.family_of(name) for name in history] + [c.family for c in plan.crops]
+        for i in range(len(history), len(families)):
+            assert families[i] not in families[max(0, i - min_gap):i]
+
+
+def test_plan_without_strict_soil_is_optimal():
+    plan = RotationPlanner().plan("Peaty", ["Wheat"], 3, strict_soil=False)
+    assert plan.score == pytest.approx(brute_force("Peaty", ["Wheat"], 3, 1, strict_soil=False))
+
+
+def test_no_valid_plan():
+    catalog = CropCatalog([Crop("Wheat", "cereal", ["Loamy"]), Crop("Barley", "cereal", ["Loamy"])])
+    assert RotationPlanner(catalog).plan("Loamy", [], 1).crop_names in (["Wheat"], ["Barley"])
+    assert RotationPlanner(catalog).plan("Loamy", [], 2) is None
+    assert RotationPlanner(catalog).plan("Loamy", ["Wheat"], 1) is None
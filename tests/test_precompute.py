@@ -0,0 +1,48 @@
+from itertools import product
+
+from catalog import CATALOG, CropCatalog
+from classes import Crop
+from data import SOILS
+from database import DatabaseManager
+from engine import RecommendationEngine
+from precompute import RecommendationTable, catalog_hash
+
+
+def test_table_matches_computed():
+    table, computed = RecommendationEngine(), RecommendationEngine(precompute=False)
+    for prev, curr, soil in product(CATALOG.crop_names, CATALOG.crop_names, CATALOG.soil_types):
+        assert table.recommend(1, prev, curr, soil).as_dict() == computed.recommend(1, prev, curr, soil).as_dict()
+    assert len(table.table.results) == len(CATALOG.crops) ** 2 * len(CATALOG.soils)
+
+
+def test_table_is_loaded_from_database(db_path):
+    db = DatabaseManager(db_path)
+    engine = RecommendationEngine(db=db)
+    expected = engine.recommend(1, "Wheat", "Maize", "Clay").as_dict()
+
+    calls = []
+
+    def compute(*args):
+        calls.append(args)
+        return engine.compute(*args)
+
+    table = RecommendationTable(CATALOG, compute, db, engine.table.settings)
+    assert list(table.lookup("Wheat", "Maize", "Clay")) == [
+        expected[k] for k in ("recommendation", "alternatives", "soil_management", "fertilizer", "techniques", "next_crops")
+    ]
+    assert calls == []
+
+
+def test_catalog_change_rebuilds_table(db_path):
+    db = DatabaseManager(db_path)
+    catalog = CropCatalog([Crop("Sorghum", "cereal", ["Sandy"]), Crop("Millet", "cereal", ["Sandy"])], SOILS, CATALOG.techniques)
+    engine = RecommendationEngine(catalog, db=db)
+    old_hash = engine.table.catalog_hash
+    assert engine.recommend(1, "Sorghum", "Millet", "Sandy").alternatives == []
+
+    catalog.update(crops=catalog.crops + [Crop("Cowpea", "legume", ["Sandy"])])
+    engine.refresh()
+    assert engine.table.catalog_hash == catalog_hash(catalog, engine.table.settings) != old_hash
+    rec = engine.recommend(1, "Sorghum", "Millet", "Sandy")
+    assert rec.alternatives == ["Cowpea"]
+    assert rec.as_dict() == RecommendationEngine(catalog, precompute=False).recommend(1, "Sorghum", "Millet", "Sandy").as_dict()
@@ -0,0 +1,73 @@
+import pytest
+
+from engine import RecommendationEngine
+from preview import DependencyGraph, RecommendationPreview
+from renderer import SECTIONS, Report, ReportRenderer
+
+
+def full_render(engine, *inputs):
+    return ReportRenderer().html(Report.from_recommendation(engine.recommend(*inputs)))
+
+
+def test_graph_recomputes_only_downstream_nodes():
+    calls = []
+    graph = DependencyGraph()
+    graph.add_input("a")
+    graph.add_input("b")
+    graph.add("double", ("a",), lambda a: calls.append("double") or a * 2)
+    graph.add("parity", ("b",), lambda b: calls.append("parity") or b % 2)
+    graph.add("sum", ("double", "parity"), lambda d, p: calls.append("sum") or d + p)
+
+    assert graph.update(a=1, b=1) == {"a", "b", "double", "parity", "sum"}
+    calls.clear()
+    # parity stays 1, so sum isn't recomputed
+    assert graph.update(a=1, b=3) == {"b"}
+    assert calls == ["parity"]
+    calls.clear()
+    assert graph.update(a=2, b=3) == {"a", "double", "sum"}
+    assert calls == ["double", "sum"]
+    assert graph.values["sum"] == 5
+
+    with pytest.raises(ValueError):
+        graph.update(sum=1)
+
+
+def test_preview_renders_only_affected_sections():
+    engine = RecommendationEngine(precompute=False)
+    preview = RecommendationPreview(engine, ReportRenderer())
+
+    inputs = (2, "Soybean", "Wheat", "Loamy")
+    preview.update(*inputs)
+    assert preview.rendered == list(SECTIONS)
+    assert preview.document() == full_render(engine, *inputs)
+
+    inputs = (3, "Soybean", "Wheat", "Loamy")
+    assert preview.update(*inputs) == {"farmland_size", "size"}
+    assert preview.rendered == ["header"]
+    assert preview.document() == full_render(engine, *inputs)
+
+    # Another cereal keeps the fertilizer and techniques
+    inputs = (3, "Soybean", "Barley", "Loamy")
+    changed = preview.update(*inputs)
+    assert {"current_crop", "curr", "rotation"} <= changed
+    assert not {"fertilizer", "techniques", "next_crops"} & changed
+    assert "fertilizer" not in preview.rendered and "techniques" not in preview.rendered
+    assert preview.document() == full_render(engine, *inputs)
+
+    inputs = (3, "Soybean", "Barley", "Clay")
+    preview.update(*inputs)
+    assert preview.document() == full_render(engine, *inputs)
+
+
+def test_preview_recovers_from_invalid_input():
+    engine = RecommendationEngine(precompute=False)
+    preview = RecommendationPreview(engine, ReportRenderer())
+    preview.update(2, "Wheat", "Maize", "Loamy")
+    assert preview.alternatives == engine.recommend(2, "Wheat", "Maize", "Loamy").alternatives
+
+    with pytest.raises(ValueError):
+        preview.update(2, "Wheat", "Mango", "Loamy")
+    inputs = (2, "Wheat", "Soybean", "Loamy")
+    preview.update(*inputs)
+    assert preview.alternatives == []
+    assert preview.document() == full_render(engine, *inputs)
@@ -0,0 +1,57 @@
+from engine import RecommendationEngine
+from renderer import HTML_FOOTER, HTML_HEAD, Report, ReportRenderer
+
+
+def report(size=2.0, prev="Wheat", curr="Soybean", soil="Loamy"):
+    return Report.from_recommendation(RecommendationEngine(precompute=False).recommend(size, prev, curr, soil))
+
+
+def test_text_report():
+    r = report()
+    assert ReportRenderer().text(r) == (
+        "=== FARM ANALYSIS SUMMARY ===\n"
+        "Farmland Size: 2.0 acres/hectares\n"
+        "Crop Transition: Wheat → Soybean\n\n"
+        f"✅ ROTATION SUCCESS:\n{r.rotation_msg}\n\n"
+        f"🌱 SOIL MANAGEMENT:\n{r.soil_rec}\n\n"
+        f"🧪 FERTILIZER:\n{r.fertilizer}\n\n"
+        f"🔬 MODERN TECHNIQUES:\n{', '.join(r.techniques)}\n\n"
+        f"🌾 NEXT SUITABLE CROPS:\n{', '.join(r.next_crops)}\n\n"
+    )
+
+
+def test_html_report_leaves_out_empty_sections():
+    renderer = ReportRenderer()
+    html = renderer.html(report()._replace(soil_rec="", next_crops=()))
+    assert html.startswith(HTML_HEAD) and html.endswith(HTML_FOOTER)
+    assert "Soil Management Strategy" not in html
+    assert "No suitable crops found" in html
+    assert "Fertilizer Recommendations" in html
+
+
+def test_cache_only_rerenders_changed_sections():
+    renderer = ReportRenderer()
+    first = report(2.0)
+    renderer.html(first)
+    misses = renderer.cache_info().misses
+
+    # Only the header shows the farmland size
+    second = report(3.5)
+    html = renderer.html(second)
+    assert renderer.cache_info().misses == misses + 1
+    assert "3.5 acres/hectares" in html and "2.0 acres/hectares" not in html
+
+    # A different transition must not reuse stale fragments
+    other = report(3.5, "Wheat", "Maize")
+    assert renderer.html(other) == ReportRenderer().html(other)
+    assert "Rotation Warning" in renderer.html(other)
+    assert renderer.html(second) == html
+
+
+def test_cache_clear():
+    renderer = ReportRenderer()
+    r = report()
+    html = renderer.html(r)
+    renderer.cache_clear()
+    assert renderer.cache_info().currsize == 0
+    assert renderer.html(r) == html
@@ -0,0 +1,67 @@
+import sqlite3
+
+import pytest
+
+from database import DatabaseManager
+from retention import UNDATED, RetentionPolicy, _retention_days, season_of
+
+LOG = (1.0, "Wheat", "Soybean", "Loamy", "✅ Good rotation: Soybean after Wheat.", "Balanced NPK", "Mulching")
+
+
+@pytest.mark.parametrize("created_at, season", [
+    ("2024-01-01 00:00:00", "2024-s1"),
+    ("2024-06-30 23:59:59", "2024-s1"),
+    ("2024-07-01 00:00:00", "2024-s2"),
+    (None, UNDATED),
+    ("", UNDATED),
+    ("01/02/2020", UNDATED),
+    ("2024-13-01 00:00:00", UNDATED),
+])
+def test_season_of(created_at, season):
+    assert season_of(created_at) == season
+
+
+def _db_with(db_path, created):
+    """Database with one entry per created_at value; None is stored as NULL."""
+    db = DatabaseManager(db_path)
+    db.save_user_entries([LOG + (created_at,) for created_at in created])
+    # Inserting stamps None with the current time; clear it as for entries from before migration 2
+    conn = sqlite3.connect(db_path)
+    conn.executemany(
+        "UPDATE user_entries SET created_at = NULL WHERE id = ?",
+        [(i,) for i, created_at in enumerate(created, 1) if created_at is None],
+    )
+    conn.commit()
+    conn.close()
+    return db
+
+
+def test_archives_undated_and_malformed_entries(db_path):
+    db = _db_with(db_path, [None, "01/02/2020", "2020-08-01 00:00:00", "2099-01-01 00:00:00", "garbage"])
+    policy = RetentionPolicy(db, max_age_days=30)
+    assert policy.archive_all() == 3
+    assert list(policy.archives()) == [UNDATED, "2020-s2"]
+    assert db.count_archived(policy.archives()[UNDATED]) == 2
+    # Future and unsortable timestamps stay in the live log
+    assert sorted(row[-1] for row in next(db.iter_user_entries())) == ["2099-01-01 00:00:00", "garbage"]
+    with policy.history() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM all_entries").fetchone()[0] == 5
+
+
+def test_archiving_is_opt_in(db_path):
+    db = _db_with(db_path, [None, "2020-08-01 00:00:00"])
+    policy = RetentionPolicy(db, max_age_days=0)
+    assert policy.archive_all() == 0
+    assert policy.archives() == {}
+    assert db.entry_stats()[0] == 2
+
+
+@pytest.mark.parametrize("value, days", [(None, 0), ("", 0), ("0", 0), ("30", 30), (" 365 ", 365)])
+def test_retention_days(value, days):
+    assert _retention_days(value) == days
+
+
+@pytest.mark.parametrize("value", ["30d", "-5", "1.5"])
+def test_invalid_retention_days_disable_archiving(value, caplog):
+    assert _retention_days(value) == 0
+    assert "CROP_ASSISTANT_RETENTION_DAYS" in caplog.text
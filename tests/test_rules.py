@@ -0,0 +1,66 @@
+import random
+from itertools import product
+
+from catalog import CATALOG
+from logic import SoilRecommendationSystem
+from rules import DecisionTable, Rule, rules_from_dicts, soil_facts
+
+ATTRIBUTES = {"soil_type": ["Sandy", "Clay", "Loamy"], "family": ["cereal", "legume", "root"], "drainage": ["poor", "good"]}
+
+
+def linear_scan(rules, facts, default):
+    ordered = sorted(rules, key=lambda rule: -rule.priority)
+    advice = [
+        rule.advice for rule in ordered
+        if all(facts.get(attribute) in values for attribute, values in rule.conditions.items())
+    ]
+    return advice or ([default] if default is not None else [])
+
+
+def random_rules(rng, count):
+    rules = []
+    for i in range(count):
+        when = {}
+        for attribute, values in ATTRIBUTES.items():
+            if rng.random() < 0.5:
+                picked = rng.sample(values, rng.randint(1, 2))
+                when[attribute] = picked if len(picked) > 1 else picked[0]
+        rules.append(Rule(f"advice {i}", when, priority=rng.randint(0, 3)))
+    return rules
+
+
+def all_facts():
+    for values in product(*([None] + v for v in ATTRIBUTES.values())):
+        yield {attribute: value for attribute, value in zip(ATTRIBUTES, values) if value is not None}
+
+
+def test_matches_linear_scan():
+    rng = random.Random(7)
+    for count in (0, 1, 5, 40):
+        for default in (None, "default"):
+            rules = random_rules(rng, count)
+            table = DecisionTable(rules, default)
+            facts_list = list(all_facts())
+            for facts in facts_list:
+                expected = linear_scan(rules, facts, default)
+                assert table.evaluate(facts) == expected
+                assert table.first(facts) == (expected[0] if expected else None)
+            assert table.evaluate_many(facts_list) == [linear_scan(rules, f, default) for f in facts_list]
+
+
+def test_rules_from_dicts_round_trip():
+    rules = rules_from_dicts([
+        {"advice": "Lime", "when": {"ph": ["acidic", "very acidic"]}, "priority": 1, "name": "lime"},
+        {"advice": "Mulch"},
+    ])
+    table = DecisionTable(rules_from_dicts(rule.as_dict() for rule in rules))
+    assert table.evaluate({"ph": "acidic"}) == ["Lime", "Mulch"]
+    assert table.evaluate({"ph": "neutral"}) == ["Mulch"]
+
+
+def test_soil_table_matches_linear_scan():
+    table = SoilRecommendationSystem.SOIL_TABLE
+    for soil in CATALOG.soils:
+        for prev, curr in product([None] + CATALOG.crops[:6], CATALOG.crops[:6]):
+            facts = soil_facts(soil, [prev, curr])
+            assert table.evaluate(facts) == linear_scan(table.rules, facts, table.default)
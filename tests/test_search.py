@@ -0,0 +1,102 @@
+import re
+import sqlite3
+
+import pytest
+
+from database import DatabaseManager, fts_query
+
+ENTRIES = [
+    (2.0, "Wheat", "Soybean", "Loamy", "✅ Good rotation after cereal", "Phosphorus and potassium", "No-till, Mulching"),
+    (1.5, "Wheat", "Maize", "Loamy", "⚠️ Same family: move out of cereal", "Nitrogen-rich fertilizer", "No-till"),
+    (3.0, "Soybean", "Wheat", "Clay", "✅ Good rotation after legume", "Nitrogen-rich fertilizer", "Drip irrigation"),
+    (0.5, "Potato", "Lentil", "Sandy", "✅ Good rotation after root", "Phosphorus and potassium", ""),
+]
+
+
+def tokens(text):
+    return re.findall(r"\w+", (text or "").lower())
+
+
+def contains(value, phrase):
+    value = tokens(value)
+    return any(value[i:i + len(phrase)] == phrase for i in range(len(value) - len(phrase) + 1))
+
+
+def scan(db, text):
+    """Ids of entries containing every word of `text` (phrases for punctuated words), by linear scan."""
+    phrases = [tokens(word) for word in text.split()]
+    with db.connections.read() as conn:
+        rows = conn.execute("SELECT id, recommendation, fertilizer, techniques FROM user_entries_view").fetchall()
+    return sorted(
+        row[0] for row in rows
+        if all(any(contains(value, phrase) for value in row[1:]) for phrase in phrases)
+    )
+
+
+def search_ids(db, text):
+    return sorted(row[0] for row in db.search_entries(text))
+
+
+def check(db, queries):
+    for text in queries:
+        expected = scan(db, text)
+        assert db.count_matches(text) == len(expected), text
+        assert search_ids(db, text) == expected, text
+
+
+QUERIES = ["cereal", "rotation", "no-till", "nitrogen-rich fertilizer", "mulching", "legume", "drip", "good after"]
+
+
+def test_search_matches_scan(db_path):
+    db = DatabaseManager(db_path)
+    db.save_user_entries(ENTRIES)
+    check(db, QUERIES)
+    assert db.count_matches("cereal") == 2
+    # Words are stemmed
+    assert db.count_matches("rotations") == 3
+    # Newest first when not ranked
+    assert [row[0] for row in db.search_entries("rotation", ranked=False)] == [4, 3, 1]
+    assert [row[0] for row in db.search_entries("rotation", limit=1, offset=1, ranked=False)] == [3]
+    assert db.search_entries("drip")[0][1:] == ENTRIES[2]
+
+
+def test_search_after_update_and_delete(db_path):
+    db = DatabaseManager(db_path)
+    db.save_user_entries(ENTRIES)
+    with db.connections.transaction() as conn:
+        # Point entry 2 at entry 3's recommendation and techniques
+        conn.execute('''
+            UPDATE user_entries SET
+                recommendation_id = (SELECT recommendation_id FROM user_entries WHERE id = 3),
+                techniques_id = (SELECT techniques_id FROM user_entries WHERE id = 3)
+            WHERE id = 2
+        ''')
+        conn.execute("DELETE FROM user_entries WHERE id = 1")
+    check(db, QUERIES)
+    assert db.count_matches("cereal") == 0
+    assert search_ids(db, "legume drip") == [2, 3]
+
+    # The external-content index still agrees with the view
+    with db.connections.transaction() as conn:
+        conn.execute("INSERT INTO entries_fts (entries_fts) VALUES ('integrity-check')")
+    db.rebuild_search_index()
+    check(db, QUERIES)
+
+
+@pytest.mark.parametrize("text", ['"cereal', "cereal OR legume", "NOT", "rot*", "(", "family:"])
+def test_operators_are_searched_as_text(db_path, text):
+    db = DatabaseManager(db_path)
+    db.save_user_entries(ENTRIES)
+    try:
+        db.count_matches(text)
+        db.search_entries(text)
+    except sqlite3.OperationalError as e:
+        pytest.fail(f"{text!r}: {e}")
+    assert db.count_matches("cereal OR legume") == 0
+
+
+def test_fts_query():
+    assert fts_query("") is None
+    assert fts_query("   ") is None
+    assert fts_query(" a  b ") == '"a" "b"'
+    assert fts_query('no "till"') == '"no" """till"""'
@@ -0,0 +1,89 @@
+import pytest
+
+from database import DatabaseManager
+
+OK = "✅ Good rotation"
+WARN = "⚠️ Same family"
+
+ENTRIES = [
+    (2.0, "Wheat", "Soybean", "Loamy", OK, "NPK", "No-till"),
+    (1.5, "Wheat", "Maize", "Loamy", WARN, "NPK", "No-till"),
+    (3.0, "Soybean", "Wheat", "Clay", OK, "N", ""),
+    (0.5, "Wheat", "Soybean", "Sandy", OK, "NPK", "Mulching"),
+    (4.0, None, "Potato", "Clay", OK, "K", ""),
+]
+
+
+def snapshot(db):
+    return (
+        db.entry_stats(),
+        sorted(db.stats_by("crop"), key=repr),
+        sorted(db.stats_by("soil"), key=repr),
+        sorted(db.top_transitions(100), key=repr),
+    )
+
+
+def expected(rows):
+    """The summaries computed directly from (size, previous, current, soil, recommendation) rows."""
+    def group(key):
+        out = {}
+        for size, prev, curr, soil, rec in rows:
+            entries, warnings, acreage = out.get(key(prev, curr, soil), (0, 0, 0.0))
+            out[key(prev, curr, soil)] = (entries + 1, warnings + rec.startswith("⚠"), acreage + size)
+        return out
+
+    by_crop = group(lambda prev, curr, soil: curr)
+    by_soil = group(lambda prev, curr, soil: soil)
+    transitions = group(lambda prev, curr, soil: (prev, curr))
+    return (
+        (len(rows), sum(rec.startswith("⚠") for *_, rec in rows), pytest.approx(sum(r[0] for r in rows))),
+        sorted([(k, *v) for k, v in by_crop.items()], key=repr),
+        sorted([(k, *v) for k, v in by_soil.items()], key=repr),
+        sorted([(*k, e, w) for k, (e, w, _) in transitions.items()], key=repr),
+    )
+
+
+def assert_consistent(db, rows):
+    current = snapshot(db)
+    assert current == expected(rows)
+    db.rebuild_stats()
+    assert snapshot(db) == current
+
+
+def test_insert(db_path):
+    db = DatabaseManager(db_path)
+    assert db.entry_stats() == (0, 0, 0.0)
+    db.save_user_entries(ENTRIES)
+    assert_consistent(db, [e[:5] for e in ENTRIES])
+    assert db.top_transitions(1) == [("Wheat", "Soybean", 2, 0)]
+    assert db.stats_by("crop", limit=1) == [("Soybean", 2, 0, 2.5)]
+
+
+def test_update_and_delete(db_path):
+    db = DatabaseManager(db_path)
+    db.save_user_entries(ENTRIES)
+    with db.connections.transaction() as conn:
+        # Move the warning entry to another crop and mark it as a good rotation
+        conn.execute('''
+            UPDATE user_entries SET
+                current_crop_id = (SELECT id FROM crops WHERE name = 'Soybean'),
+                recommendation_id = (SELECT recommendation_id FROM user_entries WHERE farmland_size = 2.0),
+                farmland_size = 1.0
+            WHERE farmland_size = 1.5
+        ''')
+        conn.execute("UPDATE user_entries SET soil_id = NULL WHERE farmland_size = 0.5")
+        conn.execute("DELETE FROM user_entries WHERE farmland_size = 3.0")
+    rows = [
+        (2.0, "Wheat", "Soybean", "Loamy", OK),
+        (1.0, "Wheat", "Soybean", "Loamy", OK),
+        (0.5, "Wheat", "Soybean", None, OK),
+        (4.0, None, "Potato", "Clay", OK),
+    ]
+    assert_consistent(db, rows)
+    assert db.top_transitions(1) == [("Wheat", "Soybean", 3, 0)]
+    # Summary rows whose last entry went away are dropped
+    assert "Wheat" not in [name for name, *_ in db.stats_by("crop")]
+
+    with db.connections.transaction() as conn:
+        conn.execute("DELETE FROM user_entries")
+    assert snapshot(db) == ((0, 0, 0.0), [], [], [])
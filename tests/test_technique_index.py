@@ -0,0 +1,75 @@
+import pytest
+
+from catalog import CATALOG
+from classes import FarmingTechnique
+from logic import TechniqueSuggestion
+from technique_index import FAMILY_WEIGHT, SOIL_WEIGHT, WILDCARD_WEIGHT, TechniqueIndex
+
+TECHS_BY_FAMILY = {
+    "cereal": ["No-till", "Cover cropping"],
+    "legume": ["Inoculation", "no-till"],
+}
+TECHNIQUES = [
+    FarmingTechnique("Cover Cropping", "", ["Sandy", "Loamy"]),
+    FarmingTechnique("Drip irrigation", "", ["Sandy"]),
+    FarmingTechnique("Mulching", "", ["All"]),
+]
+
+
+def linear_scan(techs_by_family, techniques, family, soil_type):
+    """Walk both technique sources in order, merging names case-insensitively."""
+    merged = {}
+    for fam, names in techs_by_family.items():
+        for name in names:
+            entry = merged.setdefault(name.strip().lower(), {"name": name, "families": set(), "soils": None})
+            entry["families"].add(fam)
+    for technique in techniques:
+        entry = merged.setdefault(technique.name.strip().lower(), {"name": technique.name, "families": set(), "soils": None})
+        entry["soils"] = set(technique.suitable_soil)
+        entry["generic"] = True
+
+    ranked = []
+    for entry in merged.values():
+        soils = entry["soils"]
+        if family not in entry["families"] and not entry.get("generic"):
+            continue
+        if soil_type is not None and soils is not None and "All" not in soils and soil_type not in soils:
+            continue
+        score = FAMILY_WEIGHT if family in entry["families"] else 0.0
+        if soils is not None and soil_type in soils:
+            score += SOIL_WEIGHT
+        if soils is not None and "All" in soils:
+            score += WILDCARD_WEIGHT
+        ranked.append((score, entry["name"]))
+    # sorted() is stable, so ties keep source order
+    return [name for _, name in sorted(ranked, key=lambda pair: -pair[0])]
+
+
+def test_small_index_matches_linear_scan():
+    index = TechniqueIndex(TECHS_BY_FAMILY, TECHNIQUES, ["Sandy", "Loamy", "Clay"])
+    assert index.names == ["No-till", "Cover cropping", "Inoculation", "Drip irrigation", "Mulching"]
+    assert index.suggest("cereal", "Clay") == ["No-till", "Mulching"]
+    for family in ["cereal", "legume", "root", None]:
+        for soil_type in ["Sandy", "Loamy", "Clay", "Peaty", None]:
+            assert index.suggest(family, soil_type) == linear_scan(TECHS_BY_FAMILY, TECHNIQUES, family, soil_type)
+
+
+def test_catalog_index_matches_linear_scan():
+    index = TechniqueSuggestion.build_index(CATALOG)
+    for family in CATALOG.families:
+        for soil_type in CATALOG.soil_types:
+            expected = linear_scan(TechniqueSuggestion.TECHS_BY_FAMILY, CATALOG.techniques, family, soil_type)
+            assert index.suggest(family, soil_type) == expected
+
+
+def test_score_fields_match_scores():
+    index = TechniqueIndex(TECHS_BY_FAMILY, TECHNIQUES, ["Sandy", "Loamy", "Clay"])
+    fields = [("cereal", "Sandy"), ("legume", "Clay"), ("root", "Loamy"), ("cereal", "Peaty")]
+    scores = index.score_fields(fields)
+    assert scores.shape == (len(fields), len(index.names))
+    for row, (family, soil_type) in zip(scores, fields):
+        # An unknown soil only keeps techniques without soil constraints
+        suitable = index.suggest(family, soil_type if soil_type in index.soil_types else "")
+        for i, name in enumerate(index.names):
+            expected = index.score(i, family, soil_type) if name in suitable else 0.0
+            assert row[i] == pytest.approx(expected)
@@ -0,0 +1,62 @@
+import gzip
+
+import pytest
+
+from database import DatabaseManager
+from transfer import export_entries, import_entries
+
+ENTRIES = [
+    (2.0, "Wheat", "Soybean", "Loamy", "✅ Good rotation: Soybean after Wheat.", "Balanced NPK", "Mulching, Drip irrigation", "2024-03-01 08:00:00"),
+    (0.5, "Maize", "Rice", "Clay", "⚠️ Avoid planting Rice after Maize, \"same family\".", "Urea\ntop-dress", None, "2024-08-15 17:30:00"),
+    (12.25, "Beans", "Cassava", "Sandy", "✅ Good rotation: Cassava after Beans.", None, "Cover Cropping", "2025-01-02 00:00:00"),
+]
+
+
+def _rows(db):
+    return [row[1:] for batch in db.iter_user_entries() for row in batch]
+
+
+@pytest.fixture
+def source(tmp_path):
+    db = DatabaseManager(str(tmp_path / "source.db"))
+    db.save_user_entries(ENTRIES * 10)
+    return db
+
+
+@pytest.mark.parametrize("name", ["log.csv", "log.jsonl", "log.csv.gz", "log.jsonl.gz", "log.csv.zst"])
+def test_round_trip(source, db_path, tmp_path, name):
+    if name.endswith(".zst"):
+        pytest.importorskip("zstandard")
+    path = str(tmp_path / name)
+    assert export_entries(source, path, batch_size=7) == len(ENTRIES) * 10
+    if name.endswith(".gz"):
+        with gzip.open(path) as f:
+            f.read()
+
+    target = DatabaseManager(db_path)
+    assert import_entries(target, path, batch_size=7) == len(ENTRIES) * 10
+    assert _rows(target) == _rows(source)
+    # A finished import isn't repeated
+    assert import_entries(target, path) == 0
+    assert target.entry_stats() == source.entry_stats()
+
+
+def test_interrupted_import_resumes(source, db_path, tmp_path):
+    path = str(tmp_path / "log.jsonl.gz")
+    export_entries(source, path)
+    target = DatabaseManager(db_path)
+
+    def interrupt(done, position, size):
+        if done >= 10:
+            raise KeyboardInterrupt
+
+    with pytest.raises(KeyboardInterrupt):
+        import_entries(target, path, batch_size=5, progress=interrupt)
+    assert len(_rows(target)) == 10
+
+    assert import_entries(target, path, batch_size=5) == 20
+    assert _rows(target) == _rows(source)
+
+    # restart=True imports the whole file again
+    assert import_entries(target, path, restart=True) == 30
+    assert len(_rows(target)) == 60
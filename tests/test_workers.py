@@ -0,0 +1,88 @@
+import sqlite3
+import threading
+
+import pytest
+from PyQt6.QtCore import QCoreApplication
+
+from database import DatabaseManager
+from engine import RecommendationEngine
+from workers import RecommendationTask, RecommendationWorker
+
+INPUTS = ("2", "Wheat", "Soybean", "Loamy")
+
+
+@pytest.fixture(scope="module")
+def app():
+    return QCoreApplication.instance() or QCoreApplication([])
+
+
+class SupersededWhileComputing(RecommendationEngine):
+    """Supersedes the task from inside recommend(), as a newer submit would."""
+
+    task = None
+
+    def recommend(self, *args):
+        rec = super().recommend(*args)
+        self.task.supersede()
+        return rec
+
+
+class Blocking(RecommendationEngine):
+    """Holds every recommend() until `release` is set, so later submits stay queued."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.release = threading.Event()
+
+    def recommend(self, *args):
+        self.release.wait()
+        return super().recommend(*args)
+
+
+class FailingDatabase:
+    def save_user_entry(self, *args):
+        raise sqlite3.OperationalError("database is locked")
+
+
+def _collect(signal):
+    received = []
+    signal.connect(lambda *args: received.append(args))
+    return received
+
+
+def test_superseded_recommendation_is_saved_not_shown(app, db_path):
+    db = DatabaseManager(db_path)
+    engine = SupersededWhileComputing(precompute=False)
+    task = engine.task = RecommendationTask(1, engine, db, INPUTS)
+    finished, failed = _collect(task.signals.finished), _collect(task.signals.failed)
+    task.run()
+    assert finished == [] and failed == []
+    assert [row[2:4] for row in db.get_user_entries()] == [("Wheat", "Soybean")]
+
+
+def test_queued_superseded_requests_are_saved_not_shown(app, db_path):
+    db = DatabaseManager(db_path)
+    engine = Blocking(precompute=False)
+    worker = RecommendationWorker(engine, db)
+    # One thread: the first request runs (and blocks), the rest wait in the queue
+    worker.pool.setMaxThreadCount(1)
+    finished = _collect(worker.finished)
+    crops = ["Soybean", "Peanut", "Lentil"]
+    ids = [worker.submit("2", "Wheat", crop, "Loamy") for crop in crops]
+    engine.release.set()
+    worker.wait()
+    while worker.busy:
+        app.processEvents()
+    assert [(request_id, rec.current_crop) for request_id, rec, *_ in finished] == [(ids[-1], "Lentil")]
+    assert sorted(row[3] for row in db.get_user_entries()) == sorted(crops)
+
+
+def test_save_failure_is_reported(app):
+    worker = RecommendationWorker(RecommendationEngine(precompute=False), FailingDatabase())
+    finished, failed = _collect(worker.finished), _collect(worker.failed)
+    request_id = worker.submit(*INPUTS)
+    worker.wait()
+    while worker.busy:
+        app.processEvents()
+    assert len(finished) == 1
+    assert failed == [(request_id, "Could not save the recommendation: database is locked")]
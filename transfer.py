@@ -0,0 +1,240 @@
+"""
+transfer.py - Streaming export and import of the saved recommendations.
+
+Entries are exported with a cursor read in batches and written as they
+arrive, and imported through DatabaseManager.save_user_entries one batch per
+transaction, so memory stays flat however large the log or the file is.
+Files ending in .gz are gzip-compressed and .zst zstd-compressed (needs the
+zstandard package). Every import batch advances a checkpoint in the same
+transaction as its rows, so an interrupted import run again picks up after
+the last committed row; a changed file starts over.
+
+Usage:
+    python transfer.py export logs.csv.gz
+    python transfer.py import logs.jsonl --db other.db
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import os
+import sys
+import time
+from itertools import islice
+from typing import Callable, Dict, Iterable, Iterator, Optional, TextIO
+
+from database import LOG_COLUMNS, DatabaseManager
+
+# Columns of an exported entry, in file order
+EXPORT_FIELDS = LOG_COLUMNS + ["created_at"]
+
+COMPRESSED_SUFFIXES = (".gz", ".zst")
+BUFFER_SIZE = 1 << 20
+
+
+def _detect_format(path: str, explicit: Optional[str]) -> str:
+    if explicit:
+        return explicit
+    name = path.lower()
+    for suffix in COMPRESSED_SUFFIXES:
+        if name.endswith(suffix):
+            name = name[:-len(suffix)]
+    return "jsonl" if name.endswith((".jsonl", ".json", ".ndjson")) else "csv"
+
+
+def _open(path: str, mode: str, name: Optional[str] = None):
+    """
+    Open `path` as text for "r" or "w", (de)compressing by the suffix of
+    `name` (default `path`). Returns (text stream, raw binary file); close
+    both, the text stream first.
+    """
+    raw = open(path, mode + "b", buffering=BUFFER_SIZE)
+    try:
+        name = (name or path).lower()
+        if name.endswith(".gz"):
+            binary = gzip.GzipFile(fileobj=raw, mode=mode)
+        elif name.endswith(".zst"):
+            try:
+                import zstandard
+            except ImportError:
+                raise RuntimeError("Reading or writing .zst files needs the zstandard package") from None
+            if mode == "w":
+                binary = zstandard.ZstdCompressor().stream_writer(raw, closefd=False)
+            else:
+                binary = io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(raw, closefd=False), BUFFER_SIZE)
+        else:
+            binary = raw
+        return io.TextIOWrapper(binary, encoding="utf-8", newline=""), raw
+    except Exception:
+        raw.close()
+        raise
+
+
+def _fingerprint(path: str) -> str:
+    stat = os.stat(path)
+    return f"{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def write_entries(rows: Iterable[tuple], stream: TextIO, fmt: str) -> int:
+    """Write (id, *EXPORT_FIELDS) rows as they arrive; returns the number written."""
+    count = 0
+    if fmt == "csv":
+        writer = csv.writer(stream)
+        writer.writerow(EXPORT_FIELDS)
+        for row in rows:
+            writer.writerow(row[1:])
+            count += 1
+    else:
+        for row in rows:
+            stream.write(json.dumps(dict(zip(EXPORT_FIELDS, row[1:])), ensure_ascii=False))
+            stream.write("\n")
+            count += 1
+    return count
+
+
+def read_entries(stream: TextIO, fmt: str) -> Iterator[Dict]:
+    """Stream exported entries from a CSV or JSONL file one row at a time."""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    else:
+        for line in stream:
+            line = line.strip()
+            if line:
+                yield json.loads(line)
+
+
+def _entry_tuple(entry: Dict) -> tuple:
+    """An exported entry in save_user_entries argument order."""
+    size = entry.get("farmland_size")
+    return (
+        float(size) if size not in (None, "") else None,
+        *(entry.get(column) or None for column in LOG_COLUMNS[1:]),
+        entry.get("created_at") or None,
+    )
+
+
+def export_entries(
+    db: DatabaseManager,
+    path: str,
+    fmt: Optional[str] = None,
+    batch_size: int = 10_000,
+    progress: Optional[Callable[[int, int], None]] = None,
+) -> int:
+    """
+    Write every saved entry to `path`, oldest first. `progress` is called
+    with (rows written, total rows) after each batch.
+    """
+    fmt = _detect_format(path, fmt)
+    total = db.entry_stats()[0]
+    written = 0
+
+    def rows():
+        nonlocal written
+        for batch in db.iter_user_entries(batch_size):
+            yield from batch
+            written += len(batch)
+            if progress is not None:
+                progress(written, total)
+
+    # Write aside and rename so an interrupted export never looks complete
+    temp_path = path + ".part"
+    stream, raw = _open(temp_path, "w", path)
+    try:
+        count = write_entries(rows(), stream, fmt)
+    finally:
+        stream.close()
+        raw.close()
+    os.replace(temp_path, path)
+    return count
+
+
+def import_entries(
+    db: DatabaseManager,
+    path: str,
+    fmt: Optional[str] = None,
+    batch_size: int = 10_000,
+    restart: bool = False,
+    progress: Optional[Callable[[int, int, int], None]] = None,
+) -> int:
+    """
+    Append the entries in `path` to the log, resuming after the rows an
+    earlier interrupted import of the same file already committed. Returns
+    the number of rows imported by this call. `progress` is called with
+    (rows imported in total, bytes read, file size) after each batch.
+    """
+    fmt = _detect_format(path, fmt)
+    source = os.path.abspath(path)
+    if restart:
+        db.reset_import(source)
+    done, finished = db.import_checkpoint(source, _fingerprint(path))
+    if finished:
+        return 0
+    size = os.path.getsize(path)
+    stream, raw = _open(path, "r")
+    try:
+        entries = islice(read_entries(stream, fmt), done, None)
+        report = (lambda count: progress(done + count, raw.tell(), size)) if progress is not None else None
+        count = db.save_user_entries(
+            (_entry_tuple(entry) for entry in entries), batch_size, checkpoint=source, progress=report
+        )
+    finally:
+        stream.close()
+        raw.close()
+    db.finish_import(source)
+    return count
+
+
+class _Progress:
+    """Rate-limited progress line on stderr."""
+
+    def __init__(self, label: str, interval: float = 0.5):
+        self.label = label
+        self.interval = interval
+        self.last = 0.0
+
+    def __call__(self, done: int, position: int, total: int):
+        now = time.monotonic()
+        if now - self.last < self.interval and position < total:
+            return
+        self.last = now
+        percent = f"{position / total:6.1%}" if total else "  100%"
+        print(f"\r{self.label}: {done:,} rows {percent}", end="", file=sys.stderr, flush=True)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export or import saved recommendations as CSV/JSONL.")
+    parser.add_argument("command", choices=["export", "import"])
+    parser.add_argument("path", help="File to write or read; .gz and .zst are compressed")
+    parser.add_argument("--db", default="crop_assistant.db")
+    parser.add_argument("--format", choices=["csv", "jsonl"])
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--restart", action="store_true", help="Import from the start, ignoring any checkpoint")
+    parser.add_argument("--quiet", action="store_true", help="No progress output")
+    args = parser.parse_args(argv)
+
+    progress = None if args.quiet else _Progress(f"{args.command.capitalize()}ed")
+    db = DatabaseManager(args.db)
+    try:
+        if args.command == "export":
+            count = export_entries(
+                db, args.path, args.format, args.batch_size,
+                progress=progress and (lambda written, total: progress(written, written, total)),
+            )
+        else:
+            count = import_entries(db, args.path, args.format, args.batch_size, args.restart, progress)
+    except KeyboardInterrupt:
+        count = None
+    finally:
+        db.close()
+    if progress is not None and progress.last:
+        print(file=sys.stderr)
+    if count is None:
+        if args.command == "import":
+            print("Interrupted; run the same import again to resume.", file=sys.stderr)
+        sys.exit(1)
+    print(f"{args.command.capitalize()}ed {count} entries.", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,187 @@
+"""
+workers.py - Background recommendation and persistence for the GUI.
+
+handle_submit hands each request to RecommendationWorker, which computes,
+renders and saves it on a QThreadPool. Every request gets an increasing
+ID and every request is saved, like handle_submit always did; a newer
+request supersedes older ones that haven't finished, which are then no
+longer shown.
+
+MaintenanceWorker runs RetentionPolicy steps one at a time on its own
+thread, so archiving and vacuuming never block the event loop.
+"""
+import logging
+import threading
+from typing import Dict, Optional
+
+from PyQt6.QtCore import QObject, QRunnable, QThreadPool, pyqtSignal
+
+from database import DatabaseManager
+from engine import RecommendationEngine
+from renderer import RENDERER, Report
+from retention import RetentionPolicy
+
+log = logging.getLogger(__name__)
+
+
+class TaskSignals(QObject):
+    # request_id, Recommendation, Report, rendered HTML (None if rendering failed)
+    finished = pyqtSignal(int, object, object, object)
+    # request_id, message; for invalid input or a failed save
+    failed = pyqtSignal(int, str)
+    # Always emitted last, including for superseded tasks
+    done = pyqtSignal(int)
+
+
+class RecommendationTask(QRunnable):
+    def __init__(self, request_id: int, engine: RecommendationEngine, db: Optional[DatabaseManager], inputs):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.request_id = request_id
+        self.engine = engine
+        self.db = db
+        self.inputs = inputs
+        self.superseded = threading.Event()
+        self.computed = False
+        # Created on the submitting (GUI) thread, so emits are queued back to it
+        self.signals = TaskSignals()
+
+    def supersede(self):
+        """Still compute and save this request, but don't show it."""
+        self.superseded.set()
+
+    def run(self):
+        try:
+            self._run()
+        finally:
+            self.signals.done.emit(self.request_id)
+
+    def _run(self):
+        farmland_size, prev_name, curr_name, soil_type = self.inputs
+        try:
+            rec = self.engine.recommend(farmland_size, prev_name, curr_name, soil_type)
+        except ValueError as e:
+            self.signals.failed.emit(self.request_id, str(e))
+            return
+        self.computed = True
+        if not self.superseded.is_set():
+            report = Report.from_recommendation(rec)
+            try:
+                html = RENDERER.html(report)
+            except Exception:
+                html = None
+            self.signals.finished.emit(self.request_id, rec, report, html)
+
+        # Save to DB
+        if self.db is not None:
+            try:
+                self.db.save_user_entry(
+                    rec.farmland_size,
+                    prev_name,
+                    curr_name,
+                    soil_type,
+                    rec.rotation_msg,
+                    rec.fertilizer,
+                    ", ".join(rec.techniques) if rec.techniques else ""
+                )
+            except Exception as e:
+                self.signals.failed.emit(self.request_id, f"Could not save the recommendation: {e}")
+
+
+class RecommendationWorker(QObject):
+    # Re-emitted only for the latest request
+    finished = pyqtSignal(int, object, object, object)
+    failed = pyqtSignal(int, str)
+    # No task left running or queued
+    idle = pyqtSignal()
+
+    def __init__(self, engine: RecommendationEngine, db: Optional[DatabaseManager] = None, parent=None):
+        super().__init__(parent)
+        self.engine = engine
+        self.db = db
+        self.pool = QThreadPool(self)
+        self.latest_id = 0
+        self._tasks: Dict[int, RecommendationTask] = {}
+
+    def submit(self, farmland_size, previous_crop: str, current_crop: str, soil_type: str) -> int:
+        """Queue a request, superseding any that are still pending; returns its request ID."""
+        self.supersede_all()
+        self.latest_id += 1
+        task = RecommendationTask(
+            self.latest_id, self.engine, self.db, (farmland_size, previous_crop, current_crop, soil_type)
+        )
+        task.signals.finished.connect(self._on_finished)
+        task.signals.failed.connect(self._on_failed)
+        task.signals.done.connect(self._on_done)
+        self._tasks[task.request_id] = task
+        self.pool.start(task)
+        return task.request_id
+
+    def supersede_all(self):
+        # Queued and running tasks alike still save their entry; only showing it is skipped
+        for task in self._tasks.values():
+            task.supersede()
+
+    @property
+    def busy(self) -> bool:
+        return bool(self._tasks)
+
+    def wait(self, msecs: int = -1) -> bool:
+        """Block until all started tasks are done (e.g. before closing the database)."""
+        return self.pool.waitForDone(msecs)
+
+    def shutdown(self):
+        self.supersede_all()
+        self.wait()
+
+    def _on_finished(self, request_id: int, rec, report, html):
+        if request_id == self.latest_id:
+            self.finished.emit(request_id, rec, report, html)
+
+    def _on_failed(self, request_id: int, message: str):
+        # Save failures are reported even for superseded requests
+        task = self._tasks.get(request_id)
+        if request_id == self.latest_id or (task is not None and task.computed):
+            self.failed.emit(request_id, message)
+
+    def _on_done(self, request_id: int):
+        self._tasks.pop(request_id, None)
+        if not self._tasks:
+            self.idle.emit()
+
+
+class MaintenanceWorker(QObject):
+    # Emitted after each step with whether there is more to do
+    stepped = pyqtSignal(bool)
+    # Error message of a step that raised; it is followed by stepped(False)
+    failed = pyqtSignal(str)
+
+    def __init__(self, retention: RetentionPolicy, parent=None):
+        super().__init__(parent)
+        self.retention = retention
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+        self.running = False
+        self.stepped.connect(self._on_stepped)
+
+    def step(self):
+        """Start one maintenance step unless one is still running."""
+        if self.running:
+            return
+        self.running = True
+        self.pool.start(self._run)
+
+    def _run(self):
+        try:
+            more = self.retention.step()
+        except Exception as e:
+            log.exception("Maintenance step failed")
+            self.failed.emit(str(e) or type(e).__name__)
+            more = False
+        self.stepped.emit(more)
+
+    def _on_stepped(self, more: bool):
+        self.running = False
+
+    def shutdown(self):
+        self.pool.waitForDone()